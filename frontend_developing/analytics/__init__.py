@@ -0,0 +1,7 @@
+from .affiliation_matching import AffiliationMatcher, TrigramIndex
+
+
+__all__ = [
+    "AffiliationMatcher",
+    "TrigramIndex",
+]
@@ -0,0 +1,308 @@
+"""
+Blocked fuzzy matching of free-text affiliation strings against the
+`affiliation` table.
+
+Scoring every query against every affiliation name and alias is quadratic
+once both sides grow into the tens of thousands. `TrigramIndex` keeps an
+inverted index from character trigrams to affiliation entries so that only a
+small candidate block is scored with `fuzz.ratio`.
+
+Usage (from frontend_developing/):
+    python -m analytics.affiliation_matching --sample 5000 --workers 4
+"""
+
+import argparse
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from fuzzywuzzy import fuzz
+from models import Affiliation
+
+# Common abbreviation standardization
+NAME_REPLACEMENTS = {
+    "MASSACHUSETTS INSTITUTE OF TECHNOLOGY": "MIT",
+    "MASS INST OF TECH": "MIT",
+    "MASS INSTITUTE OF TECHNOLOGY": "MIT",
+    # Add more common variations as needed
+}
+
+
+def normalize_name(name: str) -> str:
+    """Clean name by removing special characters and standardizing format"""
+    if not name:
+        return name
+
+    # Convert to uppercase for standardization
+    name = name.upper()
+
+    # Remove special characters and extra whitespace
+    name = re.sub(r"[^\w\s]", "", name)
+    name = re.sub(r"\s+", " ", name).strip()
+
+    return NAME_REPLACEMENTS.get(name, name)
+
+
+def trigrams(text: str) -> set[str]:
+    """Split text into padded character trigrams, the same way pg_trgm does."""
+    grams = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to indexed entries."""
+
+    def __init__(self, max_df: float = 0.1):
+        # Grams that occur in more than `max_df` of all entries ("UNI", "ERS", ...)
+        # carry almost no signal and would blow up the candidate set, so they are
+        # skipped while the candidate block is collected.
+        self.max_df = max_df
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        self._gram_counts: list[int] = []
+        self.keys: list = []
+        self.texts: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, text: str, key) -> None:
+        entry_id = len(self.texts)
+        grams = trigrams(text)
+        for gram in grams:
+            self._postings[gram].append(entry_id)
+        self._gram_counts.append(len(grams))
+        self.keys.append(key)
+        self.texts.append(text)
+
+    def candidates(
+        self, text: str, limit: int = 50, min_overlap: float = 0.0
+    ) -> list[int]:
+        """
+        Return entry ids sharing the most trigrams with `text`.
+
+        Args:
+            text (str): Normalized query text
+            limit (int): Maximum number of candidates to return
+            min_overlap (float): Minimum Dice coefficient over trigram sets
+
+        Returns:
+            list: Entry ids ordered by trigram overlap, best first
+        """
+        query_grams = trigrams(text)
+        if not query_grams:
+            return []
+
+        max_postings = max(1, int(self.max_df * len(self.texts)))
+        shared = Counter()
+        for gram in query_grams:
+            postings = self._postings.get(gram)
+            if postings and len(postings) <= max_postings:
+                shared.update(postings)
+
+        # Every gram of the query was too common: fall back to using all of them
+        if not shared:
+            for gram in query_grams:
+                shared.update(self._postings.get(gram, ()))
+
+        scored = []
+        for entry_id, count in shared.items():
+            dice = 2 * count / (len(query_grams) + self._gram_counts[entry_id])
+            if dice >= min_overlap:
+                scored.append((dice, entry_id))
+        scored.sort(reverse=True)
+        return [entry_id for _, entry_id in scored[:limit]]
+
+
+class AffiliationMatcher:
+    """Match affiliation strings to affiliation ids using a trigram-blocked index."""
+
+    def __init__(
+        self,
+        entries: Iterable[tuple[int, str, Optional[list]]],
+        threshold: int = 85,
+        max_candidates: int = 50,
+    ):
+        """
+        Args:
+            entries: (affiliation_id, name, aliases) tuples
+            threshold (int): Minimum fuzz.ratio score to accept a match
+            max_candidates (int): Size of the candidate block scored per lookup
+        """
+        self.entries = [
+            (affiliation_id, name, list(aliases or []))
+            for affiliation_id, name, aliases in entries
+        ]
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.index = TrigramIndex()
+        for affiliation_id, name, aliases in self.entries:
+            for text in [name] + aliases:
+                cleaned = normalize_name(text.strip('"')) if text else None
+                if cleaned:
+                    self.index.add(cleaned, affiliation_id)
+
+    @classmethod
+    def from_session(cls, session, **kwargs) -> "AffiliationMatcher":
+        rows = session.query(
+            Affiliation.affiliation_id, Affiliation.name, Affiliation.aliases
+        ).all()
+        return cls(rows, **kwargs)
+
+    def _best(self, cleaned: str, entry_ids: Iterable[int]) -> Optional[tuple[int, int]]:
+        best_score = 0
+        best_match = None
+        for entry_id in entry_ids:
+            score = fuzz.ratio(cleaned, self.index.texts[entry_id])
+            if score > best_score:
+                best_score = score
+                best_match = self.index.keys[entry_id]
+        if best_score >= self.threshold:
+            return best_match, best_score
+        return None
+
+    def match(self, name: str) -> Optional[tuple[int, int]]:
+        """Return (affiliation_id, score) for the best match, or None."""
+        cleaned = normalize_name(name)
+        if not cleaned:
+            return None
+        return self._best(
+            cleaned, self.index.candidates(cleaned, limit=self.max_candidates)
+        )
+
+    def match_exhaustive(self, name: str) -> Optional[tuple[int, int]]:
+        """Score against every indexed name and alias. Used as the recall baseline."""
+        cleaned = normalize_name(name)
+        if not cleaned:
+            return None
+        return self._best(cleaned, range(len(self.index)))
+
+    def match_many(
+        self, names: list[str], workers: Optional[int] = None, chunksize: int = 1000
+    ) -> list[Optional[tuple[int, int]]]:
+        """
+        Match a large batch of names across a process pool.
+
+        Each worker builds its own copy of the index once, in the pool
+        initializer, so only the query strings travel between processes.
+        """
+        if workers == 1 or len(names) <= chunksize:
+            return [self.match(name) for name in names]
+
+        chunks = [names[i : i + chunksize] for i in range(0, len(names), chunksize)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.entries, self.threshold, self.max_candidates),
+        ) as executor:
+            results = []
+            for chunk_result in executor.map(_match_chunk, chunks):
+                results.extend(chunk_result)
+        return results
+
+
+_worker_matcher: Optional[AffiliationMatcher] = None
+
+
+def _init_worker(entries, threshold, max_candidates):
+    global _worker_matcher
+    _worker_matcher = AffiliationMatcher(entries, threshold, max_candidates)
+
+
+def _match_chunk(names: list[str]) -> list[Optional[tuple[int, int]]]:
+    return [_worker_matcher.match(name) for name in names]
+
+
+def benchmark(
+    matcher: AffiliationMatcher,
+    names: list[str],
+    workers: Optional[int] = None,
+    baseline_sample: int = 1000,
+) -> dict:
+    """
+    Compare blocked matching against exhaustive matching.
+
+    Exhaustive matching is quadratic, so the recall baseline is computed on a
+    random sample of at most `baseline_sample` names.
+
+    Returns:
+        dict: matches/sec for both strategies and recall of the blocked matcher
+    """
+    start = time.perf_counter()
+    blocked = matcher.match_many(names, workers=workers)
+    blocked_elapsed = time.perf_counter() - start
+
+    sample_idx = random.Random(0).sample(
+        range(len(names)), min(baseline_sample, len(names))
+    )
+    start = time.perf_counter()
+    exhaustive = [matcher.match_exhaustive(names[i]) for i in sample_idx]
+    exhaustive_elapsed = time.perf_counter() - start
+
+    expected = [(i, e) for i, e in zip(sample_idx, exhaustive) if e is not None]
+    found = sum(
+        1 for i, e in expected if blocked[i] is not None and blocked[i][0] == e[0]
+    )
+
+    return {
+        "queries": len(names),
+        "indexed_names": len(matcher.index),
+        "blocked_matches_per_sec": len(names) / blocked_elapsed if blocked_elapsed else 0.0,
+        "exhaustive_matches_per_sec": (
+            len(sample_idx) / exhaustive_elapsed if exhaustive_elapsed else 0.0
+        ),
+        "matched": sum(1 for r in blocked if r is not None),
+        "recall": found / len(expected) if expected else 1.0,
+    }
+
+
+def _perturb(name: str, rng: random.Random) -> str:
+    """Introduce a small typo so benchmark queries are not exact copies."""
+    if len(name) < 4:
+        return name
+    pos = rng.randrange(len(name))
+    op = rng.choice(("drop", "swap", "dup"))
+    if op == "drop":
+        return name[:pos] + name[pos + 1 :]
+    if op == "swap" and pos < len(name) - 1:
+        return name[:pos] + name[pos + 1] + name[pos] + name[pos + 2 :]
+    return name[:pos] + name[pos] + name[pos:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", help="File with one affiliation string per line")
+    parser.add_argument("--sample", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threshold", type=int, default=85)
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        matcher = AffiliationMatcher.from_session(session, threshold=args.threshold)
+    finally:
+        db.close()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip()]
+    else:
+        rng = random.Random(42)
+        names = [
+            _perturb(rng.choice(matcher.index.texts), rng) for _ in range(args.sample)
+        ]
+
+    for key, value in benchmark(matcher, names, workers=args.workers).items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
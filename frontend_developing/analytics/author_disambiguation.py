@@ -0,0 +1,394 @@
+"""
+Author disambiguation: merge duplicate `author` rows created by imports from
+different conferences ("José García" / "Jose Garcia" / "J. Garcia").
+
+Comparing every author with every other is quadratic. Authors are instead
+blocked by normalized surname and first initial, and only pairs inside a
+block are scored. Evidence comes from three sparse matrices built once for
+the whole corpus:
+
+- author x coauthor (shared coauthors)
+- author x affiliation (shared affiliations)
+- author x keyword, L2-normalized (cosine similarity of research topics)
+
+Scores for all pairs of a chunk of blocks are computed as row-wise sparse
+products across a process pool. Accepted pairs are merged into clusters
+greedily, best score first; a merge is rejected when any two authors across
+the two clusters have incompatible given names or share a paper, so that
+"J. Smith" cannot bridge "John Smith" and "James Smith". Each cluster's most
+published author becomes the canonical id written to
+`author.canonical_author_id`. Work grows with the
+number of authors and links; blocks larger than MAX_BLOCK_SIZE are split by
+full given name, so that no single block goes quadratic.
+
+Usage (from frontend_developing/):
+    python -m analytics.author_disambiguation [--workers 4] [--threshold 0.6] [--dry-run]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select, update
+
+from models import Author, AuthorAffiliation, PaperKeyword, paper_author
+from analytics.citation_graph import normalize_title
+
+MAX_BLOCK_SIZE = 500
+# Papers with more authors than this (consortium papers) say little about
+# who is who and would make the coauthor matrix quadratic in their size.
+MAX_AUTHORS_PER_PAPER = 50
+COAUTHOR_WEIGHT = 0.5
+AFFILIATION_WEIGHT = 0.3
+KEYWORD_WEIGHT = 0.2
+SAME_NAME_BONUS = 0.3  # identical after folding case and diacritics
+INITIAL_NAME_BONUS = 0.1  # compatible, but only through initials
+DEFAULT_THRESHOLD = 0.6
+CHUNK_PAIRS = 200_000  # approximate candidate pairs per worker task
+
+_NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+
+def parse_name(name: Optional[str]) -> tuple[str, list[str]]:
+    """
+    Split an author name into a folded surname and given-name tokens.
+    Accepts "Given Surname" and "Surname, Given".
+    """
+    if not name:
+        return "", []
+    if "," in name:
+        surname, given = name.split(",", 1)
+        tokens = normalize_title(given).split()
+        surname_tokens = normalize_title(surname).split()
+    else:
+        tokens = normalize_title(name).split()
+        tokens = [t for t in tokens if t not in _NAME_SUFFIXES]
+        surname_tokens, tokens = tokens[-1:], tokens[:-1]
+    return "".join(surname_tokens), [t for t in tokens if t not in _NAME_SUFFIXES]
+
+
+def block_key(name: Optional[str]) -> Optional[str]:
+    """Blocking key: folded surname plus first initial, e.g. "garcia|j"."""
+    surname, given = parse_name(name)
+    if not surname or not given:
+        return None
+    return f"{surname}|{given[0][0]}"
+
+
+def names_compatible(a: list[str], b: list[str]) -> bool:
+    """
+    Whether two given-name token lists can belong to one person: spelled-out
+    names must agree, initials must agree with names or other initials.
+    """
+    for x, y in zip(a, b):
+        if len(x) > 1 and len(y) > 1:
+            if x != y:
+                return False
+        elif x[0] != y[0]:
+            return False
+    return True
+
+
+class AuthorFeatures:
+    """Sparse evidence matrices over authors, indexed by position in `author_ids`."""
+
+    def __init__(
+        self,
+        author_ids: np.ndarray,
+        names: list[str],
+        coauthors: sparse.csr_matrix,
+        affiliations: sparse.csr_matrix,
+        keywords: sparse.csr_matrix,
+        paper_counts: np.ndarray,
+    ):
+        self.author_ids = author_ids
+        self.names = names
+        self.given_names = [parse_name(name)[1] for name in names]
+        self.coauthors = coauthors.tocsr()
+        self.affiliations = affiliations.tocsr()
+        self.keywords = keywords.tocsr()
+        self.paper_counts = paper_counts
+
+    @classmethod
+    def build(cls, session) -> "AuthorFeatures":
+        rows = session.execute(
+            select(Author.author_id, Author.name).order_by(Author.author_id)
+        ).all()
+        author_ids = np.array([r.author_id for r in rows], dtype=np.int64)
+        names = [r.name for r in rows]
+        n = len(author_ids)
+
+        authorship = np.array(
+            session.execute(select(paper_author.c.paper_id, paper_author.c.author_id)).all(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        paper_ids, paper_pos = np.unique(authorship[:, 0], return_inverse=True)
+        author_pos = np.searchsorted(author_ids, authorship[:, 1])
+        # paper x author
+        papers = sparse.csr_matrix(
+            (np.ones(len(authorship), dtype=np.float32), (paper_pos, author_pos)),
+            shape=(len(paper_ids), n),
+        )
+        papers.data[:] = 1
+        paper_counts = np.asarray(papers.sum(axis=0)).ravel().astype(np.int64)
+
+        team_size = np.diff(papers.indptr)
+        small = sparse.diags((team_size <= MAX_AUTHORS_PER_PAPER).astype(np.float32))
+        team_papers = (small @ papers).tocsr()
+        coauthors = (team_papers.T @ team_papers).tocsr()
+        coauthors.setdiag(0)
+        coauthors.eliminate_zeros()
+        coauthors.data[:] = 1
+
+        links = np.array(
+            session.execute(
+                select(AuthorAffiliation.author_id, AuthorAffiliation.affiliation_id)
+            ).all(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        _, affiliation_pos = np.unique(links[:, 1], return_inverse=True)
+        affiliations = sparse.csr_matrix(
+            (
+                np.ones(len(links), dtype=np.float32),
+                (np.searchsorted(author_ids, links[:, 0]), affiliation_pos),
+            ),
+            shape=(n, int(affiliation_pos.max()) + 1 if len(links) else 0),
+        )
+
+        tagged = np.array(
+            session.execute(select(PaperKeyword.paper_id, PaperKeyword.keyword_id)).all(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        tagged = tagged[np.isin(tagged[:, 0], paper_ids)]
+        _, keyword_pos = np.unique(tagged[:, 1], return_inverse=True)
+        paper_keywords = sparse.csr_matrix(
+            (
+                np.ones(len(tagged), dtype=np.float32),
+                (np.searchsorted(paper_ids, tagged[:, 0]), keyword_pos),
+            ),
+            shape=(len(paper_ids), int(keyword_pos.max()) + 1 if len(tagged) else 0),
+        )
+        keywords = (papers.T @ paper_keywords).tocsr()
+        norms = np.sqrt(np.asarray(keywords.multiply(keywords).sum(axis=1)).ravel())
+        keywords = sparse.diags(np.divide(1.0, norms, out=np.zeros(n), where=norms > 0)) @ keywords
+
+        return cls(author_ids, names, coauthors, affiliations, keywords, paper_counts)
+
+    def blocks(self) -> list[np.ndarray]:
+        """Author positions grouped by block key; singletons are dropped."""
+        groups = defaultdict(list)
+        for position, name in enumerate(self.names):
+            key = block_key(name)
+            if key is not None:
+                groups[key].append(position)
+
+        blocks = []
+        for members in groups.values():
+            if len(members) > MAX_BLOCK_SIZE:
+                # Common surname/initial ("wang|y"): only fold exact spellings together
+                by_name = defaultdict(list)
+                for position in members:
+                    by_name[" ".join(self.given_names[position])].append(position)
+                blocks.extend(m for m in by_name.values() if 1 < len(m) <= MAX_BLOCK_SIZE)
+            elif len(members) > 1:
+                blocks.append(np.array(members, dtype=np.int64))
+        return [np.asarray(block, dtype=np.int64) for block in blocks]
+
+
+_worker_features: Optional[AuthorFeatures] = None
+
+
+def _init_worker(features: AuthorFeatures):
+    global _worker_features
+    _worker_features = features
+
+
+def score_pairs(features: AuthorFeatures, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Match scores for author pairs (left[k], right[k]), vectorized over all pairs.
+    Authors listed on the same paper are never the same person and score 0.
+    """
+    shared_coauthors = np.asarray(
+        features.coauthors[left].multiply(features.coauthors[right]).sum(axis=1)
+    ).ravel()
+    shared_affiliations = np.asarray(
+        features.affiliations[left].multiply(features.affiliations[right]).sum(axis=1)
+    ).ravel()
+    keyword_similarity = np.asarray(
+        features.keywords[left].multiply(features.keywords[right]).sum(axis=1)
+    ).ravel()
+    coauthored = np.asarray(features.coauthors[left, right]).ravel() > 0
+
+    name_bonus = np.zeros(len(left))
+    for k, (i, j) in enumerate(zip(left, right)):
+        a, b = features.given_names[i], features.given_names[j]
+        if a == b:
+            name_bonus[k] = SAME_NAME_BONUS
+        elif names_compatible(a, b):
+            name_bonus[k] = INITIAL_NAME_BONUS
+        else:
+            name_bonus[k] = -np.inf
+
+    scores = (
+        COAUTHOR_WEIGHT * np.minimum(shared_coauthors, 3) / 3
+        + AFFILIATION_WEIGHT * (shared_affiliations > 0)
+        + KEYWORD_WEIGHT * keyword_similarity
+        + name_bonus
+    )
+    scores[coauthored] = 0
+    return np.maximum(scores, 0)
+
+
+def _score_blocks(blocks: list[np.ndarray], threshold: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Accepted (left, right, score) pairs within a chunk of blocks."""
+    pairs = [block[np.stack(np.triu_indices(len(block), k=1))] for block in blocks]
+    left, right = np.concatenate(pairs, axis=1)
+    scores = score_pairs(_worker_features, left, right)
+    keep = scores >= threshold
+    return left[keep], right[keep], scores[keep]
+
+
+def _chunk_blocks(blocks: list[np.ndarray]) -> list[list[np.ndarray]]:
+    chunks, chunk, size = [], [], 0
+    for block in blocks:
+        chunk.append(block)
+        size += len(block) * (len(block) - 1) // 2
+        if size >= CHUNK_PAIRS:
+            chunks.append(chunk)
+            chunk, size = [], 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _mergeable(features: AuthorFeatures, a: list[int], b: list[int]) -> bool:
+    """Whether two clusters can be one person: all given names compatible, no shared paper."""
+    for i in a:
+        for j in b:
+            if not names_compatible(features.given_names[i], features.given_names[j]):
+                return False
+    return features.coauthors[a][:, b].nnz == 0
+
+
+def cluster(
+    features: AuthorFeatures, left: np.ndarray, right: np.ndarray, scores: np.ndarray
+) -> np.ndarray:
+    """
+    Canonical position of every author. Accepted pairs are merged best score
+    first, skipping merges that `_mergeable` rejects; each cluster is
+    represented by the member with most papers (lowest id on ties).
+    """
+    n = len(features.author_ids)
+    root = np.arange(n)
+    members = {}  # root -> positions, for clusters of more than one author
+
+    def find(i: int) -> int:
+        while root[i] != i:
+            root[i] = root[root[i]]
+            i = root[i]
+        return i
+
+    for k in np.lexsort((right, left, -scores)):
+        a, b = find(left[k]), find(right[k])
+        if a == b:
+            continue
+        in_a, in_b = members.get(a, [a]), members.get(b, [b])
+        if not _mergeable(features, in_a, in_b):
+            continue
+        if len(in_a) < len(in_b):
+            a, b = b, a
+        root[b] = a
+        members[a] = in_a + in_b
+        members.pop(b, None)
+
+    labels = np.arange(n)
+    for label, positions in members.items():
+        labels[positions] = label
+    order = np.lexsort((features.author_ids, -features.paper_counts, labels))
+    first = np.ones(n, dtype=bool)
+    first[1:] = labels[order][1:] != labels[order][:-1]
+    representative = np.empty(n, dtype=np.int64)
+    representative[labels[order][first]] = order[first]
+    return representative[labels]
+
+
+def disambiguate(
+    features: AuthorFeatures,
+    threshold: float = DEFAULT_THRESHOLD,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """Score all blocks in parallel and return the canonical position of every author."""
+    chunks = _chunk_blocks(features.blocks())
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(features)
+        results = [_score_blocks(chunk, threshold) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(features,)
+        ) as executor:
+            results = list(executor.map(_score_blocks, chunks, [threshold] * len(chunks)))
+
+    if results:
+        left, right, scores = (np.concatenate([r[i] for r in results]) for i in range(3))
+    else:
+        left = right = np.zeros(0, dtype=np.int64)
+        scores = np.zeros(0)
+    return cluster(features, left, right, scores)
+
+
+def write_canonical_ids(session, features: AuthorFeatures, canonical: np.ndarray) -> int:
+    """Replace author.canonical_author_id with the new clustering."""
+    merged = np.flatnonzero(canonical != np.arange(len(canonical)))
+    session.execute(
+        update(Author)
+        .where(Author.canonical_author_id.is_not(None))
+        .values(canonical_author_id=None)
+    )
+    if len(merged):
+        session.execute(
+            update(Author),
+            [
+                {
+                    "author_id": int(features.author_ids[i]),
+                    "canonical_author_id": int(features.author_ids[canonical[i]]),
+                }
+                for i in merged
+            ],
+        )
+    session.commit()
+    return len(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge duplicate authors into canonical ids.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--dry-run", action="store_true", help="Report merges without writing")
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        start = time.perf_counter()
+        features = AuthorFeatures.build(session)
+        canonical = disambiguate(features, args.threshold, args.workers)
+        merged = int((canonical != np.arange(len(canonical))).sum())
+        print(
+            f"{len(features.author_ids)} authors, {merged} merged into "
+            f"{len(np.unique(canonical[canonical != np.arange(len(canonical))]))} canonical "
+            f"authors in {time.perf_counter() - start:.1f}s"
+        )
+        if not args.dry_run:
+            write_canonical_ids(session, features, canonical)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
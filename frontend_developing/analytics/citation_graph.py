@@ -0,0 +1,276 @@
+"""
+Citation graph analytics over `paper_reference`.
+
+An offline job loads the reference links into two sparse CSR matrices:
+
+- papers x references incidence, every reference including external ones
+- citing paper x cited paper adjacency, for references whose normalized title
+  matches a paper in the corpus
+
+From these it computes in-corpus citation counts and PageRank, writes them to
+`paper_citation_metric` in bulk, and saves the matrices as an NPZ file.
+Co-citation (AᵀA) and bibliographic coupling (RRᵀ) are never materialized:
+the dashboard computes the row it needs by slicing the loaded matrices.
+
+Usage (from frontend_developing/):
+    python -m analytics.citation_graph [--damping 0.85]
+"""
+
+import argparse
+import os
+import re
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+
+from config import ARTIFACT_DIR
+from models import Paper, PaperCitationMetric, PaperReference, Reference
+
+CITATION_DIR = ARTIFACT_DIR / "citation_graph"
+GRAPH_PATH = CITATION_DIR / "graph.npz"
+RELATED_METRICS = ("cocitation", "coupling")
+WRITE_BATCH_SIZE = 5000
+
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation; used to match references to papers."""
+    if not title:
+        return ""
+    title = unicodedata.normalize("NFKD", title)
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    return _NON_ALNUM_RE.sub(" ", title.lower()).strip()
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest positive scores, best first."""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class CitationGraph:
+    """Sparse citation matrices of the corpus with vectorized graph metrics."""
+
+    def __init__(
+        self,
+        paper_ids: np.ndarray,
+        citations: sparse.csr_matrix,
+        references: sparse.csr_matrix,
+    ):
+        self.paper_ids = paper_ids
+        self.citations = citations.tocsr()  # citing x cited
+        self.references = references.tocsr()  # paper x reference
+        # Transposes for the column slices used by co-citation and coupling
+        self.cited_by = self.citations.T.tocsr()
+        self.referenced_by = self.references.T.tocsr()
+
+    def position(self, paper_id: int) -> Optional[int]:
+        i = np.searchsorted(self.paper_ids, paper_id)
+        if i < len(self.paper_ids) and self.paper_ids[i] == paper_id:
+            return int(i)
+        return None
+
+    @classmethod
+    def build(cls, session) -> "CitationGraph":
+        """Build the matrices from the paper, reference and paper_reference tables."""
+        papers = session.execute(select(Paper.paper_id, Paper.title)).all()
+        paper_ids = np.array(sorted(p.paper_id for p in papers), dtype=np.int64)
+        # Normalized title -> paper position; the lowest paper_id wins on duplicates
+        title_position = {}
+        for paper in sorted(papers, key=lambda p: p.paper_id, reverse=True):
+            title_position[normalize_title(paper.title)] = int(
+                np.searchsorted(paper_ids, paper.paper_id)
+            )
+        title_position.pop("", None)
+
+        references = session.execute(select(Reference.reference_id, Reference.title)).all()
+        reference_ids = np.array([r.reference_id for r in references], dtype=np.int64)
+        order = np.argsort(reference_ids)
+        reference_ids = reference_ids[order]
+        # Reference position -> paper position of the referenced paper, or -1
+        reference_paper = np.array(
+            [title_position.get(normalize_title(references[i].title), -1) for i in order],
+            dtype=np.int64,
+        )
+
+        links = np.array(
+            session.execute(
+                select(PaperReference.paper_id, PaperReference.reference_id)
+            ).all(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        citing = np.searchsorted(paper_ids, links[:, 0])
+        reference = np.searchsorted(reference_ids, links[:, 1])
+
+        incidence = sparse.csr_matrix(
+            (np.ones(len(links), dtype=np.float32), (citing, reference)),
+            shape=(len(paper_ids), len(reference_ids)),
+        )
+        incidence.sum_duplicates()
+        incidence.data[:] = 1
+
+        cited = reference_paper[reference] if len(reference) else reference
+        keep = (cited >= 0) & (cited != citing)  # in-corpus, no self-citations
+        adjacency = sparse.csr_matrix(
+            (np.ones(int(keep.sum()), dtype=np.float32), (citing[keep], cited[keep])),
+            shape=(len(paper_ids), len(paper_ids)),
+        )
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1
+        return cls(paper_ids, adjacency, incidence)
+
+    def citation_counts(self) -> np.ndarray:
+        """In-corpus citations of each paper: the column sums of the adjacency."""
+        return np.asarray(self.citations.sum(axis=0)).ravel().astype(np.int64)
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+        """
+        PageRank by power iteration. Papers citing nothing in the corpus
+        spread their rank uniformly, so the ranks always sum to one.
+        """
+        n = len(self.paper_ids)
+        if n == 0:
+            return np.zeros(0)
+        out_degree = np.asarray(self.citations.sum(axis=1)).ravel()
+        dangling = out_degree == 0
+        inv_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+        # Column-stochastic transition, applied as cited_by @ (rank / out_degree)
+        transition = self.cited_by
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = transition @ (rank * inv_degree)
+            new_rank = damping * (spread + rank[dangling].sum() / n) + (1 - damping) / n
+            if np.abs(new_rank - rank).sum() < tol:
+                return new_rank
+            rank = new_rank
+        return rank
+
+    def related(self, paper_id: int, k: int = 5, metric: str = "cocitation") -> list[tuple[int, float]]:
+        """
+        Top-k papers related to `paper_id` by citation.
+
+        Args:
+            paper_id (int): Paper to look up
+            k (int): Number of related papers to return
+            metric (str): "cocitation" (cited together by the same papers) or
+                "coupling" (bibliographic coupling: sharing references)
+
+        Returns:
+            list: (paper_id, shared count) tuples, best first
+        """
+        if metric not in RELATED_METRICS:
+            raise ValueError(f"Unknown metric {metric}, expected one of {RELATED_METRICS}")
+        row = self.position(paper_id)
+        if row is None:
+            return []
+
+        if metric == "cocitation":
+            # Papers citing this one, then everything those papers cite
+            citers = self.cited_by.indices[self.cited_by.indptr[row] : self.cited_by.indptr[row + 1]]
+            scores = np.asarray(self.citations[citers].sum(axis=0)).ravel()
+        else:
+            # References of this paper, then every paper citing those references
+            refs = self.references.indices[self.references.indptr[row] : self.references.indptr[row + 1]]
+            scores = np.asarray(self.referenced_by[refs].sum(axis=0)).ravel()
+        scores[row] = 0
+        return [(int(self.paper_ids[i]), float(scores[i])) for i in _top_k(scores, k)]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            paper_ids=self.paper_ids,
+            citations_data=self.citations.data,
+            citations_indices=self.citations.indices,
+            citations_indptr=self.citations.indptr,
+            references_data=self.references.data,
+            references_indices=self.references.indices,
+            references_indptr=self.references.indptr,
+            references_shape=np.array(self.references.shape),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CitationGraph":
+        with np.load(path) as f:
+            n = len(f["paper_ids"])
+            citations = sparse.csr_matrix(
+                (f["citations_data"], f["citations_indices"], f["citations_indptr"]),
+                shape=(n, n),
+            )
+            references = sparse.csr_matrix(
+                (f["references_data"], f["references_indices"], f["references_indptr"]),
+                shape=tuple(f["references_shape"]),
+            )
+            return cls(f["paper_ids"], citations, references)
+
+
+def write_metrics(session, graph: CitationGraph, damping: float = 0.85) -> int:
+    """Replace paper_citation_metric with freshly computed counts and PageRank."""
+    counts = graph.citation_counts()
+    ranks = graph.pagerank(damping)
+    computed_at = datetime.now()
+    rows = [
+        {
+            "paper_id": int(paper_id),
+            "in_corpus_citations": int(count),
+            "pagerank": float(rank),
+            "computed_at": computed_at,
+        }
+        for paper_id, count, rank in zip(graph.paper_ids, counts, ranks)
+    ]
+    session.execute(delete(PaperCitationMetric))
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        session.execute(insert(PaperCitationMetric), rows[start : start + WRITE_BATCH_SIZE])
+    session.commit()
+    return len(rows)
+
+
+# path -> (mtime, graph); reloaded when the job rewrites the file
+_loaded: dict[Path, tuple[float, CitationGraph]] = {}
+
+
+def load_citation_graph(path: Path = GRAPH_PATH) -> Optional[CitationGraph]:
+    """Return the in-memory citation graph, or None if it has not been built."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, CitationGraph.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the citation graph and its metrics.")
+    parser.add_argument("--damping", type=float, default=0.85, help="PageRank damping factor")
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        graph = CitationGraph.build(session)
+        written = write_metrics(session, graph, args.damping)
+        graph.save(GRAPH_PATH)
+        print(
+            f"{len(graph.paper_ids)} papers, {graph.references.shape[1]} references, "
+            f"{graph.citations.nnz} in-corpus citations; {written} metric rows written"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Precomputed organization x organization and author x author collaboration
+networks.
+
+For each conference instance an offline job builds the sparse paper x author
+incidence P from `paper_author` and the author x organization incidence M
+from `author_affiliation`. Two Gram products then give the networks:
+
+- authors:       PᵀP, the papers each pair of authors wrote together
+- organizations: QᵀQ with Q = (P M > 0), the papers each pair of
+                 organizations share
+
+Duplicate authors are folded into their canonical author (see
+author_disambiguation), and affiliations of a tracked organization are
+folded into that organization, so node weights count distinct papers. Edges
+are stored as (id, id, weight) triplets, not matrix positions, so the
+networks of several instances can be summed for a conference and year range
+without touching the database. Pages then keep only the top-weighted edges
+before running a layout.
+
+Usage (from frontend_developing/):
+    python -m analytics.collaboration_network [--instance 3 ...]
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+
+from config import ARTIFACT_DIR
+from models import (
+    Affiliation,
+    Author,
+    AuthorAffiliation,
+    ConferenceInstance,
+    Paper,
+    TrackedOrganization,
+    paper_author,
+)
+from analytics.author_disambiguation import MAX_AUTHORS_PER_PAPER
+
+COLLABORATION_DIR = ARTIFACT_DIR / "collaboration_network"
+KINDS = ("organization", "author")
+
+
+def artifact_path(instance_id: int) -> Path:
+    return COLLABORATION_DIR / f"instance_{instance_id}.npz"
+
+
+def _symmetric(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, n: int) -> sparse.csr_matrix:
+    """Symmetric n x n matrix from upper-triangle entries; repeated pairs are summed."""
+    return sparse.csr_matrix(
+        (
+            np.concatenate([weights, weights]),
+            (np.concatenate([rows, cols]), np.concatenate([cols, rows])),
+        ),
+        shape=(n, n),
+    )
+
+
+class CollaborationNetwork:
+    """Weighted undirected network: node ids, labels, paper counts and a symmetric edge matrix."""
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        labels: np.ndarray,
+        papers: np.ndarray,
+        edges: sparse.csr_matrix,
+    ):
+        self.node_ids = node_ids
+        self.labels = labels
+        self.papers = papers
+        self.edges = edges.tocsr()
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @classmethod
+    def from_incidence(
+        cls, node_ids: np.ndarray, labels: np.ndarray, incidence: sparse.csr_matrix
+    ) -> "CollaborationNetwork":
+        """Network of the columns of a binary paper x node incidence matrix."""
+        gram = (incidence.T @ incidence).tocsr()
+        papers = gram.diagonal().astype(np.int64)
+        gram.setdiag(0)
+        gram.eliminate_zeros()
+        return cls(node_ids, labels, papers, gram)
+
+    def triplets(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Upper-triangle edges as (source id, target id, weight) arrays."""
+        upper = sparse.triu(self.edges, k=1).tocoo()
+        return self.node_ids[upper.row], self.node_ids[upper.col], upper.data
+
+    @classmethod
+    def combine(cls, networks: list["CollaborationNetwork"]) -> "CollaborationNetwork":
+        """Sum networks over different papers (e.g. several conference instances)."""
+        all_ids = np.concatenate([n.node_ids for n in networks])
+        node_ids, first, position = np.unique(all_ids, return_index=True, return_inverse=True)
+        labels = np.concatenate([n.labels for n in networks])[first]
+        papers = np.zeros(len(node_ids), dtype=np.int64)
+        np.add.at(papers, position, np.concatenate([n.papers for n in networks]))
+
+        sources, targets, weights = zip(*(n.triplets() for n in networks))
+        rows = np.searchsorted(node_ids, np.concatenate(sources))
+        cols = np.searchsorted(node_ids, np.concatenate(targets))
+        weights = np.concatenate(weights)
+        return cls(node_ids, labels, papers, _symmetric(rows, cols, weights, len(node_ids)))
+
+    def top_edges(self, max_edges: int, focus: Optional[Iterable] = None) -> dict:
+        """
+        The `max_edges` heaviest edges, optionally only those touching `focus`
+        node ids, with the nodes they connect.
+
+        Returns:
+            dict: {"nodes": [{"id", "label", "papers"}], "edges": [{"source", "target", "weight"}]},
+            the format of Organization._create_collaboration_network
+        """
+        upper = sparse.triu(self.edges, k=1).tocoo()
+        rows, cols, weights = upper.row, upper.col, upper.data
+        if focus is not None:
+            focused = np.isin(self.node_ids, np.asarray(list(focus), dtype=self.node_ids.dtype))
+            keep = focused[rows] | focused[cols]
+            rows, cols, weights = rows[keep], cols[keep], weights[keep]
+        if len(weights) > max_edges:
+            top = np.argpartition(-weights, max_edges - 1)[:max_edges]
+            rows, cols, weights = rows[top], cols[top], weights[top]
+        order = np.argsort(-weights, kind="stable")
+        rows, cols, weights = rows[order], cols[order], weights[order]
+
+        nodes = np.unique(np.concatenate([rows, cols]))
+        return {
+            "nodes": [
+                {
+                    "id": str(self.node_ids[i]),
+                    "label": str(self.labels[i]),
+                    "papers": int(self.papers[i]),
+                }
+                for i in nodes
+            ],
+            "edges": [
+                {
+                    "source": str(self.node_ids[r]),
+                    "target": str(self.node_ids[c]),
+                    "weight": int(w),
+                }
+                for r, c, w in zip(rows, cols, weights)
+            ],
+        }
+
+
+class InstanceNetworks:
+    """Both networks of one conference instance plus author -> organization membership."""
+
+    def __init__(
+        self,
+        organizations: CollaborationNetwork,
+        authors: CollaborationNetwork,
+        member_authors: np.ndarray,
+        member_organizations: np.ndarray,
+    ):
+        self.organizations = organizations
+        self.authors = authors
+        self.member_authors = member_authors
+        self.member_organizations = member_organizations
+
+    @classmethod
+    def build(cls, session, instance_id: int) -> "InstanceNetworks":
+        canonical_id = func.coalesce(Author.canonical_author_id, Author.author_id)
+        authorship = np.array(
+            session.execute(
+                select(paper_author.c.paper_id, canonical_id)
+                .join(Author, Author.author_id == paper_author.c.author_id)
+                .join(Paper, Paper.paper_id == paper_author.c.paper_id)
+                .where(Paper.instance_id == instance_id)
+            ).all(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        paper_ids, paper_pos = np.unique(authorship[:, 0], return_inverse=True)
+        author_ids, author_pos = np.unique(authorship[:, 1], return_inverse=True)
+        papers = sparse.csr_matrix(
+            (np.ones(len(authorship), dtype=np.float32), (paper_pos, author_pos)),
+            shape=(len(paper_ids), len(author_ids)),
+        )
+        papers.data[:] = 1  # merged duplicate authors count once per paper
+
+        names = dict(
+            session.execute(
+                select(Author.author_id, Author.name).where(
+                    Author.author_id.in_(author_ids.tolist())
+                )
+            ).all()
+        )
+        author_labels = np.array([names.get(int(a), "") for a in author_ids], dtype=str)
+        team_size = np.diff(papers.indptr)
+        team_papers = sparse.diags((team_size <= MAX_AUTHORS_PER_PAPER).astype(np.float32)) @ papers
+        authors = CollaborationNetwork.from_incidence(author_ids, author_labels, team_papers.tocsr())
+        authors.papers = np.asarray(papers.sum(axis=0)).ravel().astype(np.int64)
+
+        # Tracked organizations stand in for all of their affiliation rows
+        organization = func.coalesce(TrackedOrganization.organization, Affiliation.name)
+        membership = session.execute(
+            select(canonical_id, organization)
+            .select_from(AuthorAffiliation)
+            .join(Author, Author.author_id == AuthorAffiliation.author_id)
+            .join(Affiliation, Affiliation.affiliation_id == AuthorAffiliation.affiliation_id)
+            .outerjoin(
+                TrackedOrganization,
+                TrackedOrganization.affiliation_id == AuthorAffiliation.affiliation_id,
+            )
+            .where(canonical_id.in_(author_ids.tolist()))
+            .distinct()
+        ).all()
+        member_authors = np.array([m[0] for m in membership], dtype=np.int64)
+        member_organizations = np.array([m[1] for m in membership], dtype=str)
+        org_ids, org_pos = np.unique(member_organizations, return_inverse=True)
+        members = sparse.csr_matrix(
+            (
+                np.ones(len(membership), dtype=np.float32),
+                (np.searchsorted(author_ids, member_authors), org_pos),
+            ),
+            shape=(len(author_ids), len(org_ids)),
+        )
+        paper_orgs = (papers @ members).tocsr()
+        paper_orgs.data[:] = 1
+        organizations = CollaborationNetwork.from_incidence(org_ids, org_ids, paper_orgs)
+
+        return cls(organizations, authors, member_authors, member_organizations)
+
+    def network(self, kind: str) -> CollaborationNetwork:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown network {kind}, expected one of {KINDS}")
+        return self.organizations if kind == "organization" else self.authors
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "member_authors": self.member_authors,
+            "member_organizations": self.member_organizations,
+        }
+        for kind in KINDS:
+            network = self.network(kind)
+            sources, targets, weights = network.triplets()
+            arrays.update(
+                {
+                    f"{kind}_ids": network.node_ids,
+                    f"{kind}_labels": network.labels,
+                    f"{kind}_papers": network.papers,
+                    f"{kind}_sources": sources,
+                    f"{kind}_targets": targets,
+                    f"{kind}_weights": weights,
+                }
+            )
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "InstanceNetworks":
+        with np.load(path) as f:
+            networks = {}
+            for kind in KINDS:
+                node_ids = f[f"{kind}_ids"]
+                rows = np.searchsorted(node_ids, f[f"{kind}_sources"])
+                cols = np.searchsorted(node_ids, f[f"{kind}_targets"])
+                edges = _symmetric(rows, cols, f[f"{kind}_weights"], len(node_ids))
+                networks[kind] = CollaborationNetwork(
+                    node_ids, f[f"{kind}_labels"], f[f"{kind}_papers"], edges
+                )
+            return cls(
+                networks["organization"],
+                networks["author"],
+                f["member_authors"],
+                f["member_organizations"],
+            )
+
+
+# path -> (mtime, networks); reloaded when the job rewrites the file
+_loaded: dict[Path, tuple[float, InstanceNetworks]] = {}
+
+
+def load_instance_networks(instance_id: int) -> Optional[InstanceNetworks]:
+    """Return the in-memory networks of an instance, or None if they have not been built."""
+    path = artifact_path(instance_id)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, InstanceNetworks.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+
+def collaboration_network(
+    kind: str,
+    instance_ids: Iterable[int],
+    max_edges: int,
+    organization: Optional[str] = None,
+) -> dict:
+    """
+    Top edges of the network summed over `instance_ids`. With `organization`,
+    only edges of that organization (kind "organization") or of its authors
+    (kind "author") are kept. Instances without a built artifact are skipped.
+    """
+    loaded = [load_instance_networks(i) for i in instance_ids]
+    loaded = [networks for networks in loaded if networks is not None]
+    if not loaded:
+        return {"nodes": [], "edges": []}
+    network = CollaborationNetwork.combine([networks.network(kind) for networks in loaded])
+
+    focus = None
+    if organization is not None:
+        if kind == "organization":
+            focus = [organization]
+        else:
+            focus = np.unique(
+                np.concatenate(
+                    [n.member_authors[n.member_organizations == organization] for n in loaded]
+                )
+            )
+    return network.top_edges(max_edges, focus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build collaboration networks per conference instance.")
+    parser.add_argument("--instance", type=int, action="append", default=[], help="Default: all instances")
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        instances = args.instance or [
+            i for (i,) in session.query(ConferenceInstance.instance_id).all()
+        ]
+        for instance_id in sorted(set(instances)):
+            networks = InstanceNetworks.build(session, instance_id)
+            path = artifact_path(instance_id)
+            networks.save(path)
+            print(
+                f"{path.name}: {len(networks.organizations)} organizations, "
+                f"{networks.organizations.edges.nnz // 2} organization edges, "
+                f"{len(networks.authors)} authors, {networks.authors.edges.nnz // 2} author edges"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Precomputed keyword x keyword co-occurrence matrix.
+
+An offline job builds a sparse, symmetric co-occurrence matrix from
+`paper_keyword`, either over the whole corpus or scoped to one conference
+instance or year, and stores it as a compressed NPZ file. The diagonal holds
+each keyword's paper count, which is all PMI and Jaccard scoring needs.
+Related-keyword lookups then slice one CSR row in memory.
+
+Every run builds the corpus-wide matrix plus one per requested instance and
+one per requested year. Explicit --instance and --year values are also
+combined into instance-and-year scopes.
+
+Usage (from frontend_developing/):
+    python -m analytics.keyword_cooccurrence [--all-instances] [--all-years]
+    python -m analytics.keyword_cooccurrence --instance 3 --year 2024
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+
+from config import ARTIFACT_DIR
+from models import ConferenceInstance, Keyword, Paper, PaperKeyword
+
+COOCCURRENCE_DIR = ARTIFACT_DIR / "keyword_cooccurrence"
+METRICS = ("count", "jaccard", "pmi")
+
+
+def scope_name(instance_id: Optional[int] = None, year: Optional[int] = None) -> str:
+    """Name of the artifact for a scope: all, instance_<id>, year_<year> or both."""
+    parts = []
+    if instance_id is not None:
+        parts.append(f"instance_{instance_id}")
+    if year is not None:
+        parts.append(f"year_{year}")
+    return "_".join(parts) or "all"
+
+
+def artifact_path(instance_id: Optional[int] = None, year: Optional[int] = None) -> Path:
+    return COOCCURRENCE_DIR / f"{scope_name(instance_id, year)}.npz"
+
+
+class KeywordCooccurrence:
+    """Sparse keyword co-occurrence matrix with top-k related-keyword lookups."""
+
+    def __init__(
+        self,
+        keyword_ids: np.ndarray,
+        keywords: np.ndarray,
+        matrix: sparse.csr_matrix,
+        paper_count: int,
+    ):
+        self.keyword_ids = keyword_ids
+        self.keywords = keywords
+        self.matrix = matrix.tocsr()
+        self.paper_count = paper_count
+        self.doc_freq = self.matrix.diagonal().astype(np.float64)
+        self._position = {kw: i for i, kw in enumerate(keywords.tolist())}
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self._position
+
+    @classmethod
+    def build(
+        cls, session, instance_id: Optional[int] = None, year: Optional[int] = None
+    ) -> "KeywordCooccurrence":
+        """Build the matrix for a scope from the paper_keyword table."""
+        stmt = select(PaperKeyword.paper_id, PaperKeyword.keyword_id)
+        if instance_id is not None or year is not None:
+            stmt = stmt.join(Paper, Paper.paper_id == PaperKeyword.paper_id)
+            if instance_id is not None:
+                stmt = stmt.where(Paper.instance_id == instance_id)
+            if year is not None:
+                stmt = stmt.where(Paper.year == year)
+
+        rows = np.array(session.execute(stmt).all(), dtype=np.int64).reshape(-1, 2)
+        paper_ids, paper_idx = np.unique(rows[:, 0], return_inverse=True)
+        keyword_ids, keyword_idx = np.unique(rows[:, 1], return_inverse=True)
+
+        # papers x keywords incidence; its Gram matrix counts shared papers
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (paper_idx, keyword_idx)),
+            shape=(len(paper_ids), len(keyword_ids)),
+        )
+        incidence.data[:] = 1  # duplicate (paper, keyword) rows count once
+        matrix = (incidence.T @ incidence).tocsr()
+        matrix.sort_indices()
+
+        names = dict(
+            session.execute(
+                select(Keyword.keyword_id, Keyword.keyword).where(
+                    Keyword.keyword_id.in_(keyword_ids.tolist())
+                )
+            ).all()
+        )
+        keywords = np.array([names.get(int(k), "") for k in keyword_ids], dtype=str)
+        return cls(keyword_ids, keywords, matrix, len(paper_ids))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            keyword_ids=self.keyword_ids,
+            keywords=self.keywords,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            paper_count=np.array(self.paper_count),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "KeywordCooccurrence":
+        with np.load(path) as f:
+            matrix = sparse.csr_matrix(
+                (f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"])
+            )
+            return cls(f["keyword_ids"], f["keywords"], matrix, int(f["paper_count"]))
+
+    def related(
+        self, keyword: str, k: int = 5, metric: str = "count", min_count: int = 1
+    ) -> list[tuple[str, float]]:
+        """
+        Top-k keywords co-occurring with `keyword`.
+
+        Args:
+            keyword (str): Keyword to look up
+            k (int): Number of related keywords to return
+            metric (str): "count" (shared papers), "jaccard" or "pmi"
+            min_count (int): Ignore pairs sharing fewer papers; PMI is noisy for rare pairs
+
+        Returns:
+            list: (keyword, score) tuples, best first
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric}, expected one of {METRICS}")
+        row = self._position.get(keyword)
+        if row is None:
+            return []
+
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        cols = self.matrix.indices[start:end]
+        counts = self.matrix.data[start:end].astype(np.float64)
+        keep = (cols != row) & (counts >= min_count)
+        cols, counts = cols[keep], counts[keep]
+        if not len(cols):
+            return []
+
+        if metric == "count":
+            scores = counts
+        elif metric == "jaccard":
+            scores = counts / (self.doc_freq[row] + self.doc_freq[cols] - counts)
+        else:
+            scores = np.log(
+                counts * self.paper_count / (self.doc_freq[row] * self.doc_freq[cols])
+            )
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(str(self.keywords[cols[i]]), float(scores[i])) for i in top]
+
+
+# path -> (mtime, matrix); reloaded when the job rewrites the file
+_loaded: dict[Path, tuple[float, KeywordCooccurrence]] = {}
+
+
+def load_cooccurrence(
+    instance_id: Optional[int] = None, year: Optional[int] = None
+) -> Optional[KeywordCooccurrence]:
+    """Return the in-memory matrix for a scope, or None if it has not been built."""
+    path = artifact_path(instance_id, year)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, KeywordCooccurrence.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build keyword co-occurrence matrices.")
+    parser.add_argument("--instance", type=int, action="append", default=[])
+    parser.add_argument("--year", type=int, action="append", default=[])
+    parser.add_argument("--all-instances", action="store_true")
+    parser.add_argument("--all-years", action="store_true")
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        instances = list(args.instance)
+        years = list(args.year)
+        if args.all_instances:
+            instances += [
+                i for (i,) in session.query(ConferenceInstance.instance_id).all()
+            ]
+        if args.all_years:
+            years += [
+                y for (y,) in session.query(Paper.year).distinct().all() if y is not None
+            ]
+
+        scopes = [(None, None)]
+        scopes += [(instance_id, None) for instance_id in sorted(set(instances))]
+        scopes += [(None, year) for year in sorted(set(years))]
+        scopes += [
+            (instance_id, year)
+            for instance_id in sorted(set(args.instance))
+            for year in sorted(set(args.year))
+        ]
+        for instance_id, year in scopes:
+            matrix = KeywordCooccurrence.build(session, instance_id, year)
+            path = artifact_path(instance_id, year)
+            matrix.save(path)
+            print(
+                f"{path.name}: {len(matrix.keywords)} keywords, "
+                f"{matrix.matrix.nnz} non-zero pairs, {matrix.paper_count} papers"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Precomputed keyword x year x conference paper counts and trend analytics.
+
+An offline job counts papers per (keyword, year, conference) from
+`paper_keyword` joined to `paper.year` and stores them as one dense array in
+a compressed NPZ file, in the smallest unsigned dtype that holds the largest
+count. Keywords used by fewer than MIN_TOTAL_PAPERS papers are left out.
+The papers per (year, conference) are stored too, so trends can be expressed
+as shares that do not just follow a conference's growth.
+
+Everything the keyword overview shows comes from vectorized operations over
+the whole keyword axis at once:
+
+- growth: smoothed relative change of the count against the previous year
+- rank change: year-over-year change of each keyword's rank by count
+- burst: z-score of this year's share against the keyword's earlier years
+- new: first year with any paper
+
+Usage (from frontend_developing/):
+    python -m analytics.keyword_trends
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from config import ARTIFACT_DIR
+from models import Conference, ConferenceInstance, Keyword, Paper, PaperKeyword
+
+TRENDS_PATH = ARTIFACT_DIR / "keyword_trends.npz"
+MIN_TOTAL_PAPERS = 2
+BURST_Z = 2.0
+BURST_MIN_PAPERS = 3
+GROWTH_MIN_PAPERS = 5  # previous-year count below which growth rates are noise
+
+
+def _compact_dtype(max_value: int):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+class KeywordTrends:
+    """Dense keyword x year x conference counts with vectorized trend metrics."""
+
+    def __init__(
+        self,
+        keywords: np.ndarray,
+        years: np.ndarray,
+        conferences: np.ndarray,
+        counts: np.ndarray,
+        paper_counts: np.ndarray,
+    ):
+        self.keywords = keywords
+        self.years = years
+        self.conferences = conferences
+        self.counts = counts  # keyword x year x conference
+        self.paper_counts = paper_counts  # year x conference
+        self._keyword_position = {kw: i for i, kw in enumerate(keywords.tolist())}
+        self._conference_position = {c: i for i, c in enumerate(conferences.tolist())}
+
+    @classmethod
+    def build(cls, session, min_total: int = MIN_TOTAL_PAPERS) -> "KeywordTrends":
+        """Count papers per keyword, year and conference."""
+        papers = (
+            select(Paper.paper_id, Paper.year, Conference.name.label("conference"))
+            .join(ConferenceInstance, ConferenceInstance.instance_id == Paper.instance_id)
+            .join(Conference, Conference.conference_id == ConferenceInstance.conference_id)
+            .where(Paper.year.is_not(None))
+            .subquery()
+        )
+        paper_rows = session.execute(
+            select(papers.c.year, papers.c.conference, func.count())
+            .group_by(papers.c.year, papers.c.conference)
+        ).all()
+        keyword_rows = session.execute(
+            select(
+                PaperKeyword.keyword_id,
+                papers.c.year,
+                papers.c.conference,
+                func.count(func.distinct(PaperKeyword.paper_id)),
+            )
+            .join(papers, papers.c.paper_id == PaperKeyword.paper_id)
+            .group_by(PaperKeyword.keyword_id, papers.c.year, papers.c.conference)
+        ).all()
+
+        years = np.array(sorted({r[0] for r in paper_rows}), dtype=np.int64)
+        conferences = np.array(sorted({r[1] for r in paper_rows}), dtype=str)
+        paper_counts = np.zeros((len(years), len(conferences)), dtype=np.int64)
+        if paper_rows:
+            year_idx = np.searchsorted(years, [r[0] for r in paper_rows])
+            conf_idx = np.searchsorted(conferences, [r[1] for r in paper_rows])
+            paper_counts[year_idx, conf_idx] = [r[2] for r in paper_rows]
+
+        rows = np.array(
+            [(r[0], r[1], r[3]) for r in keyword_rows], dtype=np.int64
+        ).reshape(-1, 3)
+        row_conferences = np.array([r[2] for r in keyword_rows], dtype=str)
+        keyword_ids, keyword_idx = np.unique(rows[:, 0], return_inverse=True)
+        counts = np.zeros((len(keyword_ids), len(years), len(conferences)), dtype=np.int64)
+        counts[
+            keyword_idx,
+            np.searchsorted(years, rows[:, 1]),
+            np.searchsorted(conferences, row_conferences),
+        ] = rows[:, 2]
+
+        keep = counts.sum(axis=(1, 2)) >= min_total
+        keyword_ids, counts = keyword_ids[keep], counts[keep]
+        names = dict(
+            session.execute(
+                select(Keyword.keyword_id, Keyword.keyword).where(
+                    Keyword.keyword_id.in_(keyword_ids.tolist())
+                )
+            ).all()
+        )
+        keywords = np.array([names.get(int(k), "") for k in keyword_ids], dtype=str)
+        counts = counts.astype(_compact_dtype(int(counts.max()) if counts.size else 0))
+        return cls(keywords, years, conferences, counts, paper_counts)
+
+    def save(self, path: Path = TRENDS_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            keywords=self.keywords,
+            years=self.years,
+            conferences=self.conferences,
+            counts=self.counts,
+            paper_counts=self.paper_counts,
+        )
+
+    @classmethod
+    def load(cls, path: Path = TRENDS_PATH) -> "KeywordTrends":
+        with np.load(path) as f:
+            return cls(
+                f["keywords"], f["years"], f["conferences"], f["counts"], f["paper_counts"]
+            )
+
+    # ------------------------------------------------------------------ #
+    #                            Array slicing                            #
+    # ------------------------------------------------------------------ #
+    def series(self, conference: Optional[str] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Keyword x year paper counts and the papers per year, for one conference
+        or summed over all of them.
+        """
+        if conference is None:
+            return self.counts.sum(axis=2, dtype=np.int64), self.paper_counts.sum(axis=1)
+        c = self._conference_position.get(conference)
+        if c is None:
+            return np.zeros(self.counts.shape[:2], dtype=np.int64), np.zeros(len(self.years), dtype=np.int64)
+        return self.counts[:, :, c].astype(np.int64), self.paper_counts[:, c]
+
+    def year_position(self, year: Optional[int]) -> int:
+        """Column of `year`; the latest year when None."""
+        if year is None:
+            return len(self.years) - 1
+        position = int(np.searchsorted(self.years, year))
+        if position >= len(self.years) or self.years[position] != year:
+            raise ValueError(f"No keyword data for {year}")
+        return position
+
+    def keyword_series(self, keywords: list[str], conference: Optional[str] = None) -> dict:
+        """{keyword: {"years", "counts"}} for the given keywords."""
+        counts, _ = self.series(conference)
+        years = self.years.tolist()
+        return {
+            kw: {"years": years, "counts": counts[self._keyword_position[kw]].tolist()}
+            for kw in keywords
+            if kw in self._keyword_position
+        }
+
+    # ------------------------------------------------------------------ #
+    #                       Vectorized trend metrics                      #
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def growth_rates(counts: np.ndarray, y: int) -> np.ndarray:
+        """Add-one smoothed relative change against the previous year, per keyword."""
+        if y == 0:
+            return np.zeros(len(counts))
+        return (counts[:, y] + 1) / (counts[:, y - 1] + 1) - 1
+
+    @staticmethod
+    def ranks(counts: np.ndarray) -> np.ndarray:
+        """Rank of every keyword in every year: 1 + the number of keywords with more papers."""
+        ranks = np.empty(counts.shape, dtype=np.int64)
+        for y in range(counts.shape[1]):
+            column = np.sort(counts[:, y])
+            ranks[:, y] = len(counts) - np.searchsorted(column, counts[:, y], side="right") + 1
+        return ranks
+
+    @staticmethod
+    def burst_scores(counts: np.ndarray, papers: np.ndarray, y: int) -> np.ndarray:
+        """z-score of the year-y share against each keyword's earlier years."""
+        if y < 2:
+            return np.zeros(len(counts))
+        shares = counts[:, : y + 1] / np.maximum(papers[: y + 1], 1)
+        history = shares[:, :y]
+        spread = history.std(axis=1)
+        # Floor the spread so a keyword flat at zero does not divide by zero
+        floor = 1 / max(int(papers[y]), 1)
+        return (shares[:, y] - history.mean(axis=1)) / np.maximum(spread, floor)
+
+    def first_seen(self, counts: np.ndarray) -> np.ndarray:
+        """First year with any paper, per keyword."""
+        return self.years[np.argmax(counts > 0, axis=1)]
+
+    def overview(
+        self, year: Optional[int] = None, conference: Optional[str] = None, limit: int = 10
+    ) -> dict:
+        """
+        Everything the keyword overview page shows, for one year.
+
+        Returns:
+            dict: keywords, trending, new_keywords, hottest_topic, trends,
+            growth_rates, rank_changes and emerging, in the page's format
+        """
+        counts, papers = self.series(conference)
+        y = self.year_position(year)
+        current = counts[:, y]
+        active = current > 0
+
+        growth = self.growth_rates(counts, y)
+        bursts = self.burst_scores(counts, papers, y)
+        first_seen = self.first_seen(counts)
+        ranks = self.ranks(counts)
+
+        def top(scores: np.ndarray, mask: np.ndarray) -> np.ndarray:
+            candidates = np.flatnonzero(mask)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        hottest = top(current.astype(np.float64), active)
+        trending = top(bursts, active & (bursts >= BURST_Z) & (current >= BURST_MIN_PAPERS))
+        previous = counts[:, y - 1] if y > 0 else np.zeros_like(current)
+        growing = top(growth, active & (previous >= GROWTH_MIN_PAPERS))
+        is_new = active & (first_seen == self.years[y])
+        # Appeared within the two years before this one and still growing
+        recent = active & (first_seen >= self.years[max(0, y - 2)]) & (first_seen < self.years[y])
+        emerging = top(growth, recent & (growth > 0))
+        rank_change = ranks[:, y - 1] - ranks[:, y] if y > 0 else np.zeros(len(counts), dtype=np.int64)
+        climbers = top(rank_change.astype(np.float64), active & (rank_change > 0))
+
+        return {
+            "year": int(self.years[y]),
+            "keywords": int(active.sum()),
+            "trending": [str(self.keywords[i]) for i in trending],
+            "new_keywords": int(is_new.sum()),
+            "hottest_topic": str(self.keywords[hottest[0]]) if len(hottest) else None,
+            "trends": self.keyword_series(
+                [str(self.keywords[i]) for i in hottest[:5]], conference
+            ),
+            "growth_rates": [
+                {"keyword": str(self.keywords[i]), "growth_rate": round(100 * float(growth[i]))}
+                for i in growing
+            ],
+            "rank_changes": [
+                {
+                    "keyword": str(self.keywords[i]),
+                    "rank": int(ranks[i, y]),
+                    "change": int(rank_change[i]),
+                }
+                for i in climbers
+            ],
+            "emerging": [
+                {
+                    "name": str(self.keywords[i]),
+                    "growth_rate": round(100 * float(growth[i])),
+                    "first_seen": int(first_seen[i]),
+                }
+                for i in emerging[:5]
+            ],
+        }
+
+
+# path -> (mtime, trends); reloaded when the job rewrites the file
+_loaded: dict[Path, tuple[float, KeywordTrends]] = {}
+
+
+def load_keyword_trends(path: Path = TRENDS_PATH) -> Optional[KeywordTrends]:
+    """Return the in-memory trend array, or None if it has not been built."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, KeywordTrends.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the keyword x year x conference trend array.")
+    parser.add_argument("--min-total", type=int, default=MIN_TOTAL_PAPERS)
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        trends = KeywordTrends.build(session, args.min_total)
+        trends.save(TRENDS_PATH)
+        print(
+            f"{TRENDS_PATH.name}: {trends.counts.shape} {trends.counts.dtype} "
+            f"({trends.counts.nbytes / 1e6:.1f} MB uncompressed)"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
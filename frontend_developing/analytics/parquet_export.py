@@ -0,0 +1,212 @@
+"""
+Parquet snapshots of the database tables.
+
+Every table in `models.py` is streamed to one Parquet file under PARQUET_DIR,
+with an Arrow schema derived from the column types. The DuckDB statistics
+backend (repositories/stats_repository.py) reads these files, so the
+dashboard statistics can run on a laptop without Postgres.
+
+Usage (from frontend_developing/):
+    python -m analytics.parquet_export [--skip-full-text] [table ...]
+    python -m analytics.parquet_export --check-parity
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import (
+    JSON,
+    TIMESTAMP,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    Text,
+    Time,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+
+from config import PARQUET_DIR
+from data_version import bump_versions
+from models import Base
+from summary_views import SUMMARY_VIEWS
+
+MANIFEST_FILE = "_snapshot.json"
+
+# Raw text that the statistics never read; dropped with --skip-full-text
+FULL_TEXT_COLUMNS = {"paper": ["content_raw_text", "reference_raw_text", "conclusion"]}
+
+
+def arrow_type(column_type) -> pa.DataType:
+    """Arrow type for a SQLAlchemy column type."""
+    if isinstance(column_type, ARRAY):
+        return pa.list_(arrow_type(column_type.item_type))
+    # Order matters: TIMESTAMP is a DateTime, Text is a String
+    for sql_type, arrow in (
+        (Boolean, pa.bool_()),
+        (Integer, pa.int64()),
+        (Float, pa.float64()),
+        ((TIMESTAMP, DateTime), pa.timestamp("us")),
+        (Date, pa.date32()),
+        (Time, pa.time64("us")),
+        (JSON, pa.string()),
+        ((String, Text), pa.string()),
+    ):
+        if isinstance(column_type, sql_type):
+            return arrow
+    raise TypeError(f"No Parquet mapping for column type {column_type!r}")
+
+
+def export_table(conn, table, path: Path, exclude=(), chunk_size: int = 10000) -> int:
+    """Stream one table into a Parquet file. Returns the number of rows written."""
+    columns = [
+        c for c in table.columns
+        if c.name not in exclude and not isinstance(c.type, TSVECTOR)
+    ]
+    schema = pa.schema([(c.name, arrow_type(c.type)) for c in columns])
+    json_columns = [i for i, c in enumerate(columns) if isinstance(c.type, JSON)]
+
+    # Write next to the target and swap in at the end, so readers never see a
+    # half-written snapshot
+    tmp_path = path.with_suffix(".parquet.tmp")
+    rows_written = 0
+    result = conn.execution_options(stream_results=True).execute(select(*columns))
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        for rows in result.partitions(chunk_size):
+            data = [list(values) for values in zip(*rows)]
+            for i in json_columns:
+                data[i] = [None if v is None else json.dumps(v) for v in data[i]]
+            writer.write_table(pa.Table.from_arrays(data, schema=schema))
+            rows_written += len(rows)
+        if not rows_written:
+            writer.write_table(schema.empty_table())
+    os.replace(tmp_path, path)
+    return rows_written
+
+
+def export_tables(
+    engine, out_dir: Path = PARQUET_DIR, tables: list = None, skip_full_text: bool = False
+) -> dict:
+    """
+    Snapshot tables to Parquet.
+
+    Args:
+        engine: SQLAlchemy engine of the source database
+        out_dir (Path): Directory receiving one <table>.parquet per table
+        tables (list): Table names to export; defaults to all tables in models.py
+        skip_full_text (bool): Drop the raw paper text columns
+
+    Returns:
+        dict: Rows written per table
+    """
+    selected = [
+        t for t in Base.metadata.sorted_tables if not tables or t.name in tables
+    ]
+    unknown = set(tables or []) - {t.name for t in selected}
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    # One repeatable-read transaction so all files describe the same moment
+    with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+        for table in selected:
+            exclude = FULL_TEXT_COLUMNS.get(table.name, []) if skip_full_text else []
+            counts[table.name] = export_table(
+                conn, table, out_dir / f"{table.name}.parquet", exclude
+            )
+
+    manifest_path = out_dir / MANIFEST_FILE
+    manifest = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+    manifest.update(
+        exported_at=datetime.now().isoformat(timespec="seconds"),
+        tables={**manifest.get("tables", {}), **counts},
+    )
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    # Statistics cached from the previous snapshot are stale now
+    with engine.begin() as conn:
+        bump_versions(conn, SUMMARY_VIEWS)
+    return counts
+
+
+def check_parity(session, out_dir: Path = PARQUET_DIR) -> list[str]:
+    """
+    Run every statistics query on both backends and compare the results.
+
+    The snapshot and the summary views must be fresh for the comparison to
+    be meaningful. Returns a list of mismatch descriptions (empty on parity).
+    """
+    from repositories.stats_repository import DuckDBStatsRepository, StatsRepository
+
+    postgres = StatsRepository(session)
+    duckdb = DuckDBStatsRepository(out_dir)
+
+    calls = [("get_instance_paper_counts", {}), ("get_conferences", {}), ("get_years", {})]
+    for instance_id, conference, year, _ in postgres.get_instance_paper_counts():
+        calls += [
+            ("get_instance_paper_counts", {"conference": conference}),
+            ("get_yearly_conference_stats", {"year": year}),
+            ("get_top_keywords_for_instance", {"instance_id": instance_id}),
+            ("get_top_tracks_by_session_count", {"instance_id": instance_id}),
+        ]
+    for organization in postgres.get_organizations():
+        calls.append(("get_organization_conference_stats", {"organization": organization}))
+
+    mismatches = []
+    seen = set()
+    for method, kwargs in calls:
+        key = (method, tuple(sorted(kwargs.items())))
+        if key in seen:
+            continue
+        seen.add(key)
+        expected = getattr(postgres, method)(**kwargs)
+        actual = getattr(duckdb, method)(**kwargs)
+        if expected != actual:
+            mismatches.append(f"{method}({kwargs}): postgres={expected} duckdb={actual}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot database tables to Parquet.")
+    parser.add_argument("tables", nargs="*", help="Tables to export (default: all)")
+    parser.add_argument("--out", type=Path, default=PARQUET_DIR)
+    parser.add_argument("--skip-full-text", action="store_true")
+    parser.add_argument(
+        "--check-parity",
+        action="store_true",
+        help="Compare DuckDB statistics on the snapshot with Postgres instead of exporting",
+    )
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    if args.check_parity:
+        session = db.get_session()
+        try:
+            mismatches = check_parity(session, args.out)
+        finally:
+            db.close()
+        for mismatch in mismatches:
+            print(mismatch)
+        print("Backends agree" if not mismatches else f"{len(mismatches)} mismatches")
+        raise SystemExit(1 if mismatches else 0)
+
+    counts = export_tables(db.engine, args.out, args.tables, args.skip_full_text)
+    for name, count in counts.items():
+        print(f"{name}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
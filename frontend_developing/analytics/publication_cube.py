@@ -0,0 +1,358 @@
+"""
+Precomputed publication cube over tracked organization, conference, year,
+keyword and author nationality.
+
+Paper counts do not add up over every dimension: a paper with three keywords,
+or with authors from two organizations, must still count once in a total. So
+each measure is stored as a dense array at its own grain, over shared axes,
+and only rolled up along dimensions where it is additive:
+
+- papers, citations:    organization x conference x year
+- keyword_papers:       organization x conference x year x keyword
+- authors:              organization x conference x year x nationality
+                        (author-paper pairs)
+- total_papers, total_citations:
+                        conference x year, distinct papers with any tracked
+                        organization
+- total_keyword_papers: conference x year x keyword, same papers
+
+A paper belongs to exactly one conference and year, so every measure can be
+summed over those two, and keyword_papers and authors can also be summed over
+organizations for a given keyword or nationality.
+
+Pages slice and roll up the arrays in memory with `PublicationCube.query`. A
+refresh only aggregates papers added since the last build (paper_id above the
+stored high-water mark) and adds them into the existing arrays, growing the
+axes as new values appear. Changes to existing papers, such as new citation
+counts or affiliations, need a full rebuild (--full), which also happens
+automatically when organizations.yaml changes.
+
+Usage (from frontend_developing/):
+    python -m analytics.publication_cube [--full]
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from config import ARTIFACT_DIR, TRACKED_ORGANIZATIONS_HASH
+from models import (
+    Author,
+    AuthorAffiliation,
+    Conference,
+    ConferenceInstance,
+    Keyword,
+    Paper,
+    PaperKeyword,
+    TrackedOrganization,
+    paper_author,
+)
+
+CUBE_PATH = ARTIFACT_DIR / "publication_cube.npz"
+UNKNOWN_NATIONALITY = "Unknown"
+
+DIMENSIONS = ("organization", "conference", "year", "keyword", "nationality")
+# measure -> dimensions it is stored over, in array axis order
+MEASURES = {
+    "papers": ("organization", "conference", "year"),
+    "citations": ("organization", "conference", "year"),
+    "keyword_papers": ("organization", "conference", "year", "keyword"),
+    "authors": ("organization", "conference", "year", "nationality"),
+    "total_papers": ("conference", "year"),
+    "total_citations": ("conference", "year"),
+    "total_keyword_papers": ("conference", "year", "keyword"),
+}
+
+
+def _fact_queries(low: int, high: int) -> list:
+    """
+    Group-by queries over the papers with low < paper_id <= high.
+
+    Returns:
+        list: (statement, measure names) pairs; each statement selects the
+        dimensions of its measures followed by one column per measure
+    """
+    # Distinct (organization, paper) pairs; an author can have several
+    # affiliations resolved to the same organization
+    org_papers = (
+        select(TrackedOrganization.organization, paper_author.c.paper_id)
+        .join(
+            AuthorAffiliation,
+            AuthorAffiliation.affiliation_id == TrackedOrganization.affiliation_id,
+        )
+        .join(paper_author, paper_author.c.author_id == AuthorAffiliation.author_id)
+        .where(paper_author.c.paper_id > low, paper_author.c.paper_id <= high)
+        .distinct()
+        .subquery()
+    )
+    tracked_papers = select(org_papers.c.paper_id).distinct().subquery()
+    org_authors = (
+        select(
+            TrackedOrganization.organization,
+            paper_author.c.author_id,
+            paper_author.c.paper_id,
+        )
+        .join(
+            AuthorAffiliation,
+            AuthorAffiliation.affiliation_id == TrackedOrganization.affiliation_id,
+        )
+        .join(paper_author, paper_author.c.author_id == AuthorAffiliation.author_id)
+        .where(paper_author.c.paper_id > low, paper_author.c.paper_id <= high)
+        .distinct()
+        .subquery()
+    )
+    nationality = func.coalesce(
+        func.nullif(func.trim(Author.nationality), ""), UNKNOWN_NATIONALITY
+    )
+
+    def by_paper(statement, paper_id):
+        return (
+            statement.join(Paper, Paper.paper_id == paper_id)
+            .join(ConferenceInstance, ConferenceInstance.instance_id == Paper.instance_id)
+            .join(Conference, Conference.conference_id == ConferenceInstance.conference_id)
+        )
+
+    citations = func.coalesce(func.sum(Paper.citation_count), 0)
+    return [
+        (
+            by_paper(
+                select(org_papers.c.organization, Conference.name, Paper.year, func.count(), citations)
+                .select_from(org_papers),
+                org_papers.c.paper_id,
+            ).group_by(org_papers.c.organization, Conference.name, Paper.year),
+            ("papers", "citations"),
+        ),
+        (
+            by_paper(
+                select(
+                    org_papers.c.organization, Conference.name, Paper.year, Keyword.keyword, func.count()
+                )
+                .select_from(org_papers)
+                .join(PaperKeyword, PaperKeyword.paper_id == org_papers.c.paper_id)
+                .join(Keyword, Keyword.keyword_id == PaperKeyword.keyword_id),
+                org_papers.c.paper_id,
+            ).group_by(org_papers.c.organization, Conference.name, Paper.year, Keyword.keyword),
+            ("keyword_papers",),
+        ),
+        (
+            by_paper(
+                select(org_authors.c.organization, Conference.name, Paper.year, nationality, func.count())
+                .select_from(org_authors)
+                .join(Author, Author.author_id == org_authors.c.author_id),
+                org_authors.c.paper_id,
+            ).group_by(org_authors.c.organization, Conference.name, Paper.year, nationality),
+            ("authors",),
+        ),
+        (
+            by_paper(
+                select(Conference.name, Paper.year, func.count(), citations)
+                .select_from(tracked_papers),
+                tracked_papers.c.paper_id,
+            ).group_by(Conference.name, Paper.year),
+            ("total_papers", "total_citations"),
+        ),
+        (
+            by_paper(
+                select(Conference.name, Paper.year, Keyword.keyword, func.count())
+                .select_from(tracked_papers)
+                .join(PaperKeyword, PaperKeyword.paper_id == tracked_papers.c.paper_id)
+                .join(Keyword, Keyword.keyword_id == PaperKeyword.keyword_id),
+                tracked_papers.c.paper_id,
+            ).group_by(Conference.name, Paper.year, Keyword.keyword),
+            ("total_keyword_papers",),
+        ),
+    ]
+
+
+class PublicationCube:
+    """Measures over shared dimension axes, with in-memory slicing and roll-up."""
+
+    def __init__(
+        self,
+        axes: dict[str, np.ndarray],
+        measures: dict[str, np.ndarray],
+        max_paper_id: int,
+        config_hash: str = TRACKED_ORGANIZATIONS_HASH,
+    ):
+        self.axes = axes
+        self.measures = measures
+        self.max_paper_id = max_paper_id
+        self.config_hash = config_hash
+        self._positions = {
+            dim: {value: i for i, value in enumerate(axis.tolist())}
+            for dim, axis in axes.items()
+        }
+
+    @classmethod
+    def build(cls, session, since: int = 0) -> "PublicationCube":
+        """Aggregate the papers with paper_id > since."""
+        high = session.execute(select(func.max(Paper.paper_id))).scalar() or 0
+        facts = {}
+        for statement, names in _fact_queries(since, high):
+            rows = session.execute(statement).all()
+            for offset, name in enumerate(names):
+                width = len(MEASURES[name])
+                facts[name] = [(*row[:width], row[width + offset]) for row in rows]
+
+        axes = {}
+        for dim in DIMENSIONS:
+            values = {
+                row[dims.index(dim)]
+                for name, dims in MEASURES.items()
+                if dim in dims
+                for row in facts[name]
+            }
+            axes[dim] = np.array(sorted(values), dtype=np.int64 if dim == "year" else str)
+
+        measures = {}
+        for name, dims in MEASURES.items():
+            values = np.zeros([len(axes[dim]) for dim in dims], dtype=np.int64)
+            rows = facts[name]
+            if rows:
+                index = tuple(
+                    np.searchsorted(axes[dim], [row[i] for row in rows])
+                    for i, dim in enumerate(dims)
+                )
+                np.add.at(values, index, [row[-1] for row in rows])
+            measures[name] = values
+        return cls(axes, measures, max(high, since))
+
+    @classmethod
+    def merge(cls, base: "PublicationCube", delta: "PublicationCube") -> "PublicationCube":
+        """Sum two cubes over disjoint papers, on the union of their axes."""
+        axes = {dim: np.union1d(base.axes[dim], delta.axes[dim]) for dim in DIMENSIONS}
+        measures = {}
+        for name, dims in MEASURES.items():
+            values = np.zeros([len(axes[dim]) for dim in dims], dtype=np.int64)
+            for cube in (base, delta):
+                index = np.ix_(*(np.searchsorted(axes[dim], cube.axes[dim]) for dim in dims))
+                values[index] += cube.measures[name]
+            measures[name] = values
+        return cls(axes, measures, max(base.max_paper_id, delta.max_paper_id), delta.config_hash)
+
+    def refresh(self, session) -> "PublicationCube":
+        """This cube plus the papers added since it was built."""
+        return PublicationCube.merge(self, PublicationCube.build(session, since=self.max_paper_id))
+
+    def save(self, path: Path = CUBE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            max_paper_id=self.max_paper_id,
+            config_hash=self.config_hash,
+            **{f"axis_{dim}": axis for dim, axis in self.axes.items()},
+            # Counts fit in 32 bits; keeps the keyword arrays small on disk
+            **{f"measure_{name}": values.astype(np.int32) for name, values in self.measures.items()},
+        )
+
+    @classmethod
+    def load(cls, path: Path = CUBE_PATH) -> "PublicationCube":
+        with np.load(path) as f:
+            return cls(
+                {dim: f[f"axis_{dim}"] for dim in DIMENSIONS},
+                {name: f[f"measure_{name}"].astype(np.int64) for name in MEASURES},
+                int(f["max_paper_id"]),
+                str(f["config_hash"]),
+            )
+
+    # ------------------------------------------------------------------ #
+    #                          Slice and roll-up                          #
+    # ------------------------------------------------------------------ #
+    def query(self, measure: str, by: tuple = (), **where) -> tuple[list[np.ndarray], np.ndarray]:
+        """
+        Slice a measure and roll it up onto the `by` dimensions.
+
+        Args:
+            measure (str): Name in MEASURES
+            by (tuple): Dimensions to keep, in the order of the result's axes
+            **where: dimension -> value or list of values to keep; values not
+                in the cube are ignored
+
+        Returns:
+            tuple: (axis labels of each `by` dimension, array of shape
+            [len(labels) for labels])
+        """
+        dims = MEASURES[measure]
+        unknown = (set(by) | set(where)) - set(dims)
+        if unknown:
+            raise ValueError(f"{measure} is not stored over {', '.join(sorted(unknown))}")
+
+        values = self.measures[measure]
+        labels = {}
+        for axis, dim in enumerate(dims):
+            labels[dim] = self.axes[dim]
+            if dim in where:
+                selected = where[dim]
+                if isinstance(selected, (str, int, np.integer)):
+                    selected = [selected]
+                positions = [
+                    self._positions[dim][value]
+                    for value in selected
+                    if value in self._positions[dim]
+                ]
+                values = np.take(values, positions, axis=axis)
+                labels[dim] = labels[dim][positions]
+
+        rolled_up = tuple(axis for axis, dim in enumerate(dims) if dim not in by)
+        values = values.sum(axis=rolled_up)
+        kept = [dim for dim in dims if dim in by]
+        values = np.transpose(values, [kept.index(dim) for dim in by])
+        return [labels[dim] for dim in by], values
+
+    def top(self, measure: str, dim: str, limit: int = 10, **where) -> list[tuple]:
+        """The `limit` values of `dim` with the largest non-zero measure."""
+        (labels,), values = self.query(measure, by=(dim,), **where)
+        order = np.argsort(-values, kind="stable")[:limit]
+        return [(labels[i].item(), int(values[i])) for i in order if values[i] > 0]
+
+
+# path -> (mtime, cube); reloaded when the job rewrites the file
+_loaded: dict[Path, tuple[float, PublicationCube]] = {}
+
+
+def load_publication_cube(path: Path = CUBE_PATH) -> Optional[PublicationCube]:
+    """Return the in-memory cube, or None if it has not been built."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, PublicationCube.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the publication cube.")
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch instead of adding new papers")
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+    from repositories.affiliation_repository import AffiliationRepository
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        AffiliationRepository(session).sync_tracked_organizations()
+        cube = None if args.full else load_publication_cube(CUBE_PATH)
+        if cube is None or cube.config_hash != TRACKED_ORGANIZATIONS_HASH:
+            cube = PublicationCube.build(session)
+            mode = "built"
+        else:
+            previous = cube.max_paper_id
+            cube = cube.refresh(session)
+            mode = f"refreshed from paper {previous}"
+        cube.save(CUBE_PATH)
+        shape = {dim: len(axis) for dim, axis in cube.axes.items()}
+        print(f"{CUBE_PATH.name}: {mode} up to paper {cube.max_paper_id}, axes {shape}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
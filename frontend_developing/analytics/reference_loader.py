@@ -0,0 +1,334 @@
+"""
+Bulk loader turning `paper.reference_raw_text` into `reference` and
+`paper_reference` rows.
+
+Raw reference lists are split into entries and parsed into title, authors,
+year and venue across a process pool. Titles are normalized and hashed
+(`reference.title_hash`, unique), so the same work cited by many papers is
+stored once. Each batch of papers is written with two bulk
+INSERT ... ON CONFLICT DO NOTHING statements and committed together with a
+checkpoint, so an interrupted run continues from the last committed
+paper_id, and re-running a range inserts nothing twice.
+
+Usage (from frontend_developing/):
+    python -m analytics.reference_loader [--start-id 1] [--end-id 50000] [--workers 4]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from config import ARTIFACT_DIR
+from models import Paper, PaperReference, Reference
+from analytics.citation_graph import normalize_title
+
+REFERENCE_DIR = ARTIFACT_DIR / "references"
+CHECKPOINT_PATH = REFERENCE_DIR / "checkpoint.json"
+BATCH_SIZE = 500  # papers per transaction
+MIN_TITLE_LENGTH = 8
+
+# "[12] ...", "12. ...", "(12) ..." at the start of an entry
+_MARKER_RE = re.compile(r"^\s*(?:\[\d+\]|\(\d+\)|\d{1,3}\.(?=\s))\s*")
+_MARKER_SPLIT_RE = re.compile(r"(?:^|\n)\s*(?=\[\d+\]\s)")
+_YEAR_RE = re.compile(r"\b(19[5-9]\d|20[0-4]\d)[a-z]?\b")
+_QUOTED_RE = re.compile(r"[\"“”](.+?)[,.]?[\"“”]")
+# Author (2020). Title. Venue
+_APA_RE = re.compile(r"^(?P<authors>.+?)\s*\((?P<year>\d{4})[a-z]?\)\.?\s*(?P<rest>.+)$")
+# Sentence break: a period that is not an author initial ("J. Smith"), or the
+# space ending the author list after "et al." or a trailing initial of a
+# surname-first list ("Doe, A. Learning to ...")
+_SENTENCE_RE = re.compile(
+    r"(?<=\bet al\.)\s+"
+    r"|(?<=, [A-Z]\.)\s+(?=[A-Z][a-z]+\s+[a-z])"
+    r"|(?<!\b[A-Z])(?<!\bal)\.\s+"
+)
+_VENUE_PREFIX_RE = re.compile(r"^(?:In:?|Proceedings of|Proc\.)\s+", re.IGNORECASE)
+# Trailing pages, volume(issue) or year of a venue
+_VENUE_TRAILER_RE = re.compile(
+    r"(?:[,:\s]\s*(?:pp?\.\s*)?\d+\s*[-–]\s*\d+|[,\s]\s*\d+\(\d+\)|[,\s]\s*\d{4}[a-z]?)\s*$"
+)
+
+
+def title_hash(title: str) -> Optional[str]:
+    """SHA-1 of the normalized title; None when nothing is left to hash."""
+    normalized = normalize_title(title)
+    if not normalized:
+        return None
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def split_references(raw_text: Optional[str]) -> list[str]:
+    """Split a raw reference list into single entries with markers removed."""
+    if not raw_text or not raw_text.strip():
+        return []
+    if re.search(r"^\s*\[\d+\]\s", raw_text, re.MULTILINE):
+        entries = _MARKER_SPLIT_RE.split(raw_text)
+    elif "\n\n" in raw_text.strip():
+        entries = re.split(r"\n\s*\n", raw_text)
+    else:
+        entries = raw_text.splitlines()
+    entries = (_MARKER_RE.sub("", " ".join(entry.split())) for entry in entries)
+    return [entry for entry in entries if entry]
+
+
+def _clean_venue(venue: str) -> Optional[str]:
+    venue = _VENUE_PREFIX_RE.sub("", venue.strip(" .,"))
+    for _ in range(3):  # "..., 12(3):1-20, 2020"
+        venue = _VENUE_TRAILER_RE.sub("", venue).strip(" .,:")
+    return venue[:255] or None
+
+
+def parse_reference(entry: str) -> Optional[dict]:
+    """
+    Parse one reference entry into title, author, year and journal.
+
+    Handles the common "Authors. Title. Venue, Year." (ACM/NeurIPS),
+    'Authors, "Title," Venue, Year.' (IEEE) and "Authors (Year). Title.
+    Venue." (APA) layouts. Returns None when no plausible title is found.
+    """
+    authors = title = venue = ""
+    year = None
+
+    quoted = _QUOTED_RE.search(entry)
+    apa = _APA_RE.match(entry)
+    if quoted:
+        authors = entry[: quoted.start()]
+        title = quoted.group(1)
+        venue = entry[quoted.end() :]
+    elif apa:
+        authors = apa.group("authors")
+        year = int(apa.group("year"))
+        parts = _SENTENCE_RE.split(apa.group("rest"), maxsplit=1)
+        title = parts[0]
+        venue = parts[1] if len(parts) > 1 else ""
+    else:
+        parts = _SENTENCE_RE.split(entry, maxsplit=2)
+        if len(parts) < 2:
+            return None
+        authors, title = parts[0], parts[1]
+        venue = parts[2] if len(parts) > 2 else ""
+
+    title = title.strip(" .,")
+    if len(title) < MIN_TITLE_LENGTH:
+        return None
+    if year is None:
+        years = _YEAR_RE.findall(entry)
+        year = int(years[-1]) if years else None
+
+    return {
+        "title": title[:255],
+        "author": authors.strip(" .,") or None,
+        "year": year,
+        "journal": _clean_venue(venue),
+    }
+
+
+def _parse_paper(row: tuple) -> tuple[int, list[dict]]:
+    """Parse the references of one paper; runs in the worker processes."""
+    paper_id, raw_text = row
+    references = {}
+    for entry in split_references(raw_text):
+        parsed = parse_reference(entry)
+        if parsed is None:
+            continue
+        parsed["title_hash"] = title_hash(parsed["title"])
+        if parsed["title_hash"]:
+            references.setdefault(parsed["title_hash"], parsed)
+    return paper_id, list(references.values())
+
+
+class ReferenceLoader:
+    """Parse, deduplicate and bulk-insert references for a paper_id range."""
+
+    def __init__(
+        self,
+        session,
+        workers: Optional[int] = None,
+        batch_size: int = BATCH_SIZE,
+        checkpoint_path=CHECKPOINT_PATH,
+    ):
+        self.session = session
+        self.workers = workers
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+
+    def backfill_title_hashes(self) -> int:
+        """
+        Hash references inserted before title_hash existed. Of several rows
+        with the same normalized title only the lowest reference_id gets the
+        hash; the others keep NULL and stay linked to their papers.
+        """
+        rows = self.session.execute(
+            select(Reference.reference_id, Reference.title)
+            .where(Reference.title_hash.is_(None))
+            .order_by(Reference.reference_id)
+        ).all()
+        taken = set(
+            self.session.execute(
+                select(Reference.title_hash).where(Reference.title_hash.is_not(None))
+            ).scalars()
+        )
+        updates = []
+        for reference_id, title in rows:
+            digest = title_hash(title)
+            if digest and digest not in taken:
+                taken.add(digest)
+                updates.append({"reference_id": reference_id, "title_hash": digest})
+        if updates:
+            self.session.execute(update(Reference), updates)
+            self.session.commit()
+        return len(updates)
+
+    def _read_checkpoint(self, start_id: int, end_id: Optional[int]) -> int:
+        """Last committed paper_id of an unfinished run over the same range."""
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+        except (OSError, ValueError):
+            return start_id - 1
+        if checkpoint.get("start_id") == start_id and checkpoint.get("end_id") == end_id:
+            return checkpoint["last_paper_id"]
+        return start_id - 1
+
+    def _write_checkpoint(self, start_id: int, end_id: Optional[int], last_paper_id: int) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"start_id": start_id, "end_id": end_id, "last_paper_id": last_paper_id})
+        )
+        tmp_path.replace(self.checkpoint_path)
+
+    def _fetch_batch(self, after_id: int, end_id: Optional[int]) -> list[tuple]:
+        stmt = (
+            select(Paper.paper_id, Paper.reference_raw_text)
+            .where(Paper.paper_id > after_id, Paper.reference_raw_text.is_not(None))
+            .order_by(Paper.paper_id)
+            .limit(self.batch_size)
+        )
+        if end_id is not None:
+            stmt = stmt.where(Paper.paper_id <= end_id)
+        return [tuple(row) for row in self.session.execute(stmt)]
+
+    def _write_batch(self, parsed: list[tuple[int, list[dict]]]) -> tuple[int, int]:
+        """Insert the new references and the paper links of one batch."""
+        unique = {}
+        for _, references in parsed:
+            for reference in references:
+                unique.setdefault(reference["title_hash"], reference)
+        if not unique:
+            return 0, 0
+
+        # executemany form: SQLAlchemy splits the rows into multi-VALUES
+        # statements below the server's bind parameter limit
+        inserted = self.session.execute(
+            insert(Reference)
+            .on_conflict_do_nothing(index_elements=["title_hash"])
+            .returning(Reference.reference_id),
+            list(unique.values()),
+        ).all()
+        reference_ids = dict(
+            self.session.execute(
+                select(Reference.title_hash, Reference.reference_id).where(
+                    Reference.title_hash.in_(list(unique))
+                )
+            ).all()
+        )
+
+        links = [
+            {"paper_id": paper_id, "reference_id": reference_ids[reference["title_hash"]]}
+            for paper_id, references in parsed
+            for reference in references
+        ]
+        linked = self.session.execute(
+            insert(PaperReference)
+            .on_conflict_do_nothing()
+            .returning(PaperReference.paper_id),
+            links,
+        ).all()
+        return len(inserted), len(linked)
+
+    def run(self, start_id: int = 1, end_id: Optional[int] = None, resume: bool = True) -> dict:
+        """
+        Load the references of papers with start_id <= paper_id <= end_id.
+
+        Args:
+            start_id (int): First paper_id of the range
+            end_id (int): Last paper_id of the range; None for no upper bound
+            resume (bool): Continue after the checkpoint of an unfinished run
+                over the same range instead of starting over
+
+        Returns:
+            dict: Papers processed, references and links inserted, elapsed seconds
+        """
+        after_id = self._read_checkpoint(start_id, end_id) if resume else start_id - 1
+        stats = {"papers": 0, "references": 0, "links": 0}
+        started = time.perf_counter()
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers != 1 else None
+        try:
+            while True:
+                rows = self._fetch_batch(after_id, end_id)
+                if not rows:
+                    break
+                if executor is None:
+                    parsed = [_parse_paper(row) for row in rows]
+                else:
+                    parsed = list(executor.map(_parse_paper, rows, chunksize=16))
+                references, links = self._write_batch(parsed)
+                self.session.commit()
+
+                after_id = rows[-1][0]
+                self._write_checkpoint(start_id, end_id, after_id)
+                stats["papers"] += len(rows)
+                stats["references"] += references
+                stats["links"] += links
+                print(
+                    f"paper_id <= {after_id}: {stats['papers']} papers, "
+                    f"{stats['references']} new references, {stats['links']} links"
+                )
+        except Exception:
+            self.session.rollback()
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.checkpoint_path.unlink(missing_ok=True)
+        stats["elapsed"] = time.perf_counter() - started
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse and load paper references.")
+    parser.add_argument("--start-id", type=int, default=1, help="First paper_id to process")
+    parser.add_argument("--end-id", type=int, default=None, help="Last paper_id to process")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    session = db.get_session()
+    try:
+        loader = ReferenceLoader(session, workers=args.workers, batch_size=args.batch_size)
+        backfilled = loader.backfill_title_hashes()
+        if backfilled:
+            print(f"Hashed {backfilled} existing references")
+        stats = loader.run(args.start_id, args.end_id, resume=not args.restart)
+    finally:
+        db.close()
+
+    for key, value in stats.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
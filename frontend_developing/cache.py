@@ -0,0 +1,272 @@
+"""
+Shared result cache for repository read methods.
+
+Results are looked up in an in-process LRU (L1) and then in a cache shared by
+all app processes (L2): a SQLite file for replicas on one host, or any
+Redis-compatible server for replicas on several hosts. A value found in L2 is
+copied into L1. Keys carry the schema version, a per-method version and the
+data versions of the tables the method reads (see data_version.py), so a
+write or a change in what a method returns leads to new keys, never a flush.
+
+Apply with the `cached_query` decorator; `get_cache().metrics()` reports hits
+per layer and misses.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+
+from cachetools import LRUCache
+
+from data_version import data_versions
+from config import (
+    CACHE_BACKEND,
+    CACHE_DIR,
+    CACHE_L1_SIZE,
+    CACHE_NAMESPACE,
+    CACHE_REDIS_URL,
+    CACHE_SCHEMA_VERSION,
+    CACHE_TTL,
+)
+
+_MISSING = object()
+
+
+class MemoryLayer:
+    """In-process LRU of (expires_at, value) entries."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = CACHE_L1_SIZE):
+        self._entries = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return _MISSING
+            return value
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+
+
+class SQLiteLayer:
+    """
+    Cache table in a local SQLite file, shared by every process on the host.
+    WAL mode lets readers proceed while another process writes.
+    """
+
+    name = "disk"
+
+    def __init__(self, path=None):
+        self.path = str(path or CACHE_DIR / "results.sqlite")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+            conn.execute(
+                "DELETE FROM result_cache WHERE expires_at < ?", (time.time(),)
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not cross threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return _MISSING
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        self._connection().execute(
+            "INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at),
+        )
+
+
+class RedisLayer:
+    """
+    Any server speaking the Redis protocol (Redis, Valkey, KeyDB, or a local
+    stand-in for development). Needs the optional `redis` package.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = CACHE_REDIS_URL):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        value = self.client.get(key)
+        return _MISSING if value is None else pickle.loads(value)
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        self.client.set(
+            key,
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            ex=int(ttl) if ttl else None,
+        )
+
+
+class SharedCache:
+    """Layers checked in order; a hit in a later layer is copied to the earlier ones."""
+
+    def __init__(self, layers: list):
+        self.layers = layers
+        self._counts = Counter()
+        self._method_counts = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def _count(self, method: str, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+            self._method_counts[method][outcome] += 1
+
+    def get(self, key: str, method: str = None):
+        for i, layer in enumerate(self.layers):
+            try:
+                value = layer.get(key)
+            except Exception as e:
+                print(f"Error reading {layer.name} cache: {e}")
+                continue
+            if value is not _MISSING:
+                self._count(method, f"{layer.name}_hits")
+                for earlier in self.layers[:i]:
+                    earlier.set(key, value)
+                return value
+        self._count(method, "misses")
+        return _MISSING
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        for layer in self.layers:
+            try:
+                layer.set(key, value, ttl)
+            except Exception as e:
+                print(f"Error writing {layer.name} cache: {e}")
+
+    def metrics(self) -> dict:
+        """Hit and miss counts since process start, overall and per method."""
+        with self._lock:
+            counts = dict(self._counts)
+            methods = {name: dict(c) for name, c in self._method_counts.items()}
+        lookups = sum(counts.values())
+        return {
+            "backend": "+".join(layer.name for layer in self.layers),
+            **counts,
+            "hit_rate": (lookups - counts.get("misses", 0)) / lookups if lookups else None,
+            "methods": methods,
+        }
+
+
+def make_cache(backend: str = CACHE_BACKEND) -> SharedCache:
+    """Cache for a backend: "memory" (L1 only), "disk" or "redis" (L1 + L2)."""
+    if backend == "memory":
+        return SharedCache([MemoryLayer()])
+    if backend == "disk":
+        return SharedCache([MemoryLayer(), SQLiteLayer()])
+    if backend == "redis":
+        return SharedCache([MemoryLayer(), RedisLayer()])
+    raise ValueError(f"Unknown CACHE_BACKEND {backend}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SharedCache:
+    """Return the process-wide cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = make_cache()
+        return _cache
+
+
+def make_key(
+    method: str, version: int, args: tuple, kwargs: dict, table_versions: tuple = ()
+) -> str:
+    arguments = repr((args, sorted(kwargs.items()))).encode()
+    digest = hashlib.sha1(arguments).hexdigest()
+    data = ".".join(str(v) for v in table_versions) or "0"
+    return f"{CACHE_NAMESPACE}:s{CACHE_SCHEMA_VERSION}:{method}:v{version}:d{data}:{digest}"
+
+
+def cached_query(
+    tables: tuple = (),
+    version: int = 1,
+    ttl: float = CACHE_TTL,
+    cache_empty: bool = False,
+):
+    """
+    Cache a repository read method in the shared cache.
+
+    The key is the repository class, method name, `version`, the current data
+    versions of `tables` (plus the repository's own `cache_versions`, if it
+    has any) and the call arguments (not the session). Bump `version` when the method's result
+    changes shape. Empty results are not cached by default, because the
+    repositories return [] or None when a query fails. Works on async
+    methods too.
+    """
+
+    def decorator(func):
+        def lookup(self, args, kwargs):
+            method = f"{type(self).__name__}.{func.__name__}"
+            table_versions = data_versions(tables) + getattr(self, "cache_versions", ())
+            key = make_key(method, version, args, kwargs, table_versions)
+            return key, get_cache().get(key, method)
+
+        def store(key, result):
+            if result or cache_empty:
+                get_cache().set(key, result, ttl)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                key, result = lookup(self, args, kwargs)
+                if result is _MISSING:
+                    result = await func(self, *args, **kwargs)
+                    store(key, result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key, result = lookup(self, args, kwargs)
+            if result is _MISSING:
+                result = func(self, *args, **kwargs)
+                store(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import yaml
 from pathlib import Path
 from datetime import datetime
@@ -10,6 +12,55 @@ DB_PORT = "5432"
 DB_NAME = "test_db"
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# 异步只读查询（asyncpg），用于页面内并发执行相互独立的查询
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_POOL_SIZE = 10
+
+# SQL 调试：echo 打印全部语句；instrumentation 按页面刷新统计耗时并检测 N+1 查询
+SQL_ECHO = False
+SQL_INSTRUMENTATION = True
+SQL_N_PLUS_ONE_THRESHOLD = 10  # 同一语句在一次刷新中执行超过该次数即视为 N+1
+SQL_DEBUG_PANEL = True
+
+# 离线分析产物目录（共现矩阵等）
+ARTIFACT_DIR = Path(__file__).parent / "artifacts"
+
+# 统计查询后端："postgres" 读取物化视图，"duckdb" 读取 Parquet 快照（无需数据库服务）
+ANALYTICS_BACKEND = "postgres"
+PARQUET_DIR = ARTIFACT_DIR / "parquet"
+SQL_QUERY_LOG = ARTIFACT_DIR / "sql_queries.jsonl"  # None 关闭日志
+COLLABORATION_MAX_EDGES = 150  # 合作网络布局前仅保留权重最高的边数
+CHINESE_NATIONALITIES = ("china", "chinese", "cn")  # 视为中国籍的 author.nationality 取值（忽略大小写）
+
+# 仓储查询结果缓存：L1 进程内 LRU + L2 共享层
+# "memory" 仅 L1；"disk" L2 为本机 SQLite 文件（同机多进程共享）；"redis" L2 为 Redis 兼容服务（多机共享）
+CACHE_BACKEND = "disk"
+CACHE_DIR = ARTIFACT_DIR / "cache"
+CACHE_REDIS_URL = "redis://localhost:6379/0"
+CACHE_L1_SIZE = 1024
+CACHE_TTL = 24 * 3600  # 秒
+CACHE_NAMESPACE = "deepsight"
+CACHE_SCHEMA_VERSION = 1  # 模型结构变化时加一，使所有旧缓存失效
+
+# 论文分块向量库：内嵌存储（内存映射矩阵 + Parquet 元数据 + IVF 索引），无需 Milvus 服务
+VECTOR_STORE_DIR = ARTIFACT_DIR / "vector_store"
+VECTOR_DIM = 768
+VECTOR_DTYPE = "float16"  # 磁盘存储精度；打分时转为 float32
+VECTOR_NPROBE = 16  # IVF 检索时探查的聚类数
+
+# 混合检索：BM25 稀疏索引 + 向量库，倒数排名融合（RRF）
+BM25_PAPER_INDEX_DIR = ARTIFACT_DIR / "bm25" / "papers"
+BM25_CHUNK_INDEX_DIR = ARTIFACT_DIR / "bm25" / "chunks"
+RRF_K = 60
+HYBRID_CANDIDATES = 1000  # 每一路召回参与融合的候选数
+EMBEDDING_MODEL = None  # 查询向量模型（sentence-transformers 名称），须与入库向量一致；None 时只用 BM25
+
+# 单篇 PDF 分析的分块、向量与 FAISS 索引缓存，按 PDF 内容与分块/向量配置的哈希分目录
+PDF_INDEX_CACHE_DIR = ARTIFACT_DIR / "pdf_index"
+
+# 数据版本：写入提交时对应表版本加一并 NOTIFY，各进程 LISTEN 后更新缓存键
+DATA_VERSION_CHANNEL = "data_version"
+DATA_VERSION_RELOAD_SECONDS = 60  # 兜底：定期全量读取版本表，防止漏收通知
 
 # 会议信息 NeurIPS 2024
 START_DATE = datetime(2024, 12, 10)
@@ -34,4 +85,14 @@ TRACKED_ORGANIZATIONS = [
     org["name"]
     for organizations in ORG_CONFIG["tracked_organizations"].values()
     for org in organizations
-]
\ No newline at end of file
+]
+# Organization name -> category (university, company, ...)
+TRACKED_ORGANIZATION_CATEGORIES = {
+    org["name"]: category
+    for category, organizations in ORG_CONFIG["tracked_organizations"].items()
+    for org in organizations
+}
+# Changes whenever the tracked list changes; stored with the resolved mapping
+TRACKED_ORGANIZATIONS_HASH = hashlib.sha256(
+    json.dumps(ORG_CONFIG["tracked_organizations"], sort_keys=True).encode()
+).hexdigest()
@@ -0,0 +1,219 @@
+"""
+Per-table data versions for cache invalidation.
+
+Every commit that writes ORM rows bumps the version of each table it touched
+in the data_version table and sends a NOTIFY on DATA_VERSION_CHANNEL, both in
+the same transaction, so the notification goes out exactly when the write
+becomes visible. Each app process keeps the versions in memory, updated by a
+background LISTEN connection, and caches include them in their keys: a cached
+result stays valid until one of the tables it reads is written, and is
+replaced within a notification round trip after that.
+"""
+
+import select
+import threading
+import time
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from config import (
+    ANALYTICS_BACKEND,
+    DATABASE_URL,
+    DATA_VERSION_CHANNEL,
+    DATA_VERSION_RELOAD_SECONDS,
+)
+
+_versions = {}
+_versions_lock = threading.Lock()
+_listener = None
+_listener_lock = threading.Lock()
+
+_BUMP_SQL = text(
+    "INSERT INTO data_version (table_name, version, updated_at) "
+    "VALUES (:table_name, 1, now()) "
+    "ON CONFLICT (table_name) DO UPDATE "
+    "SET version = data_version.version + 1, updated_at = now() "
+    "RETURNING version"
+)
+_NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+
+def _set_versions(versions: dict) -> None:
+    with _versions_lock:
+        for table_name, version in versions.items():
+            # Notifications can arrive after a reload that already saw them
+            if version > _versions.get(table_name, 0):
+                _versions[table_name] = version
+
+
+def bump_versions(connection, tables) -> dict:
+    """
+    Increment the versions of `tables` and notify the other processes.
+    Runs on the caller's connection; the notification is sent on commit.
+
+    Returns:
+        dict: table name -> new version
+    """
+    bumped = {}
+    for table_name in sorted(set(tables)):
+        version = connection.execute(_BUMP_SQL, {"table_name": table_name}).scalar()
+        connection.execute(
+            _NOTIFY_SQL,
+            {"channel": DATA_VERSION_CHANNEL, "payload": f"{table_name}:{version}"},
+        )
+        bumped[table_name] = version
+    return bumped
+
+
+def data_versions(tables) -> tuple:
+    """Current versions of `tables`, for use in cache keys. 0 for never-written tables."""
+    _ensure_listener()
+    with _versions_lock:
+        return tuple(_versions.get(table_name, 0) for table_name in tables)
+
+
+# ---------------------------------------------------------------------------- #
+#                          Bumping on repository writes                         #
+# ---------------------------------------------------------------------------- #
+def _changed_tables(session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context):
+    changed = _changed_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        changed.update(table.name for table in inspect(obj).mapper.tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_writes(orm_execute_state):
+    # query(...).delete() / update() and insert() statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_changed_tables(session):
+    # before_commit runs ahead of the final flush; flush now to see all tables
+    session.flush()
+    changed = session.info.pop("changed_tables", None)
+    if not changed or session.get_bind().dialect.name != "postgresql":
+        return
+    changed.discard("data_version")
+    session.info["bumped_versions"] = bump_versions(session.connection(), changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_bumped_versions(session):
+    # This process sees its own writes without waiting for the notification
+    bumped = session.info.pop("bumped_versions", None)
+    if bumped:
+        _set_versions(bumped)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_tables(session):
+    session.info.pop("changed_tables", None)
+    session.info.pop("bumped_versions", None)
+
+
+# ---------------------------------------------------------------------------- #
+#                                   Listening                                  #
+# ---------------------------------------------------------------------------- #
+class DataVersionListener(threading.Thread):
+    """
+    Keeps the in-memory versions current. LISTENs on DATA_VERSION_CHANNEL on
+    its own connection and re-reads the whole table every
+    DATA_VERSION_RELOAD_SECONDS in case a notification was missed, e.g. while
+    reconnecting.
+    """
+
+    def __init__(self, database_url: str = DATABASE_URL):
+        super().__init__(name="data-version-listener", daemon=True)
+        self.database_url = database_url
+
+    def _connect(self):
+        import psycopg2
+
+        conn = psycopg2.connect(self.database_url, connect_timeout=5)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {DATA_VERSION_CHANNEL}")
+        return conn
+
+    @staticmethod
+    def reload(conn) -> None:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT table_name, version FROM data_version")
+            _set_versions(dict(cursor.fetchall()))
+
+    def load_once(self) -> None:
+        """Read the current versions synchronously, before the first cache lookup."""
+        try:
+            conn = self._connect()
+        except Exception as e:
+            print(f"Error connecting for data versions: {e}")
+            return
+        try:
+            self.reload(conn)
+        except Exception as e:
+            print(f"Error loading data versions: {e}")
+        finally:
+            conn.close()
+
+    def run(self):
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                self.reload(conn)
+                while True:
+                    readable, _, _ = select.select([conn], [], [], DATA_VERSION_RELOAD_SECONDS)
+                    if not readable:
+                        self.reload(conn)
+                        continue
+                    conn.poll()
+                    notified = {}
+                    while conn.notifies:
+                        table_name, version = conn.notifies.pop(0).payload.rsplit(":", 1)
+                        notified[table_name] = int(version)
+                    _set_versions(notified)
+            except Exception as e:
+                print(f"Error listening for data versions: {e}")
+                if conn is not None:
+                    conn.close()
+                time.sleep(DATA_VERSION_RELOAD_SECONDS)
+
+
+def listener_enabled(database_url: str = DATABASE_URL) -> bool:
+    """
+    Whether versions are read from Postgres. Without it (DuckDB statistics, or
+    a non-Postgres database) every version stays 0 and cached results expire
+    by CACHE_TTL only.
+    """
+    return (
+        ANALYTICS_BACKEND == "postgres"
+        and make_url(database_url).get_backend_name() == "postgresql"
+    )
+
+
+def _ensure_listener() -> None:
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is not None:
+            return
+        if not listener_enabled():
+            # Checked once; the versions stay 0
+            _listener = False
+            return
+        listener = DataVersionListener()
+        listener.load_once()
+        listener.start()
+        _listener = listener
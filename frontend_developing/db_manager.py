@@ -1,44 +1,101 @@
+import asyncio
+import threading
+from pathlib import Path
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from models import Base
-from config import DATABASE_URL
-# from pymilvus import connections, FieldSchema, CollectionSchema, DataType, Collection
-# from pymilvus import utility
+from config import (
+    ASYNC_DATABASE_URL,
+    ASYNC_POOL_SIZE,
+    DATABASE_URL,
+    SQL_ECHO,
+    SQL_INSTRUMENTATION,
+)
+from instrumentation import instrument_engine
+import data_version  # registers the data-version bump on commit
+from summary_views import create_summary_views, drop_summary_views, refresh_summary_views
+from vector_store import open_vector_store
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def get_engine(database_url=DATABASE_URL):
+    """
+    Return the process-wide engine for a database URL.
+    Sharing one engine shares its connection pool and instrumentation hooks.
+    """
+    with _engines_lock:
+        engine = _engines.get(database_url)
+        if engine is None:
+            engine = create_engine(database_url, echo=SQL_ECHO, pool_pre_ping=True)
+            if SQL_INSTRUMENTATION:
+                instrument_engine(engine)
+            _engines[database_url] = engine
+        return engine
+
+
+class AsyncDBManager:
+    """
+    Async engine for concurrent read queries.
+
+    asyncpg connections belong to the event loop that opened them, so the
+    engine and all coroutines live on one event loop running in a background
+    thread for the lifetime of the process. Callers in Streamlit's script
+    threads hand coroutines over with `run` and block until they finish.
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, database_url=ASYNC_DATABASE_URL):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self.loop.run_forever, name="async-db-loop", daemon=True
+        ).start()
+        self.engine = create_async_engine(
+            database_url,
+            echo=SQL_ECHO,
+            pool_pre_ping=True,
+            pool_size=ASYNC_POOL_SIZE,
+        )
+        if SQL_INSTRUMENTATION:
+            instrument_engine(self.engine.sync_engine)
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    @classmethod
+    def get(cls, database_url=ASYNC_DATABASE_URL) -> "AsyncDBManager":
+        """Return the process-wide manager for a database URL."""
+        with cls._lock:
+            manager = cls._instances.get(database_url)
+            if manager is None:
+                manager = cls._instances[database_url] = cls(database_url)
+            return manager
+
+    def get_session(self):
+        """Return a new AsyncSession. One session runs one query at a time."""
+        return self.session_factory()
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
 
 
 class DBManager:
     def __init__(self, database_url=DATABASE_URL):
         """
-        Initialize the DataManager by creating a SQLAlchemy engine,
-        session factory, and a scoped session.
+        Initialize the DataManager with the shared SQLAlchemy engine,
+        a session factory, and a scoped session.
         """
-        self.engine = create_engine(database_url, echo=True)
+        self.engine = get_engine(database_url)
         self.session_factory = sessionmaker(
             autocommit=False, autoflush=False, bind=self.engine
         )
         self.Session = scoped_session(self.session_factory)
 
-        # connections.connect(alias="default", host="localhost", port="19530")
-
-        # collection_name = "paper_collection"
-        # fields = [
-        #     FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-        #     FieldSchema(name="paper_id", dtype=DataType.INT64),  # 论文 ID
-        #     FieldSchema(name="chunk_id", dtype=DataType.INT64),  # 论文中的 chunk 序号
-        #     FieldSchema(name="chunk_text", dtype=DataType.VARCHAR, max_length=5000),  # chunk 原始文本
-        #     FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=768),  # chunk 向量
-        #     FieldSchema(name="chunk_type", dtype=DataType.VARCHAR, max_length=50),  # chunk 类型 (如 abstract, conclusion)
-        # ]
-        # schema = CollectionSchema(fields, description="Collection for paper embeddings")
-
-        # self.vdb_collection = None
-        # if not utility.has_collection(collection_name):
-        #     self.vdb_collection = Collection(name=collection_name, schema=schema)
-        #     print(f"Collection {collection_name} created.")
-        # else:
-        #     self.vdb_collection = Collection(name=collection_name)
-        #     print(f"Collection {collection_name} already exists.")
-
     def get_session(self):
         """
         Return a new SQLAlchemy session.
@@ -47,7 +104,11 @@ class DBManager:
         return self.Session()
 
     def get_vdb_collection(self):
-        return self.vdb_collection
+        """
+        Return the paper chunk-embedding store (see vector_store.py).
+        It replaces the Milvus paper_collection and needs no service.
+        """
+        return open_vector_store()
 
     def close(self):
         """
@@ -62,22 +123,83 @@ class DBManager:
         This is useful when setting up a new database.
         """
         try:
+            self.create_extensions()
             Base.metadata.create_all(bind=self.engine)
+            create_summary_views(self.engine)
+            self.apply_migrations()
         except Exception as e:
             self.Session.rollback()
             print(f"Error: {e}")
 
+    def create_extensions(self):
+        """
+        Create the PostgreSQL extensions required by the schema.
+        pg_trgm backs the trigram index used for fuzzy affiliation matching.
+        """
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    def apply_migrations(self) -> list[str]:
+        """
+        Apply the SQL files in migrations/ that have not been applied yet, in name order.
+        Statements run in autocommit mode so CREATE INDEX CONCURRENTLY is allowed.
+
+        Returns:
+            list: Names of the migrations applied by this call
+        """
+        applied_now = []
+        with self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS schema_migration ("
+                    "version VARCHAR(255) PRIMARY KEY, "
+                    "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+                )
+            )
+            applied = set(
+                conn.execute(text("SELECT version FROM schema_migration")).scalars()
+            )
+            for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+                if path.stem in applied:
+                    continue
+                sql = "\n".join(
+                    line for line in path.read_text(encoding="utf-8").splitlines()
+                    if not line.strip().startswith("--")
+                )
+                for statement in sql.split(";"):
+                    if statement.strip():
+                        conn.exec_driver_sql(statement.strip())
+                conn.execute(
+                    text("INSERT INTO schema_migration (version) VALUES (:version)"),
+                    {"version": path.stem},
+                )
+                applied_now.append(path.stem)
+                print(f"Applied migration {path.stem}")
+        return applied_now
+
     def drop_all_tables(self):
         """
         Drop all tables.
         Caution: This permanently deletes all data.
         """
         try:
+            drop_summary_views(self.engine)
             Base.metadata.drop_all(bind=self.engine)
+            with self.engine.begin() as conn:
+                conn.execute(text("DROP TABLE IF EXISTS schema_migration"))
         except Exception as e:
             self.Session.rollback()
             print(f"Error: {e}")
 
+    def refresh_summary_views(self, views: list = None, concurrently: bool = True):
+        """
+        Refresh the materialized summary views read by the dashboard statistics.
+        Run after bulk imports; concurrent refresh keeps the views readable meanwhile.
+        """
+        refresh_summary_views(self.engine, views, concurrently=concurrently)
+
     def reset_database(self):
         """
         Reset the database by dropping all tables and then recreating them.
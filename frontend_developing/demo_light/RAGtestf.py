@@ -7,8 +7,13 @@
 
 import os
 import re
+import sys
 import json
+import shutil
+import hashlib
 import fitz
+import faiss
+import numpy as np
 import inspect
 from dotenv import load_dotenv
 import langchain_core
@@ -18,6 +23,7 @@ from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
@@ -27,6 +33,11 @@ from magic_pdf.data.data_reader_writer import FileBasedDataWriter, FileBasedData
 from magic_pdf.data.dataset import PymuDocDataset
 from magic_pdf.model.doc_analyze_by_custom_model import doc_analyze
 from magic_pdf.config.enums import SupportedPdfParseMethod
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1]))
+from config import PDF_INDEX_CACHE_DIR
+from retrieval import BM25Index, HybridRetriever
 
 
 # 保留您原有的图片处理代码
@@ -72,14 +83,22 @@ def rename_images_from_json(image_folder, json_file):
 
 
 class EnhancedPaperAnalyzer:
+    # 分块与向量配置；任一项变化都会使 PDF 索引缓存失效
+    EMBEDDING_MODEL = "text-embedding-3-large"
+    CHUNK_SIZE = 1000
+    CHUNK_OVERLAP = 200
+    SEPARATORS = ["\n\n", "\n", "(?<=\. )", " "]
+    INDEX_CACHE_FORMAT = 1
+
     def __init__(self, pdf_path: str):
         self.pdf_path = pdf_path
         self.vectorstore = None
         self.rag_chain = None
         self.figures = {}
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+        self.embeddings = OpenAIEmbeddings(model=self.EMBEDDING_MODEL)
         self.llm = ChatOpenAI(model="o1-mini")
         self.processed_chunks = []  # 新增实例变量存储分块列表
+        self.keyword_index = None  # 分块的 BM25 索引，与向量检索做混合检索
 
     def process_document(self, image_output_dir: str):
         """完整文档处理流程"""
@@ -135,6 +154,42 @@ class EnhancedPaperAnalyzer:
 
     def _process_text_with_langchain(self):
         """动态适配不同版本Document类的处理流程"""
+        # 同一 PDF 与相同分块/向量配置直接读取缓存，不再重新分块和调用向量接口
+        cache_dir = PDF_INDEX_CACHE_DIR / self._index_cache_key()
+        if (cache_dir / "index.faiss").exists():
+            processed_chunks, index = self._load_index_cache(cache_dir)
+            print(f"Loaded cached index with {len(processed_chunks)} chunks from {cache_dir}")
+        else:
+            processed_chunks = self._split_pdf()
+            embeddings = np.asarray(
+                self.embeddings.embed_documents(
+                    [doc.page_content for doc in processed_chunks]
+                ),
+                dtype=np.float32,
+            )
+            # 与 FAISS.from_documents 默认一致：L2 距离的精确索引
+            index = faiss.IndexFlatL2(embeddings.shape[1])
+            index.add(embeddings)
+            self._save_index_cache(cache_dir, processed_chunks, index)
+
+        self.vectorstore = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(
+                {str(i): doc for i, doc in enumerate(processed_chunks)}
+            ),
+            index_to_docstore_id={i: str(i) for i in range(len(processed_chunks))},
+        )
+        # 添加验证
+        print(f"Vectorstore created with {len(processed_chunks)} documents")
+        self.processed_chunks = processed_chunks
+        self.keyword_index = BM25Index()
+        self.keyword_index.add(
+            range(len(processed_chunks)), [doc.page_content for doc in processed_chunks]
+        )
+
+    def _split_pdf(self) -> List[Document]:
+        """加载 PDF 并分块，每块记录 chunk_index"""
         # 获取Document构造函数参数列表
         init_args = inspect.getfullargspec(Document.__init__).args
 
@@ -145,9 +200,9 @@ class EnhancedPaperAnalyzer:
         pages = loader.load()
 
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", "(?<=\. )", " "],
+            chunk_size=self.CHUNK_SIZE,
+            chunk_overlap=self.CHUNK_OVERLAP,
+            separators=self.SEPARATORS,
         )
 
         chunks = text_splitter.split_documents(pages)
@@ -162,10 +217,57 @@ class EnhancedPaperAnalyzer:
         print(
             f"Processed chunks metadata: {[doc.metadata for doc in processed_chunks]}"
         )
-        self.vectorstore = FAISS.from_documents(processed_chunks, self.embeddings)
-        # 添加验证
-        print(f"Vectorstore created with {len(processed_chunks)} documents")
-        self.processed_chunks = processed_chunks
+        return processed_chunks
+
+    def _index_cache_key(self) -> str:
+        """PDF 内容与分块/向量配置的 SHA-256，作为缓存目录名"""
+        digest = hashlib.sha256()
+        with open(self.pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        config = {
+            "format": self.INDEX_CACHE_FORMAT,
+            "loader": "PyPDFLoader",
+            "chunk_size": self.CHUNK_SIZE,
+            "chunk_overlap": self.CHUNK_OVERLAP,
+            "separators": self.SEPARATORS,
+            "embedding_model": self.EMBEDDING_MODEL,
+        }
+        digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _save_index_cache(self, cache_dir: Path, chunks: List[Document], index):
+        """写入临时目录后整体改名，读取方不会看到写了一半的缓存"""
+        tmp_dir = cache_dir.with_name(f"{cache_dir.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        with open(tmp_dir / "chunks.json", "w", encoding="utf-8") as f:
+            json.dump(
+                [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in chunks],
+                f,
+                ensure_ascii=False,
+            )
+        faiss.write_index(index, str(tmp_dir / "index.faiss"))
+        try:
+            os.replace(tmp_dir, cache_dir)
+        except OSError:
+            # 其他进程已写入同一缓存
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _load_index_cache(self, cache_dir: Path):
+        """读取分块列表，并尽量以内存映射方式打开 FAISS 索引（向量只存于索引中）"""
+        with open(cache_dir / "chunks.json", encoding="utf-8") as f:
+            chunks = [Document(**item) for item in json.load(f)]
+        path = str(cache_dir / "index.faiss")
+        # IndexFlat 只有 IO_FLAG_MMAP_IFC（faiss >= 1.8）才会内存映射；
+        # 旧版本没有该标志，IO_FLAG_MMAP 对 IndexFlat 无效，只能整份读入内存
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+        if mmap_flag is not None:
+            try:
+                return chunks, faiss.read_index(path, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError as e:
+                print(f"Error memory-mapping {path}, reading it into memory: {e}")
+        return chunks, faiss.read_index(path)
 
     def generate_analysis(self):
         """生成双索引分析报告"""
@@ -222,7 +324,8 @@ class EnhancedPaperAnalyzer:
         """
         # 示例格式：
         #     "该研究提出了新型神经网络架构[12]，如图1所示，在ImageNet数据集上达到92.4%准确率[15]。"
-        retriever = self.vectorstore.as_retriever(search_kwargs={"k": 40})
+        # BM25 + 向量混合检索，模型名、缩写等关键词也能召回
+        retriever = RunnableLambda(lambda query: self._hybrid_retrieve(query, k=40))
         prompt = ChatPromptTemplate.from_template(prompt_template)
 
         self.rag_chain = (
@@ -237,6 +340,18 @@ class EnhancedPaperAnalyzer:
             "请详细分析论文HiRT: Enhancing Robotic Control with Hierarchical Robot Transformers"
         )
 
+    def _hybrid_retrieve(self, query: str, k: int) -> List[Document]:
+        """BM25 与 FAISS 两路检索结果按倒数排名融合"""
+
+        def dense(text, n, keys):
+            docs = self.vectorstore.similarity_search(text, k=n)
+            return [int(doc.metadata["chunk_index"]) for doc in docs]
+
+        retriever = HybridRetriever(
+            self.keyword_index, dense, candidates=len(self.processed_chunks)
+        )
+        return [self.processed_chunks[i] for i, _ in retriever.search(query, k)]
+
     def _format_context(self, docs: List[Document]) -> str:
         """动态内容访问方法"""
         # 检测可用内容属性
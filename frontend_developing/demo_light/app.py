@@ -5,6 +5,10 @@ from streamlit_option_menu import option_menu
 
 from demo_pages import DataSet, DeepDive, DashBoard
 from demo_pages.dashboard.conference import Conference  # Import Conference
+from utility.visualization_utli import QueryDebugDisplay
+from config import SQL_DEBUG_PANEL
+from instrumentation import record_rerun
+from cache import get_cache
 
 
 def load_css():
@@ -19,6 +23,18 @@ def load_css():
 
 def main():
     st.set_page_config(layout="wide")
+    page = (
+        st.session_state.get("selected_conference")
+        if st.session_state.get("view_conference")
+        else st.session_state.get("menu_selection")
+    )
+    with record_rerun(page or "app") as recorder:
+        render_app()
+    if SQL_DEBUG_PANEL:
+        QueryDebugDisplay.show_query_panel(recorder.summary(), get_cache().metrics())
+
+
+def render_app():
     load_css()
     st.title("DeepSight Demo")
 
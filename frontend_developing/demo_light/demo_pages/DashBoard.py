@@ -59,8 +59,8 @@ class FilterHandlers:
     def handle_conference_filter():
         with DataManagerContext() as managers:
             # Get available years and conferences
-            available_years = managers["conference"].get_all_years()
-            available_conferences = managers["conference"].get_all_conferences()
+            available_years = managers["stats"].get_years()
+            available_conferences = managers["stats"].get_conferences()
 
             current_year = st.session_state.get("selected_year")
             current_conf = st.session_state.get("selected_conference")
@@ -1,53 +1,13 @@
+import html
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from streamlit_option_menu import option_menu
+from utility.db_util import DataManagerContext
+
+SEARCH_PAGE_SIZE = 20
 
 
-paper_data = [
-    {
-        "title": "Large Language Models in Scientific Discovery",
-        "authors": "John Smith, Mary Brown",
-        "affiliation": "Stanford University",
-        "conference": "NeurIPS",
-        "year": 2024,
-        "citations": 45,
-        "abstract": "This paper explores the application of large language models in scientific research...",
-        "keywords": ["LLM", "Scientific Discovery", "AI"],
-        "pdf_link": "[PDF](#)",
-        "code_link": "https://github.com/example/llm-science",
-        "methodology": [
-            "Data collection from scientific papers",
-            "Fine-tuning LLMs on scientific corpus",
-            "Evaluation on discovery tasks"
-        ],
-        "results": "Achieved 85% accuracy in predicting scientific outcomes..."
-    },
-    {
-        "title": "Neural Network Architecture Search",
-        "authors": "Rachel Williams",
-        "affiliation": "MIT",
-        "conference": "ICML",
-        "year": 2023,
-        "citations": 89,
-        "abstract": "A novel approach to automated neural architecture search...",
-        "keywords": ["Neural Architecture", "AutoML", "Optimization"],
-        "pdf_link": "[PDF](#)",
-        "code_link": "https://github.com/example/neural-arch"
-    },
-    {
-        "title": "Reinforcement Learning in Robotics",
-        "authors": "Kevin Davis",
-        "affiliation": "Stanford Robotics",
-        "conference": "ICLR",
-        "year": 2023,
-        "citations": 67,
-        "abstract": "Implementing advanced RL algorithms in robotic systems...",
-        "keywords": ["Robotics", "Reinforcement Learning", "Control"],
-        "pdf_link": "[PDF](#)",
-        "code_link": "https://github.com/example/robot-rl"
-    }
-]
 author_data = [
     {
         "name": "John Smith",
@@ -134,8 +94,44 @@ affiliation_data = [
     }
 ]
 
+@st.cache_data(ttl=300)
+def search_papers(query: str, filters: dict, page: int = 0) -> tuple[list[dict], int, bool]:
+    """
+    Run a full-text paper search and return one page of results, the total
+    count and whether that count is exact.
+    """
+    with DataManagerContext() as managers:
+        results = managers["paper"].search(
+            query, filters, limit=SEARCH_PAGE_SIZE, offset=page * SEARCH_PAGE_SIZE
+        )
+        total, exact = managers["paper"].count_search_results(query, filters)
+
+    for paper in results:
+        paper["authors"] = ", ".join(paper["authors"])
+        paper["affiliation"] = ", ".join(paper["affiliations"][:3])
+    return results, total, exact
+
+
+@st.cache_data(ttl=300)
+def related_papers(paper_id: int, metric: str = "cocitation") -> list[dict]:
+    """Papers related to a paper through the citation graph."""
+    with DataManagerContext() as managers:
+        related = managers["paper"].get_related_by_citation(paper_id, metric=metric)
+        return [
+            {"title": paper.title, "year": paper.year, "shared": int(score)}
+            for paper, score in related
+        ]
+
+
 def render_paper_container(idx, paper):
     """Return a clickable HTML container for a paper row."""
+    # title_highlight and snippet arrive escaped, with <mark> tags around matches
+    snippet = paper.get("snippet")
+    snippet_html = (
+        f'<div style="font-size: 0.85em; color: #555; margin-top: 5px;">{snippet}</div>'
+        if snippet
+        else ""
+    )
     return f"""
     <div class="paper-container" onclick="document.getElementById('hidden_button_{idx}').click()" style="
         padding: 10px;
@@ -147,11 +143,12 @@ def render_paper_container(idx, paper):
         margin-bottom: 10px;
     ">
         <div style="font-size: 0.9em; color: #1f77b4;">
-            {paper['conference']} {paper['year']} | {paper['authors']} | {paper['affiliation']}
+            {html.escape(f"{paper['conference']} {paper['year']} | {paper['authors']} | {paper['affiliation']}")}
         </div>
         <div style="font-size: 1.1em; font-weight: bold; margin-top: 5px;">
-            {paper['title']}
+            {paper.get('title_highlight') or html.escape(paper['title'])}
         </div>
+        {snippet_html}
     </div>
     """
 
@@ -411,12 +408,19 @@ def render_search_results(query, filters=None):
 
     if new_search and new_query:
         st.session_state.last_query = new_query
+        st.session_state.search_page = 0
         if "selected_row" in st.session_state:
             del st.session_state.selected_row
         st.rerun()
 
     if st.session_state.get("last_query"):
-        # Example results data
+        papers, total_papers, exact_total = [], 0, True
+        if st.session_state.search_mode == "Paper":
+            # Filter-only searches carry a "Filters: ..." label instead of a text query
+            text_query = "" if query.startswith("Filters: ") else query
+            papers, total_papers, exact_total = search_papers(
+                text_query, filters or {}, st.session_state.get("search_page", 0)
+            )
 
         # Two-column layout: table on left, details on right
         st.markdown(
@@ -465,7 +469,15 @@ def render_search_results(query, filters=None):
                         st.rerun()
             
             else:  # Paper search results
-                for idx, paper in enumerate(paper_data):
+                page = st.session_state.get("search_page", 0)
+                if not papers:
+                    st.info("No papers found.")
+                else:
+                    st.markdown(
+                        f"{page * SEARCH_PAGE_SIZE + 1}-{page * SEARCH_PAGE_SIZE + len(papers)} "
+                        f"of {total_papers:,}{'' if exact_total else '+'} papers"
+                    )
+                for idx, paper in enumerate(papers):
                     paper_col, button_col = st.columns([0.92, 0.08])
                     with paper_col:
                         st.markdown(render_paper_container(idx, paper), unsafe_allow_html=True)
@@ -473,6 +485,20 @@ def render_search_results(query, filters=None):
                         if st.button("→", key=f"button_{idx}", help="Click to view details"):
                             st.session_state.selected_row = ("paper", idx)
                             st.rerun()
+
+                prev_col, _, next_col = st.columns([1, 4, 1])
+                with prev_col:
+                    if page > 0 and st.button("← Previous", key="search_prev_page"):
+                        st.session_state.search_page = page - 1
+                        st.session_state.selected_row = None
+                        st.rerun()
+                with next_col:
+                    if (page + 1) * SEARCH_PAGE_SIZE < total_papers and st.button(
+                        "Next →", key="search_next_page"
+                    ):
+                        st.session_state.search_page = page + 1
+                        st.session_state.selected_row = None
+                        st.rerun()
         
         with col2:
             if "selected_row" in st.session_state and st.session_state.selected_row is not None:
@@ -505,8 +531,8 @@ def render_search_results(query, filters=None):
                     st.markdown("**Notable Projects:**")
                     st.markdown("\n".join([f"- {project}" for project in selected_item['notable_projects']]))
                 
-                else:  # paper details
-                    selected_item = paper_data[idx]
+                elif idx < len(papers):  # paper details
+                    selected_item = papers[idx]
                     st.markdown("### Paper Details")
                     st.markdown(f"**Title:** {selected_item['title']}")
                     st.markdown(f"**Authors:** {selected_item['authors']}")
@@ -517,6 +543,14 @@ def render_search_results(query, filters=None):
                     st.markdown(selected_item['abstract'])
                     st.markdown("**Keywords:**")
                     st.markdown(", ".join(selected_item['keywords']))
+
+                    related = related_papers(selected_item['paper_id'])
+                    if related:
+                        st.markdown("**Related by citation:**")
+                        st.markdown("\n".join(
+                            f"- {paper['title']} ({paper['year']}, co-cited {paper['shared']}x)"
+                            for paper in related
+                        ))
                     
                     if st.button("Add to Cart"):
                         if len(st.session_state.cart) < 3 and selected_item['title'] not in st.session_state.cart:
@@ -559,6 +593,8 @@ def dataset_page():
         st.session_state.selected_row = None
     if "search_mode" not in st.session_state:
         st.session_state.search_mode = "Paper"
+    if "search_page" not in st.session_state:
+        st.session_state.search_page = 0
 
     try:
         year, conference, organization, keywords, filter_search = initialize_filters()
@@ -568,13 +604,21 @@ def dataset_page():
             if main_search and query:
                 st.session_state.has_searched = True
                 st.session_state.last_query = query
+                st.session_state.search_page = 0
                 st.rerun()
             elif filter_search and any([year, conference, organization, keywords]):
                 st.session_state.has_searched = True
                 st.session_state.last_query = f"Filters: {', '.join(filter(None, [str(year), str(conference), str(organization), str(keywords)]))}"
+                st.session_state.search_page = 0
                 st.rerun()
         else:
-            render_search_results(st.session_state.get("last_query", ""))
+            filters = {
+                "years": year,
+                "conferences": conference,
+                "organizations": organization,
+                "keywords": keywords,
+            }
+            render_search_results(st.session_state.get("last_query", ""), filters)
 
     except Exception as e:
         st.error(f"Error initializing filters: {str(e)}")
@@ -12,6 +12,7 @@ from utility.db_util import (
     DataLoader,
     CompanyMatcher,
     TopicAnalyzer,
+    InstanceSnapshot,
 )
 from utility.visualization_utli import DashboardLayout, ConferenceVisualization, CompanyVisualization, TopicVisualization
 from utility.conf_util import SessionFilterHandler
@@ -20,6 +21,7 @@ import altair as alt
 import circlify
 import plotly.express as px  # Add this import for Plotly Express
 
+PAPER_PAGE_SIZE = 50
 
 
 class Conference:
@@ -552,82 +554,20 @@ class Conference:
     #                                   instance                                   #
     # ---------------------------------------------------------------------------- #
     @staticmethod
-    @cache_data(ttl=3600)  # Cache for 1 hour
-    def _prepare_instance_data(year: int, conference: str):
-        """Cache all data preparation for the instance"""
-        with DataManagerContext() as managers:
-            # Get conference instance and session data
-            instance = managers["conference"].get_instance_by_year_and_name(year, conference)
-            if not instance:
-                return None
-            
-            # Use the DataLoader utility to load session data
-            session_data = DataLoader.load_session_data(instance.instance_id)
-            if not session_data:
-                return None
-            
-            # Prepare date information
-            available_dates = [day_data["date"] for day_data in session_data]
-            days_of_week = [day_data["day"] for day_data in session_data]
-            date_labels = [
-                f"{day} ({datetime.strptime(date, '%Y-%m-%d').strftime('%B %d')})"
-                for day, date in zip(days_of_week, available_dates)
-            ]
-            
-            # Prepare filter options for each day using the SessionFilterHandler
-            filter_options = SessionFilterHandler.prepare_filter_options(session_data)
-            
-            return {
-                "instance": instance,
-                "session_data": session_data,
-                "date_labels": date_labels,
-                "filter_options": filter_options
-            }
-        
-    @staticmethod
-    @cache_data(ttl=3600)  # Cache for 1 hour
-    def _get_topic_data_cached(instance_id):
-        """Cache topic data retrieval to prevent redundant database queries."""
-        with DataManagerContext() as managers:
-            # Get all sessions for this instance
-            sessions = managers["conference"].get_sessions_by_instance(instance_id)
-            if not sessions:
-                return None
-            
-            # Extract topic data using the TopicAnalyzer utility
-            return TopicAnalyzer.extract_topic_data(sessions)
-        
-    @staticmethod
-    @cache_data(ttl=3600)  # Cache for 1 hour
-    def _get_company_data_cached(instance_id):
-        """Cache company data retrieval to prevent redundant database queries."""
-        with DataManagerContext() as managers:
-            # Use the DataLoader utility to load session data
-            session_data = DataLoader.load_session_data(instance_id)
-            if not session_data:
-                return None, None
-            
-            # Extract company data
-            cloud_data = CompanyMatcher.extract_company_topic_data(
-                session_data, 
-                CompanyMatcher.CLOUD_COMPANIES, 
-                CompanyMatcher.CLOUD_COMPANY_ALIASES
-            )
-            
-            oem_data = CompanyMatcher.extract_company_topic_data(
-                session_data, 
-                CompanyMatcher.OEM_COMPANIES, 
-                CompanyMatcher.OEM_COMPANY_ALIASES
-            )
-            
-            return cloud_data, oem_data
-    
+    @cache_data(max_entries=64)  # No TTL: a write bumps data_version instead
+    def _prepare_instance_data(year: int, conference: str, data_version: tuple):
+        """
+        Cache the instance snapshot, once per instance and data version.
+        All conference views read from it instead of re-fetching sessions.
+        """
+        return InstanceSnapshot.load(year, conference)
+
     @staticmethod
-    def _render_session_insights(instance):
+    def _render_session_insights(instance, snapshot):
         """Render insights for session-based conferences."""
-        # Get cached data using only the instance_id (which is hashable)
-        topic_data = Conference._get_topic_data_cached(instance.instance_id)
-        cloud_data, oem_data = Conference._get_company_data_cached(instance.instance_id)
+        # Topic and company data come from the cached instance snapshot
+        topic_data = snapshot.topic_data
+        cloud_data, oem_data = snapshot.cloud_data, snapshot.oem_data
         
         # Render topic insights
         if topic_data:
@@ -831,15 +771,17 @@ class Conference:
             st.session_state.selected_session = idx
             
         # Get cached data
-        data = Conference._prepare_instance_data(year, conference)
-        if data is None:
+        snapshot = Conference._prepare_instance_data(
+            year, conference, InstanceSnapshot.data_version()
+        )
+        if snapshot is None:
             st.error(f"No conference instance found for {conference} {year}")
             return
 
-        instance = data["instance"]
-        session_data = data["session_data"]
-        date_labels = data["date_labels"]
-        filter_options = data["filter_options"]
+        instance = snapshot.instance
+        session_data = snapshot.session_data
+        date_labels = snapshot.date_labels
+        filter_options = snapshot.filter_options
 
         # Determine if this is a session-based conference (like GTC) or a paper-based academic conference
         is_session_based = Conference._is_session_based_conference(conference)
@@ -867,7 +809,7 @@ class Conference:
         with tabs[1]:
             # Statistics or insights tab content
             if is_session_based:
-                Conference._render_session_insights(instance)
+                Conference._render_session_insights(instance, snapshot)
             else:
                 Conference._render_instance_statistics(year, conference, instance)
 
@@ -883,17 +825,37 @@ class Conference:
     @staticmethod
     def _render_paper_based_view(instance, year, conference):
         """Render the view for paper-based academic conferences."""
-        # This would display paper information, authors, citations, etc.
+        # Papers are fetched one keyset page at a time; the cursors of the pages
+        # visited so far are kept so that "Previous" can go back.
+        state_key = f"paper_pages_{conference}_{year}"
+        sort = st.selectbox(
+            "Sort papers by",
+            options=["citations", "title"],
+            format_func=str.title,
+            key=f"{state_key}_sort",
+        )
+        pages = st.session_state.setdefault(state_key, {"sort": sort, "cursors": [None]})
+        if pages["sort"] != sort:
+            pages.update(sort=sort, cursors=[None])
+
         with DataManagerContext() as managers:
-            papers = managers["paper"].get_papers_by_conference(conference, year)
-            
-            if not papers:
+            page = managers["paper"].get_papers_page(
+                conference,
+                year,
+                sort=sort,
+                cursor=pages["cursors"][-1],
+                page_size=PAPER_PAGE_SIZE,
+                profile="list",
+            )
+
+            papers = page["papers"]
+            if not papers and len(pages["cursors"]) == 1:
                 st.info(f"No papers found for {conference} {year}")
                 return
-                
+
             # Display paper count
-            st.metric("Total Papers", len(papers))
-            
+            st.metric("Total Papers", f"{page['total_estimate']:,}")
+
             # Create a dataframe with paper information
             papers_df = pd.DataFrame([
                 {
@@ -904,7 +866,41 @@ class Conference:
                 }
                 for paper in papers
             ])
-            
+
             # Display the papers in a table
             st.dataframe(papers_df, use_container_width=True)
+
+            influential = managers["paper"].get_influential_papers(conference, year)
+            if influential:
+                with st.expander("Most influential papers (citation graph PageRank)"):
+                    st.dataframe(
+                        pd.DataFrame([
+                            {
+                                "Title": paper.title,
+                                "Cited in corpus": in_corpus_citations,
+                                "PageRank": pagerank,
+                                "Citations": paper.citation_count or 0,
+                            }
+                            for paper, in_corpus_citations, pagerank in influential
+                        ]),
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={"PageRank": st.column_config.NumberColumn(format="%.2e")},
+                    )
+
+        page_number = len(pages["cursors"])
+        total_pages = max(1, -(-page["total_estimate"] // PAPER_PAGE_SIZE))
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("Previous", disabled=page_number == 1, key=f"{state_key}_prev"):
+                pages["cursors"].pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Page {page_number} of ~{total_pages}")
+        with col3:
+            if st.button(
+                "Next", disabled=page["next_cursor"] is None, key=f"{state_key}_next"
+            ):
+                pages["cursors"].append(page["next_cursor"])
+                st.rerun()
     
\ No newline at end of file
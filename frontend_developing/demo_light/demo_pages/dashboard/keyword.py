@@ -11,134 +11,47 @@ class Keyword:
     @staticmethod
     def render(keyword: str):
         """Render keyword-specific data."""
-        # Fake data for demonstration
-        fake_papers = [
-            {
-                "title": f"Paper about {keyword} #{i}",
-                "authors": ["Author A", "Author B"],
-                "year": 2023 - (i % 3),
-                "conference": ["ICSE", "FSE", "ASE"][i % 3],
-                "citations": 50 - (i * 2),
-                "abstract": f"This is a research paper about {keyword} and its applications...",
-            }
-            for i in range(10)
-        ]
+        with DataManagerContext() as managers:
+            papers = managers["paper"].get_papers_by_keyword(keyword, profile="list")
+            related_keywords = managers["keyword"].get_related_keywords(
+                keyword, limit=8
+            )
 
-        fake_related_keywords = [
-            {"keyword": f"related_{keyword}_{i}", "papers": 20 - i} for i in range(5)
-        ]
+            if not papers:
+                st.info(f"No papers found for {keyword}")
+                return
 
-        DashboardLayout.show_keyword_layout(fake_papers, keyword, fake_related_keywords)
+            DashboardLayout.show_keyword_layout(papers, keyword, related_keywords)
 
     @staticmethod
     def render_overview():
         """Render overview of all keywords and trends."""
         # st.header("Research Topics & Trends")
+        with DataManagerContext() as managers:
+            years, conferences = managers["keyword"].get_keyword_trend_scope()
+            if not years:
+                st.info(
+                    "Keyword trends have not been computed yet. "
+                    "Run `python -m analytics.keyword_trends`."
+                )
+                return
 
-        # Fake keyword statistics
-        keyword_stats = {
-            "keywords": [
-                "machine learning",
-                "deep learning",
-                "neural networks",
-                "computer vision",
-                "NLP",
-                "software testing",
-                "cloud computing",
-                "agile development",
-            ],
-            "trending": ["machine learning", "deep learning", "computer vision"],
-            "new_keywords": 5,
-            "hottest_topic": "machine learning",
-            "trends": {
-                "machine learning": {
-                    "years": [2021, 2022, 2023],
-                    "counts": [80, 90, 100],
-                },
-                "deep learning": {"years": [2021, 2022, 2023], "counts": [60, 70, 80]},
-                "neural networks": {
-                    "years": [2021, 2022, 2023],
-                    "counts": [55, 60, 60],
-                },
-            },
-            "connections": {
-                "nodes": [
-                    {"id": "machine learning", "papers": 150},
-                    {"id": "deep learning", "papers": 120},
-                    {"id": "neural networks", "papers": 100},
-                    {"id": "computer vision", "papers": 90},
-                    {"id": "natural language processing", "papers": 85},
-                ],
-                "edges": [
-                    {
-                        "source": "machine learning",
-                        "target": "deep learning",
-                        "weight": 45,
-                    },
-                    {
-                        "source": "deep learning",
-                        "target": "neural networks",
-                        "weight": 30,
-                    },
-                    {
-                        "source": "computer vision",
-                        "target": "deep learning",
-                        "weight": 25,
-                    },
-                    {
-                        "source": "natural language processing",
-                        "target": "deep learning",
-                        "weight": 20,
-                    },
-                ],
-            },
-            "yearly_top": {
-                2023: [
-                    {"keyword": "machine learning", "count": 100, "trend": "↑"},
-                    {"keyword": "deep learning", "count": 80, "trend": "↑"},
-                    {"keyword": "neural networks", "count": 60, "trend": "→"},
-                    {"keyword": "computer vision", "count": 50, "trend": "↑"},
-                    {"keyword": "NLP", "count": 45, "trend": "↑"},
-                ],
-                2022: [
-                    {"keyword": "machine learning", "count": 90, "trend": "↑"},
-                    {"keyword": "deep learning", "count": 70, "trend": "↑"},
-                    {"keyword": "neural networks", "count": 60, "trend": "→"},
-                    {"keyword": "software testing", "count": 40, "trend": "↓"},
-                    {"keyword": "agile development", "count": 35, "trend": "→"},
-                ],
-                2021: [
-                    {"keyword": "machine learning", "count": 80, "trend": "↑"},
-                    {"keyword": "deep learning", "count": 60, "trend": "↑"},
-                    {"keyword": "neural networks", "count": 55, "trend": "→"},
-                    {"keyword": "software testing", "count": 45, "trend": "→"},
-                    {"keyword": "cloud computing", "count": 40, "trend": "↓"},
-                ],
-            },
-            "top_pairs": [
-                ("machine learning", "deep learning"),
-                ("deep learning", "neural networks"),
-                ("computer vision", "deep learning"),
-                ("NLP", "machine learning"),
-                ("neural networks", "computer vision"),
-            ],
-            "growth_rates": [
-                {"keyword": "machine learning", "growth_rate": 25},
-                {"keyword": "deep learning", "growth_rate": 33},
-                {"keyword": "computer vision", "growth_rate": 20},
-                {"keyword": "NLP", "growth_rate": 15},
-                {"keyword": "cloud computing", "growth_rate": 10},
-            ],
-            "emerging": [
-                {"name": "Transformer Models", "growth_rate": 150, "first_seen": 2021},
-                {"name": "Few-shot Learning", "growth_rate": 120, "first_seen": 2021},
-                {
-                    "name": "Graph Neural Networks",
-                    "growth_rate": 90,
-                    "first_seen": 2022,
-                },
-            ],
-        }
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                conference = st.selectbox(
+                    "Conference", options=["All"] + conferences, key="keyword_conference"
+                )
+            with col2:
+                year = st.selectbox(
+                    "Year", options=years[::-1], key="keyword_year"
+                )
+            keyword_stats = managers["keyword"].get_keyword_trends(
+                year=int(year), conference=None if conference == "All" else conference
+            )
+
+        if not keyword_stats or not keyword_stats["keywords"]:
+            st.info(f"No keywords found for {conference} {year}")
+            return
 
         # Top metrics
         st.subheader("Quick Statistics")
@@ -156,7 +69,7 @@ class Keyword:
         """
         st.markdown(metric_style, unsafe_allow_html=True)
         with col1:
-            st.metric("Total Keywords", len(keyword_stats["keywords"]))
+            st.metric("Total Keywords", keyword_stats["keywords"])
         with col2:
             st.metric("Trending Topics", len(keyword_stats["trending"]))
         with col3:
@@ -177,11 +90,16 @@ class Keyword:
             trend_col, detail_col = st.columns([2, 1])
 
             with trend_col:
-                growth_fig = Keyword._create_growth_chart(keyword_stats["growth_rates"])
-                st.plotly_chart(growth_fig, use_container_width=True)
+                if keyword_stats["growth_rates"]:
+                    growth_fig = Keyword._create_growth_chart(keyword_stats["growth_rates"])
+                    st.plotly_chart(growth_fig, use_container_width=True)
+                else:
+                    st.info("No growth rates for the first year on record.")
 
             with detail_col:
                 st.markdown("#### Fast-Growing Topics")
+                if not keyword_stats["emerging"]:
+                    st.caption("No new topics are growing this year.")
                 for topic in keyword_stats["emerging"]:
                     st.markdown(
                         f"""
@@ -1,5 +1,6 @@
 import streamlit as st
 from utility.db_util import DataManagerContext
+from utility.visualization_utli import ChartDisplay
 import plotly.graph_objects as go
 import networkx as nx
 import pandas as pd
@@ -11,61 +12,39 @@ class Organization:
     @staticmethod
     def render(organization: str):
         """Render organization-specific data."""
-        # Updated fake data for specific organization
-        org_stats = {
-            "name": organization,
-            "total_papers": 150,
-            "total_citations": 2500,
-            "top_authors": [
-                {"name": "John Smith", "papers": 20, "citations": 300},
-                {"name": "Jane Doe", "papers": 15, "citations": 250},
-                {"name": "Bob Johnson", "papers": 12, "citations": 200},
-            ],
-            "recent_papers": [
+        with DataManagerContext() as managers:
+            profile = managers["org"].get_organization_profile(organization)
+            if profile is None:
+                st.info(
+                    "The publication cube has not been built yet. "
+                    "Run `python -m analytics.publication_cube`."
+                )
+                return
+            recent_papers = [
                 {
-                    "title": f"Research Paper {i}",
-                    "authors": ["Author A", "Author B"],
-                    "year": 2024 - (i % 3),
-                    "conference": ["ICSE", "FSE", "ASE"][i % 3],
-                    "citations": 50 - (i * 2),
+                    "title": paper.title,
+                    "authors": [author.name for author in paper.author_to_paper],
+                    "year": paper.year,
+                    "conference": paper.instance_to_paper.conference_name,
+                    "citations": paper.citation_count or 0,
                 }
-                for i in range(10)
-            ],
-            "yearly_papers": {
-                "years": [2019, 2020, 2021, 2022, 2023],
-                "counts": [30, 35, 40, 45, 50],
-                "areas": ["AI", "ML", "SE", "DevOps", "Security"],
-            },
-            "keywords": [
-                {"keyword": "AI", "count": 100},
-                {"keyword": "ML", "count": 80},
-                {"keyword": "DevOps", "count": 60},
-            ],
-            "authors_by_year": {
-                "years": [2019, 2020, 2021, 2022, 2023],
-                "chinese": [5, 6, 7, 8, 9],
-                "non_chinese": [10, 12, 14, 16, 18],
-            },
-            "research_trends": {
-                "years": [2019, 2020, 2021, 2022, 2023],
-                "topics": {
-                    "AI": [20, 25, 35, 45, 55],
-                    "ML": [15, 20, 30, 40, 45],
-                    "SE": [25, 28, 30, 32, 35],
-                    "DevOps": [10, 15, 18, 20, 22],
-                    "Security": [8, 12, 15, 18, 20],
-                },
-            },
-            "buzzword_trends": {
-                "years": [2019, 2020, 2021, 2022, 2023],
-                "keywords": {
-                    "LLM": [0, 5, 15, 35, 60],
-                    "Neural Networks": [20, 25, 30, 35, 40],
-                    "Cloud Computing": [15, 18, 20, 22, 25],
-                    "DevOps": [10, 15, 20, 25, 30],
-                    "Blockchain": [5, 8, 10, 12, 15],
-                },
-            },
+                # The card profile eager-loads the conference instance
+                for paper in managers["paper"].get_papers_by_organization(
+                    organization, profile="card", limit=5
+                )
+            ]
+            top_authors = [
+                {"name": name, "papers": papers, "citations": citations}
+                for name, papers, citations in managers[
+                    "paper"
+                ].get_organization_top_authors(organization, limit=3)
+            ]
+
+        org_stats = {
+            "name": organization,
+            "top_authors": top_authors,
+            "recent_papers": recent_papers,
+            **profile,
         }
 
         st.header(f"Research Profile: {organization}")
@@ -140,44 +119,35 @@ class Organization:
         # ---------------------------------------------------------------------------- #
         left_col, right_col = st.columns([2, 1])
         with left_col:
-            tab1, tab2, tab3, tab4 = st.tabs(
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(
                 [
                     "Paper Count by Year",
                     "Author by Year",
                     "Trend in Research Topic",
                     "Trend in Buzzword",
+                    "Collaboration Network",
                 ]
             )
 
             with tab1:
-                # ------------- Stacked bar chart showing research areas by year ------------- #
+                # --------------- Stacked bar chart showing conferences by year --------------- #
                 fig = go.Figure()
-                years = org_stats["yearly_papers"]["years"]
-                areas = org_stats["yearly_papers"]["areas"]
-
-                # Generate fake data for each area per year
-                area_data = {
-                    "AI": [10, 12, 15, 18, 20],
-                    "ML": [8, 10, 12, 14, 15],
-                    "SE": [5, 6, 7, 8, 9],
-                    "DevOps": [4, 4, 3, 3, 4],
-                    "Security": [3, 3, 3, 2, 2],
-                }
-
-                colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd"]
-                for area, color in zip(areas, colors):
+                yearly_papers = org_stats["yearly_papers"]
+                for conference, values in yearly_papers["conferences"].items():
                     fig.add_trace(
                         go.Bar(
-                            name=area, x=years, y=area_data[area], marker_color=color
+                            name=conference,
+                            x=yearly_papers["years"],
+                            y=values,
                         )
                     )
 
                 fig.update_layout(
                     barmode="stack",
-                    title="Paper Count by Year and Research Area",
+                    title="Paper Count by Year and Conference",
                     xaxis_title="Year",
                     yaxis_title="Number of Papers",
-                    legend_title="Research Areas",
+                    legend_title="Conferences",
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -200,11 +170,19 @@ class Organization:
                         marker_color="orange",
                     )
                 )
+                fig.add_trace(
+                    go.Bar(
+                        x=org_stats["authors_by_year"]["years"],
+                        y=org_stats["authors_by_year"]["unknown"],
+                        name="Unknown",
+                        marker_color="lightgray",
+                    )
+                )
                 fig.update_layout(
                     barmode="stack",
                     title="Authors by Year",
                     xaxis_title="Year",
-                    yaxis_title="Number of Authors",
+                    yaxis_title="Authors (summed over papers)",
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -256,6 +234,15 @@ class Organization:
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
+            with tab5:
+                # ------------- Partners of this organization and its authors ------------- #
+                Organization._render_collaboration_network(
+                    conferences=org_stats["conferences"],
+                    years=org_stats["years"],
+                    organization=organization,
+                    key=f"collab_{organization}",
+                )
+
         # ---------------------------------------------------------------------------- #
         #         Right column with expandable sections for authors and papers         #
         # ---------------------------------------------------------------------------- #
@@ -324,60 +311,14 @@ class Organization:
     @staticmethod
     def render_overview():
         """Render overview of all organizations."""
-        # Fake data for organization overview
-        org_stats = {
-            "total_orgs": 50,
-            "total_publications": 5000,
-            "most_active_org": "Stanford University",
-            "avg_papers_per_org": 100,
-            "collaborations": {
-                "nodes": [
-                    {"id": "Stanford University", "papers": 500},
-                    {"id": "MIT", "papers": 450},
-                    {"id": "Berkeley", "papers": 400},
-                    {"id": "Carnegie Mellon", "papers": 350},
-                    {"id": "Harvard", "papers": 300},
-                ],
-                "edges": [
-                    {"source": "Stanford University", "target": "MIT", "weight": 45},
-                    {"source": "MIT", "target": "Berkeley", "weight": 30},
-                    {"source": "Berkeley", "target": "Carnegie Mellon", "weight": 25},
-                    {"source": "Harvard", "target": "MIT", "weight": 20},
-                ],
-            },
-            "yearly_pubs": {
-                "years": [2019, 2020, 2021, 2022, 2023],
-                "publications": [800, 900, 1000, 1200, 1100],
-                "citations": [1500, 1800, 2000, 2200, 2400],
-            },
-            "top_orgs": [
-                {"name": "Stanford University", "papers": 500, "citations": 8000},
-                {"name": "MIT", "papers": 450, "citations": 7500},
-                {"name": "Berkeley", "papers": 400, "citations": 7000},
-                {"name": "Carnegie Mellon", "papers": 350, "citations": 6500},
-                {"name": "Harvard", "papers": 300, "citations": 6000},
-            ],
-            "focus_areas": [
-                {
-                    "area": "Software Engineering",
-                    "papers": 2000,
-                    "subareas": [
-                        {"name": "Testing", "papers": 800},
-                        {"name": "DevOps", "papers": 700},
-                        {"name": "Security", "papers": 500},
-                    ],
-                },
-                {
-                    "area": "AI/ML",
-                    "papers": 1500,
-                    "subareas": [
-                        {"name": "Deep Learning", "papers": 600},
-                        {"name": "NLP", "papers": 500},
-                        {"name": "Computer Vision", "papers": 400},
-                    ],
-                },
-            ],
-        }
+        with DataManagerContext() as managers:
+            org_stats = managers["org"].get_organizations_overview()
+        if org_stats is None:
+            st.info(
+                "The publication cube has not been built yet. "
+                "Run `python -m analytics.publication_cube`."
+            )
+            return
 
         # st.header("Research Organizations Overview")
 
@@ -418,10 +359,12 @@ class Organization:
         with tab1:
             # Organization collaboration network
             # st.subheader("Collaboration Network")
-            network_fig = Organization._create_collaboration_network(
-                org_stats["collaborations"]
+            with DataManagerContext() as managers:
+                conferences = managers["stats"].get_conferences()
+                years = sorted(managers["stats"].get_years())
+            Organization._render_collaboration_network(
+                conferences=conferences, years=years, key="collab_overview"
             )
-            st.plotly_chart(network_fig, use_container_width=True)
         with tab2:
             # Publication trends
             # st.subheader("Publication Trends")
@@ -432,60 +375,132 @@ class Organization:
             # st.subheader("Top Organizations")
             top_fig = Organization._create_top_orgs_chart(org_stats["top_orgs"])
             st.plotly_chart(top_fig, use_container_width=True)
+            school_col, company_col = st.columns(2)
+            with school_col:
+                st.markdown("#### Universities")
+                st.plotly_chart(
+                    ChartDisplay.create_cs_schools_chart(org_stats["schools"]),
+                    use_container_width=True,
+                )
+            with company_col:
+                st.markdown("#### Companies")
+                st.plotly_chart(
+                    ChartDisplay.create_tech_companies_chart(org_stats["companies"]),
+                    use_container_width=True,
+                )
         with tab4:
             # Research focus areas
             # st.subheader("Research Focus Areas")
             focus_fig = Organization._create_focus_areas_chart(org_stats["focus_areas"])
             st.plotly_chart(focus_fig, use_container_width=True)
 
+    @staticmethod
+    def _render_collaboration_network(
+        conferences: list, years: list, organization: str = None, key: str = "collab"
+    ):
+        """Filters plus the organization or author collaboration network."""
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            kind = st.radio(
+                "Network",
+                options=["organization", "author"],
+                format_func=lambda k: "Organizations" if k == "organization" else "Authors",
+                horizontal=True,
+                key=f"{key}_kind",
+            )
+        with col2:
+            conference = st.selectbox(
+                "Conference", options=["All"] + list(conferences), key=f"{key}_conference"
+            )
+        with col3:
+            if len(years) > 1:
+                start_year, end_year = st.select_slider(
+                    "Years",
+                    options=years,
+                    value=(years[0], years[-1]),
+                    key=f"{key}_years",
+                )
+            else:
+                start_year = end_year = years[0] if years else None
+
+        with DataManagerContext() as managers:
+            collab_data = managers["org"].get_collaboration_network(
+                kind,
+                conference=None if conference == "All" else conference,
+                start_year=start_year,
+                end_year=end_year,
+                organization=organization,
+            )
+
+        network_fig = Organization._create_collaboration_network(collab_data)
+        if network_fig is None:
+            st.info("No collaborations found for these filters.")
+        else:
+            st.plotly_chart(network_fig, use_container_width=True)
+
     def _create_collaboration_network(collab_data):
-        """Create organization collaboration network visualization."""
+        """Create collaboration network visualization; None when there are no edges."""
+        if not collab_data["edges"]:
+            return None
+
         G = nx.Graph()
 
         # Add nodes
         for node in collab_data["nodes"]:
-            G.add_node(node["id"], size=node["papers"])
+            G.add_node(node["id"], label=node.get("label", node["id"]), size=node["papers"])
 
         # Add edges
         for edge in collab_data["edges"]:
             G.add_edge(edge["source"], edge["target"], weight=edge["weight"])
 
-        # Calculate layout
-        pos = nx.spring_layout(G, k=1, iterations=50)
-
-        # Create edge traces
-        edge_traces = []
-        for edge in G.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            weight = G.edges[edge]["weight"]
-
-            edge_traces.append(
-                go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode="lines",
-                    line=dict(width=weight / 5, color="rgba(169, 169, 169, 0.5)"),
-                    hoverinfo="none",
-                    showlegend=False,
-                )
+        # Calculate layout; the edges are already pruned to the heaviest ones
+        pos = nx.spring_layout(
+            G, k=1 / max(1, len(G)) ** 0.5, iterations=50, weight="weight", seed=42
+        )
+
+        # One trace per edge width bucket instead of one trace per edge
+        max_weight = max(weight for _, _, weight in G.edges(data="weight"))
+        buckets = {}
+        for source, target, weight in G.edges(data="weight"):
+            width = 1 + round(4 * weight / max_weight)
+            x0, y0 = pos[source]
+            x1, y1 = pos[target]
+            xs, ys = buckets.setdefault(width, ([], []))
+            xs.extend([x0, x1, None])
+            ys.extend([y0, y1, None])
+
+        edge_traces = [
+            go.Scatter(
+                x=xs,
+                y=ys,
+                mode="lines",
+                line=dict(width=width, color="rgba(169, 169, 169, 0.5)"),
+                hoverinfo="none",
+                showlegend=False,
             )
+            for width, (xs, ys) in sorted(buckets.items())
+        ]
 
         # Create node trace
-        node_sizes = [G.nodes[node]["size"] for node in G.nodes()]
-        max_size = max(node_sizes)
+        nodes = list(G.nodes())
+        node_sizes = [G.nodes[node]["size"] for node in nodes]
+        max_size = max(node_sizes) or 1
+        labels = [G.nodes[node]["label"] for node in nodes]
 
         node_trace = go.Scatter(
-            x=[pos[node][0] for node in G.nodes()],
-            y=[pos[node][1] for node in G.nodes()],
-            mode="markers+text",
-            text=list(G.nodes()),
+            x=[pos[node][0] for node in nodes],
+            y=[pos[node][1] for node in nodes],
+            # Labels on every node only while they stay readable
+            mode="markers+text" if len(nodes) <= 40 else "markers",
+            text=labels,
             textposition="bottom center",
             hovertext=[
-                f"{node}<br>Papers: {G.nodes[node]['size']}" for node in G.nodes()
+                f"{label}<br>Papers: {size}<br>Collaborators: {G.degree(node)}"
+                for node, label, size in zip(nodes, labels, node_sizes)
             ],
+            hoverinfo="text",
             marker=dict(
-                size=[size / max_size * 50 + 20 for size in node_sizes],
+                size=[size / max_size * 40 + 8 for size in node_sizes],
                 color="lightblue",
                 line=dict(width=1, color="darkblue"),
                 opacity=0.8,
@@ -607,22 +622,27 @@ class Organization:
 
     def _create_focus_areas_chart(focus_areas_data):
         """Create research focus areas treemap."""
+        ids = []
         labels = []
         parents = []
         values = []
 
         for area in focus_areas_data:
+            ids.append(area["area"])
             labels.append(area["area"])
             parents.append("")
             values.append(area["papers"])
 
+            # The same organization can lead several areas, so ids are per area
             for subarea in area["subareas"]:
+                ids.append(f"{area['area']}/{subarea['name']}")
                 labels.append(subarea["name"])
                 parents.append(area["area"])
                 values.append(subarea["papers"])
 
         fig = go.Figure(
             go.Treemap(
+                ids=ids,
                 labels=labels,
                 parents=parents,
                 values=values,
@@ -6,7 +6,7 @@ class SessionFilterHandler:
     """Handles filtering and processing of session data."""
     
     @staticmethod
-    @cache_data(ttl=3600)  # Cache for 1 hour
+    @cache_data(max_entries=256)  # Keyed by the sessions themselves; new data is a new entry
     def apply_filters(sessions, track, time, venue, company, has_expert_opinion=False):
         """
         Filter sessions based on selected criteria.
@@ -1,80 +1,167 @@
+import asyncio
 import sys
 from pathlib import Path
-from datetime import datetime
+from itertools import groupby
+from operator import attrgetter
 
 # Add the parent directory to sys.path to access db_manager.py
 sys.path.append(str(Path(__file__).parents[2]))
 
 import pandas as pd
-from db_manager import DBManager  # This will now find the root db_manager.py
-from models import ConferenceInstance
+from db_manager import AsyncDBManager, DBManager  # This will now find the root db_manager.py
+from data_version import data_versions
+from instrumentation import bind_recorder, code_site, current_recorder
 from repositories import (
     ConferenceInstanceRepository,
+    AsyncConferenceInstanceRepository,
     PaperRepository,
     KeywordRepository,
     AffiliationRepository,
+    SessionRepository,
+    AsyncSessionRepository,
 )
+from repositories.session_repository import SESSION_CATALOG_TABLES
+from repositories.stats_repository import make_stats_repository
+from utility.conf_util import SessionFilterHandler
+
+
+class _Repositories(dict):
+    """Repositories by name, each created on first use."""
+
+    def __init__(self, factories: dict):
+        super().__init__()
+        self.factories = factories
+
+    def __missing__(self, name):
+        repository = self[name] = self.factories[name]()
+        return repository
 
 
 class DataManagerContext:
-    """Context manager for database sessions."""
+    """
+    Context manager for database sessions.
+
+    The Postgres session is only opened once a repository needing it is used,
+    so pages reading statistics from the DuckDB backend never connect.
+    """
 
     def __init__(self):
-        self.data_manager = DBManager()
+        self.data_manager = None
         self.session = None
 
+    def _get_session(self):
+        if self.session is None:
+            self.data_manager = DBManager()
+            self.session = self.data_manager.get_session()
+        return self.session
+
     def __enter__(self):
-        self.session = self.data_manager.get_session()
-        return {
-            "conference": ConferenceInstanceRepository(self.session),
-            "paper": PaperRepository(self.session),
-            "keyword": KeywordRepository(self.session),
-            "org": AffiliationRepository(self.session),
-        }
+        return _Repositories({
+            "conference": lambda: ConferenceInstanceRepository(self._get_session()),
+            "paper": lambda: PaperRepository(self._get_session()),
+            "keyword": lambda: KeywordRepository(self._get_session()),
+            "org": lambda: AffiliationRepository(self._get_session()),
+            "session": lambda: SessionRepository(self._get_session()),
+            "stats": lambda: make_stats_repository(self._get_session),
+        })
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             self.session.close()
 
 
-def aggregate_stat_df(data: list[any], include_keywords: bool = True) -> pd.DataFrame:
-    """Create a DataFrame from conference statistics."""
-    if not data:
-        return pd.DataFrame(columns=["Year", "conference", "paper_count"])
+class AsyncDataManagerContext:
+    """Async context manager giving async repositories over one AsyncSession."""
 
-    df_data = []
-    for item in data:
-        try:
-            # Assuming item[0] contains conference instance with year information
-            year = None
-            if isinstance(item[0], ConferenceInstance):
-                year = item[0].year
-            elif isinstance(item[0], str) and item[0].isdigit():
-                year = int(item[0])
+    def __init__(self, manager: AsyncDBManager = None):
+        self.manager = manager or AsyncDBManager.get()
+        self.session = None
 
-            row = {
-                "Year": year,
-                "conference": (
-                    item[0].conference_name
-                    if isinstance(item[0], ConferenceInstance)
-                    else str(item[0])
-                ),
-                "paper_count": item[1] if item[1] is not None else 0,
-            }
+    async def __aenter__(self):
+        self.session = self.manager.get_session()
+        return {
+            "conference": AsyncConferenceInstanceRepository(self.session),
+            "session": AsyncSessionRepository(self.session),
+        }
 
-            if include_keywords and isinstance(item[0], ConferenceInstance):
-                with DataManagerContext() as managers:
-                    keywords = managers["keyword"].get_top_keywords_for_instance(
-                        item[0].instance_id
-                    )
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session:
+            await self.session.close()
+
+
+def run_concurrently(timeout: float = None, **queries) -> dict:
+    """
+    Run independent page queries concurrently and wait for all of them.
+
+    Each query is a callable taking the async repositories and returning an
+    awaitable; each runs on its own session and connection, so the wait is
+    that of the slowest query rather than the sum of all of them.
+
+        results = run_concurrently(
+            instance=lambda m: m["conference"].get_instance_by_year_and_name(2024, "GTC"),
+            catalog=lambda m: m["session"].get_session_catalog_by_conference(2024, "GTC"),
+        )
+
+    Returns:
+        dict: The result of each query under its keyword
+    """
+    manager = AsyncDBManager.get()
+    recorder = current_recorder()
+
+    async def run_query(query):
+        # Count the statements towards the calling rerun, at the page's query
+        bind_recorder(recorder, code_site(query))
+        async with AsyncDataManagerContext(manager) as managers:
+            return await query(managers)
+
+    async def run_all():
+        return await asyncio.gather(*(run_query(query) for query in queries.values()))
+
+    return dict(zip(queries, manager.run(run_all(), timeout)))
+
+
+def _stat_rows(data: list[tuple], include_keywords: bool) -> list[dict]:
+    """
+    Rows of a statistics DataFrame.
+
+    Accepts the tuples returned by the statistics backend: either
+    (instance_id, conference_name, year, paper_count) per conference instance,
+    or (conference_or_year, paper_count) aggregates.
+    """
+    rows = []
+    with DataManagerContext() as managers:
+        for item in data:
+            try:
+                if len(item) == 4:
+                    instance_id, conference, year, paper_count = item
+                else:
+                    instance_id = None
+                    conference, paper_count = item
+                    year = int(conference) if str(conference).isdigit() else None
+
+                row = {
+                    "Year": year,
+                    "conference": str(conference),
+                    "paper_count": paper_count if paper_count is not None else 0,
+                }
+
+                if include_keywords and instance_id is not None:
+                    keywords = managers["stats"].get_top_keywords_for_instance(instance_id)
                     row["Keywords"] = ", ".join(keywords) if keywords else ""
 
-            df_data.append(row)
-        except Exception as e:
-            print(f"Error processing conference statistics row: {str(e)}")
-            continue
+                rows.append(row)
+            except Exception as e:
+                print(f"Error processing conference statistics row: {str(e)}")
+                continue
+    return rows
 
-    df = pd.DataFrame(df_data)
+
+def aggregate_stat_df(data: list[tuple], include_keywords: bool = True) -> pd.DataFrame:
+    """Create a DataFrame from conference statistics."""
+    if not data:
+        return pd.DataFrame(columns=["Year", "conference", "paper_count"])
+
+    df = pd.DataFrame(_stat_rows(data, include_keywords))
 
     # Ensure Year column exists and is numeric
     if "Year" in df.columns:
@@ -84,44 +171,12 @@ def aggregate_stat_df(data: list[any], include_keywords: bool = True) -> pd.Data
     return df
 
 
-def conference_stat_df(data: list[any], include_keywords: bool = True) -> pd.DataFrame:
+def conference_stat_df(data: list[tuple], include_keywords: bool = True) -> pd.DataFrame:
     """Create a DataFrame from conference statistics."""
     if not data:
         return pd.DataFrame(columns=["Year", "conference", "paper_count"])
 
-    df_data = []
-    for item in data:
-        try:
-            # Assuming item[0] contains conference instance with year information
-            year = None
-            if isinstance(item[0], ConferenceInstance):
-                year = item[0].year
-            elif isinstance(item[0], str) and item[0].isdigit():
-                year = int(item[0])
-
-            row = {
-                "Year": year,
-                "conference": (
-                    item[0].conference_name
-                    if isinstance(item[0], ConferenceInstance)
-                    else str(item[0])
-                ),
-                "paper_count": item[1] if item[1] is not None else 0,
-            }
-
-            if include_keywords and isinstance(item[0], ConferenceInstance):
-                with DataManagerContext() as managers:
-                    keywords = managers["keyword"].get_top_keywords_for_instance(
-                        item[0].instance_id
-                    )
-                    row["Keywords"] = ", ".join(keywords) if keywords else ""
-
-            df_data.append(row)
-        except Exception as e:
-            print(f"Error processing conference statistics row: {str(e)}")
-            continue
-
-    df = pd.DataFrame(df_data)
+    df = pd.DataFrame(_stat_rows(data, include_keywords))
 
     # Ensure Year column exists and is numeric
     if "Year" in df.columns:
@@ -169,91 +224,73 @@ class DataLoader:
         try:
             with DataManagerContext() as managers:
                 if instance_id:
-                    # Get sessions through conference repository
-                    sessions = managers["conference"].get_sessions_by_instance(
-                        instance_id
-                    )
-                    if not sessions:
-                        return []
-
-                    # Group sessions by date
-                    session_by_date = {}
-                    for session in sessions:
-                        date_str = session.date.strftime("%Y-%m-%d")
-                        if date_str not in session_by_date:
-                            session_by_date[date_str] = []
-
-                        # Find related speakers
-                        speaker_list = []
-                        speaker_companies = []
-                        
-                        for speaker in session.speaker_to_session:
-                            # Get affiliation name using affiliation_id
-                            affiliation_name = ""
-                            if speaker.affiliation_id:
-                                affiliation = managers["org"].get_affiliation_by_id(
-                                    speaker.affiliation_id
-                                )
-                                if affiliation:
-                                    affiliation_name = affiliation.name
-                                    speaker_companies.append(affiliation_name)
-
-                            # Format speaker string
-                            if speaker.position:
-                                speaker_str = f"{speaker.name} ({speaker.position} | {affiliation_name})"
-                            else:
-                                speaker_str = f"{speaker.name} ({affiliation_name})" if affiliation_name else speaker.name
-                            
-                            speaker_list.append(speaker_str)
-
-                        formatted_session = {
-                            "time": f"{session.start_time.strftime('%I:%M %p')} - {session.end_time.strftime('%I:%M %p')}",
-                            "title": session.title,
-                            "speaker": ", ".join(speaker_list),
-                            "location": (
-                                f"{session.venue}, {session.room}"
-                                if session.room
-                                else session.venue
-                            ),
-                            "venue": session.venue,  # Add venue separately for filtering
-                            "speaker_companies": speaker_companies,  # Add companies for filtering
-                            "track": session.topic,
-                            "description": session.description if session.description and session.description != 'nan' else "",
-                            "session_code": session.session_code,
-                            "technical_level": session.technical_level,
-                            "full_topic": session.topic,
-                            "points": session.points if session.points and session.points != 'nan' else "",
-                            "expert_opinion": session.expert_view if session.expert_view and session.expert_view != 'nan' else "",
-                            "ai_analysis": session.ai_analysis if session.ai_analysis and session.ai_analysis != 'nan' else "",
-                        }
-                        session_by_date[date_str].append(formatted_session)
-
-                    # Convert to list and sort chronologically
-                    session_data = [
-                        {
-                            "date": date_str,
-                            "day": datetime.strptime(date_str, "%Y-%m-%d").strftime(
-                                "%A"
-                            ),
-                            "sessions": sorted(
-                                sessions_list,
-                                key=lambda x: datetime.strptime(
-                                    x["time"].split(" - ")[0], "%I:%M %p"
-                                ),
-                            ),
-                        }
-                        for date_str, sessions_list in session_by_date.items()
-                    ]
-
-                    # Sort days chronologically
-                    session_data.sort(key=lambda x: x["date"])
-
-                    return session_data
+                    # Flat (session, speaker) rows, already ordered by date and start time
+                    rows = managers["session"].get_session_catalog(instance_id)
+                    return DataLoader.group_session_catalog(rows)
 
                 return []
         except Exception as e:
             print(f"Error loading session data: {e}")
             return []
+
+    @staticmethod
+    def group_session_catalog(rows) -> list:
+        """Group session catalog rows into one entry per date with its formatted sessions."""
+        session_data = []
+        for date, date_rows in groupby(rows, key=attrgetter("date")):
+            sessions = [
+                DataLoader._format_session(list(session_rows))
+                for _, session_rows in groupby(date_rows, key=attrgetter("session_id"))
+            ]
+            session_data.append(
+                {
+                    "date": date.strftime("%Y-%m-%d"),
+                    "day": date.strftime("%A"),
+                    "sessions": sessions,
+                }
+            )
+        return session_data
+
+    @staticmethod
+    def _format_session(rows) -> dict:
+        """Format the catalog rows of one session (one row per speaker)."""
+        session = rows[0]
+        speaker_list = []
+        speaker_companies = []
+        for row in rows:
+            if not row.speaker_name:
+                continue
+            affiliation_name = row.affiliation_name or ""
+            if affiliation_name:
+                speaker_companies.append(affiliation_name)
+
+            # Format speaker string
+            if row.speaker_position:
+                speaker_str = f"{row.speaker_name} ({row.speaker_position} | {affiliation_name})"
+            else:
+                speaker_str = f"{row.speaker_name} ({affiliation_name})" if affiliation_name else row.speaker_name
+            speaker_list.append(speaker_str)
+
+        return {
+            "time": f"{session.start_time.strftime('%I:%M %p')} - {session.end_time.strftime('%I:%M %p')}",
+            "title": session.title,
+            "speaker": ", ".join(speaker_list),
+            "location": (
+                f"{session.venue}, {session.room}"
+                if session.room
+                else session.venue
+            ),
+            "venue": session.venue,  # Add venue separately for filtering
+            "speaker_companies": speaker_companies,  # Add companies for filtering
+            "track": session.topic,
+            "description": session.description if session.description and session.description != 'nan' else "",
+            "session_code": session.session_code,
+            "technical_level": session.technical_level,
+            "full_topic": session.topic,
+            "points": session.points if session.points and session.points != 'nan' else "",
+            "expert_opinion": session.expert_view if session.expert_view and session.expert_view != 'nan' else "",
+            "ai_analysis": session.ai_analysis if session.ai_analysis and session.ai_analysis != 'nan' else "",
+        }
         
     
 class CompanyMatcher:
@@ -323,51 +360,64 @@ class CompanyMatcher:
         
         for day_data in session_data:
             for session in day_data["sessions"]:
-                # Skip sessions with no topic
-                if not session.get("track") or pd.isna(session["track"]):
-                    continue
-                
-                # Extract the high-level topic (before the first " - ")
-                topic = session["track"]
-                parts = topic.split(" - ")
-                high_level_topic = parts[0].strip()
-                
-                # Skip if no valid topic
-                if not high_level_topic or pd.isna(high_level_topic) or high_level_topic.lower() in ['n/a', 'nan', '']:
+                # Skip sessions with no valid topic
+                topic = TopicAnalyzer.split_topic(session.get("track"))
+                if topic is None:
                     continue
                 
-                # Get companies from speaker_companies field
-                companies = session.get("speaker_companies", [])
-                if not companies:
-                    continue
-                
-                # Track unique matched companies for this session
-                matched_companies = set()
-                
-                # Process each company
-                for company in companies:
-                    if not company or pd.isna(company) or company.lower() in ['n/a', 'nan', '']:
-                        continue
-                        
-                    # Try to match to one of our target companies
-                    matched_company = CompanyMatcher.match_company(company, company_list, aliases_dict)
-                    if matched_company:
-                        matched_companies.add(matched_company)
-                
                 # Add data for each matched company
-                for company in matched_companies:
+                for company in CompanyMatcher.match_session_companies(
+                    session.get("speaker_companies", []), company_list, aliases_dict
+                ):
                     company_topic_data.append({
                         "Company": company,
-                        "Topic": high_level_topic,
+                        "Topic": topic[0],
                         "Count": 1,
                         "Session_ID": session.get("session_code", "")
                     })
         
         return company_topic_data
+
+    @staticmethod
+    def match_session_companies(companies, company_list, aliases_dict):
+        """
+        Match the speaker companies of one session to standardized company names.
+        
+        Returns:
+            Set of matched standardized company names
+        """
+        matched_companies = set()
+        for company in companies or []:
+            if not company or pd.isna(company) or company.lower() in ['n/a', 'nan', '']:
+                continue
+                
+            # Try to match to one of our target companies
+            matched_company = CompanyMatcher.match_company(company, company_list, aliases_dict)
+            if matched_company:
+                matched_companies.add(matched_company)
+        return matched_companies
     
 class TopicAnalyzer:
     """Utility for analyzing topic data from sessions."""
     
+    @staticmethod
+    def split_topic(topic):
+        """
+        Split a session topic into its high-level topic (before the first " - ")
+        and sub-topic.
+        
+        Returns:
+            (high_level_topic, sub_topic) tuple, or None for missing or N/A topics
+        """
+        if not topic or pd.isna(topic):
+            return None
+        parts = topic.split(" - ")
+        high_level = parts[0].strip()
+        if not high_level or high_level.lower() in ['n/a', 'nan', '']:
+            return None
+        sub_topic = parts[1].strip() if len(parts) > 1 else "General"
+        return high_level, sub_topic
+
     @staticmethod
     def extract_topic_data(sessions):
         """
@@ -382,22 +432,10 @@ class TopicAnalyzer:
         topic_data = {}
         
         for session in sessions:
-            # Skip sessions with no topic or NaN/N/A topics
-            if not session.topic or pd.isna(session.topic) or session.topic.lower() in ['n/a', 'nan', '']:
-                continue
-                
-            # Extract the high-level topic (before the first " - ")
-            parts = session.topic.split(" - ")
-            high_level_topic = parts[0].strip()
-            
-            # Skip empty or N/A high-level topics
-            if not high_level_topic or pd.isna(high_level_topic) or high_level_topic.lower() in ['n/a', 'nan', '']:
+            topic = TopicAnalyzer.split_topic(session.topic)
+            if topic is None:
                 continue
-                
-            if high_level_topic in topic_data:
-                topic_data[high_level_topic] += 1
-            else:
-                topic_data[high_level_topic] = 1
+            topic_data[topic[0]] = topic_data.get(topic[0], 0) + 1
         
         return topic_data
     
@@ -415,19 +453,85 @@ class TopicAnalyzer:
         treemap_data = []
         
         for session in sessions:
-            if session.topic and not pd.isna(session.topic):
-                parts = session.topic.split(" - ")
-                high_level = parts[0].strip()
-                sub_topic = parts[1].strip() if len(parts) > 1 else "General"
-                
-                # Skip if high-level topic is empty or N/A
-                if not high_level or pd.isna(high_level) or high_level.lower() in ['n/a', 'nan', '']:
-                    continue
-                
-                treemap_data.append({
-                    "High-Level Topic": high_level,
-                    "Sub-Topic": sub_topic,
-                    "Count": 1
-                })
+            topic = TopicAnalyzer.split_topic(session.topic)
+            if topic is None:
+                continue
+            treemap_data.append({
+                "High-Level Topic": topic[0],
+                "Sub-Topic": topic[1],
+                "Count": 1
+            })
         
         return treemap_data
+
+
+class InstanceSnapshot:
+    """
+    Everything the conference views show for one instance, derived in a
+    single pass over its session catalog: the per-day sessions and their
+    filter options, topic counts and the cloud/OEM company-topic data.
+    """
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.session_data = []
+        self.date_labels = []
+        self.filter_options = []
+        self.topic_data = {}
+        self.cloud_data = []
+        self.oem_data = []
+
+    @staticmethod
+    def data_version() -> tuple:
+        """Data versions of the tables a snapshot is built from, for cache keys."""
+        return data_versions(SESSION_CATALOG_TABLES)
+
+    @staticmethod
+    def load(year: int, conference: str):
+        """
+        Fetch the instance and its session catalog (concurrently) and build the
+        snapshot. Returns None if the instance or its sessions do not exist.
+        """
+        results = run_concurrently(
+            instance=lambda m: m["conference"].get_instance_by_year_and_name(year, conference),
+            catalog=lambda m: m["session"].get_session_catalog_by_conference(year, conference),
+        )
+        if not results["instance"] or not results["catalog"]:
+            return None
+        return InstanceSnapshot.build(results["instance"], results["catalog"])
+
+    @staticmethod
+    def build(instance, rows) -> "InstanceSnapshot":
+        """Build a snapshot from session catalog rows ordered by date and session."""
+        snapshot = InstanceSnapshot(instance)
+        for date, date_rows in groupby(rows, key=attrgetter("date")):
+            sessions = []
+            for _, session_rows in groupby(date_rows, key=attrgetter("session_id")):
+                session = DataLoader._format_session(list(session_rows))
+                sessions.append(session)
+
+                topic = TopicAnalyzer.split_topic(session["track"])
+                if topic is None:
+                    continue
+                high_level = topic[0]
+                snapshot.topic_data[high_level] = snapshot.topic_data.get(high_level, 0) + 1
+                for data, company_list, aliases in (
+                    (snapshot.cloud_data, CompanyMatcher.CLOUD_COMPANIES, CompanyMatcher.CLOUD_COMPANY_ALIASES),
+                    (snapshot.oem_data, CompanyMatcher.OEM_COMPANIES, CompanyMatcher.OEM_COMPANY_ALIASES),
+                ):
+                    for company in CompanyMatcher.match_session_companies(
+                        session["speaker_companies"], company_list, aliases
+                    ):
+                        data.append({
+                            "Company": company,
+                            "Topic": high_level,
+                            "Count": 1,
+                            "Session_ID": session["session_code"],
+                        })
+
+            snapshot.session_data.append(
+                {"date": date.strftime("%Y-%m-%d"), "day": date.strftime("%A"), "sessions": sessions}
+            )
+            snapshot.date_labels.append(f"{date.strftime('%A')} ({date.strftime('%B %d')})")
+        snapshot.filter_options = SessionFilterHandler.prepare_filter_options(snapshot.session_data)
+        return snapshot
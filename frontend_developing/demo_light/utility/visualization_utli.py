@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from typing import List, Any, Tuple, List, Callable
 import plotly.express as px
 import plotly.graph_objects as go
@@ -64,21 +65,17 @@ class ChartDisplay:
     """Handles creation and display of various charts."""
 
     @staticmethod
-    def create_cs_schools_chart():
-        """Create a radar chart for top CS schools metrics."""
-        # Sample data - replace with real data
-        schools_data = {
-            "School": ["MIT", "Stanford", "Berkeley", "CMU", "ETH Zurich"],
-            "Research Impact": [95, 92, 90, 88, 87],
-            "Citations": [98, 95, 92, 90, 89],
-            "Industry Collab": [90, 92, 88, 94, 85],
-            "Funding": [96, 94, 92, 90, 88],
-        }
+    def create_cs_schools_chart(schools_data: dict):
+        """
+        Create a radar chart comparing universities.
 
+        Args:
+            schools_data (dict): {"Organization": [names], metric: [0-100 scores], ...}
+        """
         fig = go.Figure()
-        categories = ["Research Impact", "Citations", "Industry Collab", "Funding"]
+        categories = [key for key in schools_data if key != "Organization"]
 
-        for i, school in enumerate(schools_data["School"]):
+        for i, school in enumerate(schools_data["Organization"]):
             fig.add_trace(
                 go.Scatterpolar(
                     r=[schools_data[cat][i] for cat in categories],
@@ -96,36 +93,34 @@ class ChartDisplay:
         return fig
 
     @staticmethod
-    def create_tech_companies_chart():
-        """Create a bubble chart for tech companies metrics."""
-        # Sample data - replace with real data
-        companies_data = {
-            "Company": ["Google", "Microsoft", "Meta", "Apple", "Amazon"],
-            "Research Papers": [150, 120, 90, 70, 80],
-            "Patents": [200, 180, 120, 150, 130],
-            "Market Cap": [2000, 1800, 800, 2500, 1500],
-        }
+    def create_tech_companies_chart(companies_data: dict):
+        """
+        Create a bubble chart of companies: papers against citations, sized by authors.
 
+        Args:
+            companies_data (dict): {"Company", "Papers", "Citations", "Authors"} lists
+        """
         fig = go.Figure()
 
         fig.add_trace(
             go.Scatter(
-                x=companies_data["Research Papers"],
-                y=companies_data["Patents"],
-                mode="markers",
+                x=companies_data["Papers"],
+                y=companies_data["Citations"],
+                mode="markers+text",
                 marker=dict(
-                    size=[cap / 50 for cap in companies_data["Market Cap"]],
+                    size=companies_data["Authors"],
                     sizemode="area",
-                    sizeref=2.0 * max(companies_data["Market Cap"]) / (40.0**2),
+                    sizeref=2.0 * max(companies_data["Authors"] + [1]) / (40.0**2),
                     sizemin=4,
                 ),
                 text=companies_data["Company"],
+                textposition="top center",
                 name="Companies",
             )
         )
 
         fig.update_layout(
-            height=300, xaxis_title="Research Papers", yaxis_title="Patents"
+            height=300, xaxis_title="Research Papers", yaxis_title="Citations"
         )
         return fig
 
@@ -224,14 +219,56 @@ class ChartDisplay:
     @staticmethod
     def show_keyword_network(keywords: List[Tuple[str, int]], central_keyword: str):
         """Display keyword relationship network."""
-        nodes = [central_keyword] + [k[0] for k in keywords]
-        edges = [(central_keyword, k[0]) for k in keywords]
+        if not keywords:
+            st.info(f"No related keywords found for {central_keyword}")
+            return
+
+        # Star layout: the central keyword in the middle, related keywords on a circle
+        angles = np.linspace(0, 2 * np.pi, len(keywords), endpoint=False)
+        xs, ys = np.cos(angles), np.sin(angles)
         weights = [k[1] for k in keywords]
+        max_weight = max(weights) or 1
 
-        # Create network visualization using plotly
         fig = go.Figure()
-        # Add nodes and edges with appropriate styling
-        # (Network visualization implementation details)
+        for x, y, weight in zip(xs, ys, weights):
+            fig.add_trace(
+                go.Scatter(
+                    x=[0, x],
+                    y=[0, y],
+                    mode="lines",
+                    line=dict(
+                        width=1 + 7 * weight / max_weight,
+                        color="rgba(169, 169, 169, 0.6)",
+                    ),
+                    hoverinfo="none",
+                    showlegend=False,
+                )
+            )
+        fig.add_trace(
+            go.Scatter(
+                x=[0, *xs],
+                y=[0, *ys],
+                mode="markers+text",
+                text=[central_keyword] + [k[0] for k in keywords],
+                textposition="bottom center",
+                hovertext=[central_keyword]
+                + [f"{k[0]}<br>Score: {k[1]:.2f}" for k in keywords],
+                hoverinfo="text",
+                marker=dict(
+                    size=[40] + [15 + 20 * w / max_weight for w in weights],
+                    color=["darkblue"] + ["lightblue"] * len(keywords),
+                    line=dict(width=1, color="darkblue"),
+                ),
+                showlegend=False,
+            )
+        )
+        fig.update_layout(
+            hovermode="closest",
+            margin=dict(b=20, l=5, r=5, t=20),
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            plot_bgcolor="white",
+        )
         st.plotly_chart(fig, use_container_width=True)
 
 
@@ -285,21 +322,17 @@ class DashboardLayout:
                     "Title": p.title,
                     "Authors": ", ".join([a.name for a in p.author_to_paper]),
                     "Year": p.year,
-                    "Citations": p.citation_count,
+                    "Citations": p.citation_count or 0,
                 }
                 for p in papers
             ]
         )
 
-        MetricsDisplay.show_basic_metrics(
-            len(papers), papers_df["Citations"].mean(), papers_df["Citations"].max()
-        )
+        MetricsDisplay.show_basic_metrics(len(papers))
 
         st.subheader("Paper Distribution")
         ChartDisplay.show_trend_analysis(
-            papers_df.groupby("Year")
-            .agg({"Title": "count", "Citations": ["mean", "max"]})
-            .reset_index()
+            papers_df.groupby("Year").size().reset_index(name="paper_count")
         )
 
         col1, col2 = st.columns(2)
@@ -714,3 +747,72 @@ class TopicVisualization:
         )
         
         return chart
+
+
+class QueryDebugDisplay:
+    """Handles display of the SQL instrumentation summary for a rerun."""
+
+    @staticmethod
+    def show_query_panel(summary: dict, cache_metrics: dict = None):
+        """Display query counts, slow statements and N+1 warnings in the sidebar."""
+        with st.sidebar.expander(f"SQL debug ({summary['query_count']} queries)"):
+            col1, col2 = st.columns(2)
+            col1.metric("SQL time", f"{summary['sql_ms']:.0f} ms")
+            col2.metric("Rerun time", f"{(summary['duration_ms'] or 0):.0f} ms")
+
+            if cache_metrics and cache_metrics["hit_rate"] is not None:
+                st.caption(
+                    f"Result cache ({cache_metrics['backend']}): "
+                    f"{cache_metrics['hit_rate']:.0%} hits since start"
+                )
+                st.dataframe(
+                    pd.DataFrame(
+                        [{"Method": name, **counts} for name, counts in cache_metrics["methods"].items()]
+                    ).fillna(0),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
+            for statement in summary["n_plus_one"]:
+                st.warning(
+                    f"Possible N+1: executed {statement['count']} times\n\n"
+                    f"{', '.join(statement['call_sites']) or 'unknown call site'}"
+                )
+                st.code(statement["statement"], language="sql")
+
+            if summary["methods"]:
+                st.caption("By repository method")
+                st.dataframe(
+                    pd.DataFrame(
+                        [
+                            {
+                                "Method": name,
+                                "Queries": m["count"],
+                                "Total ms": round(m["total_ms"], 1),
+                                "Rows": m["rows"],
+                            }
+                            for name, m in summary["methods"].items()
+                        ]
+                    ),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
+            if summary["statements"]:
+                st.caption("Slowest statements")
+                st.dataframe(
+                    pd.DataFrame(
+                        [
+                            {
+                                "Statement": s["statement"],
+                                "Count": s["count"],
+                                "Total ms": round(s["total_ms"], 1),
+                                "Max ms": round(s["max_ms"], 1),
+                                "Rows": s["rows"],
+                            }
+                            for s in summary["statements"][:20]
+                        ]
+                    ),
+                    hide_index=True,
+                    use_container_width=True,
+                )
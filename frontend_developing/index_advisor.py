@@ -0,0 +1,473 @@
+"""
+Query-plan capture and index advisor for the repository hot queries.
+
+Each read method the dashboard relies on is run against the configured
+database while the SQL it emits is captured. Every captured SELECT is then
+re-run under EXPLAIN (ANALYZE, BUFFERS). Sequential scans on large tables are
+reported together with the columns they filter or join on, and an index is
+proposed for each unless an existing index already starts with those columns.
+
+Usage (from frontend_developing/):
+    python index_advisor.py [--min-rows 10000] [--migration migrations/0002_x.sql]
+    python index_advisor.py --seed 4000     # fill an empty database first
+"""
+
+import argparse
+import random
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, time
+
+from sqlalchemy import event, func, inspect, text
+
+from config import TRACKED_ORGANIZATIONS
+from models import (
+    Affiliation,
+    Author,
+    AuthorAffiliation,
+    Conference,
+    ConferenceInstance,
+    Keyword,
+    Paper,
+    PaperKeyword,
+    Session,
+    SessionSpeaker,
+    Speaker,
+    paper_author,
+)
+from repositories import (
+    AffiliationRepository,
+    ConferenceInstanceRepository,
+    KeywordRepository,
+    PaperRepository,
+    SessionRepository,
+)
+
+# Left-hand column of a comparison in a plan's Filter text
+_FILTER_COLUMN_RE = re.compile(r"\b(\w+)\s*(?:=|<>|<=|>=|<|>|~~\*?|@@)")
+_EQUALITY_RE = re.compile(r"\b(\w+)\s*=\s")
+_CAST_RE = re.compile(r"::[\w ]+(?:\[\])?")
+_PAREN_RE = re.compile(r"\((\w+)\)")
+
+
+@contextmanager
+def capture_statements(engine):
+    """Collect (statement, parameters) of every SELECT executed inside the block."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def sample_arguments(session) -> dict:
+    """Pick realistic arguments for the hot queries from the data itself."""
+    paper_instance = (
+        session.query(ConferenceInstance.instance_id, Conference.name, ConferenceInstance.year)
+        .join(Conference)
+        .join(Paper)
+        .group_by(ConferenceInstance.instance_id, Conference.name, ConferenceInstance.year)
+        .order_by(func.count(Paper.paper_id).desc())
+        .first()
+    )
+    session_row = (
+        session.query(Session.instance_id, Session.session_code, Session.date)
+        .group_by(Session.instance_id, Session.session_code, Session.date)
+        .first()
+    )
+    keyword = (
+        session.query(Keyword.keyword)
+        .join(PaperKeyword)
+        .group_by(Keyword.keyword)
+        .order_by(func.count().desc())
+        .first()
+    )
+    paper = session.query(Paper.paper_id, Paper.instance_id, Paper.title).first()
+    organization = (
+        session.query(Affiliation.name)
+        .filter(Affiliation.name.in_(TRACKED_ORGANIZATIONS))
+        .first()
+    )
+    return {
+        "instance_id": paper_instance[0] if paper_instance else None,
+        "conference": paper_instance[1] if paper_instance else None,
+        "year": paper_instance[2] if paper_instance else None,
+        "session": session_row,
+        "keyword": keyword[0] if keyword else None,
+        "paper": paper,
+        "organization": organization[0] if organization else None,
+    }
+
+
+def hot_queries(session, args: dict) -> list:
+    """(label, callable) pairs for the repository reads worth checking."""
+    papers = PaperRepository(session)
+    keywords = KeywordRepository(session)
+    sessions = SessionRepository(session)
+    orgs = AffiliationRepository(session)
+    conferences = ConferenceInstanceRepository(session)
+
+    queries = [
+        ("AffiliationRepository.get_tracked_organizations", orgs.get_tracked_organizations),
+        ("AffiliationRepository.find_similar_affiliations",
+         lambda: orgs.find_similar_affiliations("Stanford Univ")),
+        ("KeywordRepository.get_all_keywords", keywords.get_all_keywords),
+        ("ConferenceInstanceRepository.get_all_years", conferences.get_all_years),
+    ]
+    if args["conference"]:
+        queries += [
+            ("PaperRepository.get_papers_by_conference",
+             lambda: papers.get_papers_by_conference(args["conference"], args["year"])),
+            ("PaperRepository.get_papers_page",
+             lambda: papers.get_papers_page(args["conference"], args["year"])),
+            ("PaperRepository.search",
+             lambda: papers.search("learning", {"conferences": [args["conference"]]})),
+            ("ConferenceInstanceRepository.get_instance_by_year_and_name",
+             lambda: conferences.get_instance_by_year_and_name(args["year"], args["conference"])),
+        ]
+    if args["keyword"]:
+        queries += [
+            ("PaperRepository.get_papers_by_keyword",
+             lambda: papers.get_papers_by_keyword(args["keyword"])),
+            ("KeywordRepository.get_related_keywords",
+             lambda: keywords.get_related_keywords(args["keyword"])),
+        ]
+    if args["organization"]:
+        queries.append(
+            ("PaperRepository.get_papers_by_organization",
+             lambda: papers.get_papers_by_organization(args["organization"]))
+        )
+    if args["paper"]:
+        paper_id, instance_id, title = args["paper"]
+        queries += [
+            ("PaperRepository.get_paper_details", lambda: papers.get_paper_details(paper_id)),
+            # The lookup PaperRepository.upsert runs before writing
+            ("PaperRepository.upsert (lookup)",
+             lambda: session.query(Paper).filter_by(instance_id=instance_id, title=title).first()),
+        ]
+    if args["session"]:
+        instance_id, session_code, session_date = args["session"]
+        queries += [
+            ("SessionRepository.get_session_catalog",
+             lambda: sessions.get_session_catalog(instance_id)),
+            ("SessionRepository.get_session_companies",
+             lambda: sessions.get_session_companies(instance_id)),
+            ("SessionRepository.count_speakers_by_instance",
+             lambda: sessions.count_speakers_by_instance(instance_id)),
+            # The lookup SessionRepository.upsert runs before writing
+            ("SessionRepository.upsert (lookup)",
+             lambda: session.query(Session)
+             .filter(
+                 Session.instance_id == instance_id,
+                 Session.session_code == session_code,
+                 Session.date == session_date,
+             )
+             .first()),
+        ]
+    return queries
+
+
+def _walk(plan: dict, parent: dict = None):
+    yield plan, parent
+    # A Hash node only buffers its input; the join condition lives one level up
+    join = parent if plan["Node Type"] == "Hash" else plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child, join)
+
+
+def _scan_columns(node: dict, parent: dict, table_columns: set) -> list[str]:
+    """Columns of the scanned table used by its filter or by the parent join."""
+    columns = []
+    equality = set()
+
+    # "((session_code)::text = 'x'::text)" -> "(session_code = 'x')"
+    scan_filter = _PAREN_RE.sub(r"\1", _CAST_RE.sub("", node.get("Filter") or ""))
+    columns += _FILTER_COLUMN_RE.findall(scan_filter)
+    equality.update(_EQUALITY_RE.findall(scan_filter))
+
+    if parent:
+        # Join conditions name both sides, so only take columns qualified by this scan's alias
+        alias = re.escape(node.get("Alias", node["Relation Name"]))
+        for key in ("Hash Cond", "Merge Cond", "Join Filter"):
+            join_columns = re.findall(rf"\b{alias}\.(\w+)", parent.get(key) or "")
+            columns += join_columns
+            equality.update(join_columns)
+
+    unique = [c for i, c in enumerate(columns) if c in table_columns and c not in columns[:i]]
+    # Equality columns lead the index, range/pattern columns follow
+    return sorted(unique, key=lambda c: c not in equality)
+
+
+def analyze_plan(plan: dict, table_rows: dict, table_columns: dict, min_rows: int) -> list[dict]:
+    findings = []
+    for node, parent in _walk(plan):
+        if node["Node Type"] != "Seq Scan":
+            continue
+        table = node["Relation Name"]
+        if table_rows.get(table, 0) < min_rows:
+            continue
+        findings.append(
+            {
+                "table": table,
+                "rows": table_rows[table],
+                "filter": node.get("Filter"),
+                "time_ms": node.get("Actual Total Time"),
+                "buffers": node.get("Shared Hit Blocks", 0) + node.get("Shared Read Blocks", 0),
+                "columns": _scan_columns(node, parent, table_columns.get(table, set())),
+            }
+        )
+    return findings
+
+
+def existing_index_prefixes(engine) -> dict:
+    inspector = inspect(engine)
+    prefixes = defaultdict(list)
+    for table in inspector.get_table_names():
+        indexes = inspector.get_indexes(table)
+        primary_key = inspector.get_pk_constraint(table).get("constrained_columns") or []
+        for columns in [ix["column_names"] for ix in indexes] + [primary_key]:
+            if columns and all(columns):
+                prefixes[table].append(list(columns))
+    return prefixes
+
+
+def propose_index(table: str, columns: list[str], prefixes: dict) -> str:
+    """CREATE INDEX statement for columns, or None if an index already leads with them."""
+    if not columns:
+        return None
+    for existing in prefixes.get(table, []):
+        if existing[: len(columns)] == columns:
+            return None
+    name = f"idx_{table}_{'_'.join(columns)}"
+    return f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(columns)});"
+
+
+def run_advisor(engine, session, min_rows: int = 10000) -> tuple[list, list]:
+    """
+    Capture and explain the hot queries.
+
+    Returns:
+        tuple: (report entries per query, proposed index statements)
+    """
+    with engine.connect() as conn:
+        table_rows = dict(
+            conn.execute(
+                text(
+                    "SELECT relname, reltuples::bigint FROM pg_class "
+                    "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+                )
+            ).all()
+        )
+    inspector = inspect(engine)
+    table_columns = {
+        table: {c["name"] for c in inspector.get_columns(table)}
+        for table in inspector.get_table_names()
+    }
+    prefixes = existing_index_prefixes(engine)
+
+    report = []
+    proposals = {}
+    for label, call in hot_queries(session, sample_arguments(session)):
+        with capture_statements(engine) as captured:
+            try:
+                call()
+            except Exception as e:
+                session.rollback()
+                report.append({"query": label, "error": str(e)})
+                continue
+        session.rollback()
+
+        for statement, parameters in captured:
+            with engine.connect() as conn:
+                explain = conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+                ).scalar()
+            plan = explain[0]
+            findings = analyze_plan(plan["Plan"], table_rows, table_columns, min_rows)
+            for finding in findings:
+                ddl = propose_index(finding["table"], finding["columns"], prefixes)
+                finding["proposal"] = ddl
+                if ddl:
+                    proposals[ddl] = label
+            report.append(
+                {
+                    "query": label,
+                    "statement": statement,
+                    "execution_ms": plan.get("Execution Time"),
+                    "seq_scans": findings,
+                }
+            )
+    return report, [f"-- {label}\n{ddl}" for ddl, label in proposals.items()]
+
+
+def seed(engine, papers_per_instance: int = 4000, seed_value: int = 0) -> None:
+    """Fill an empty database with synthetic rows shaped like the real data."""
+    with engine.connect() as conn:
+        if conn.execute(text("SELECT count(*) FROM paper")).scalar():
+            raise RuntimeError("Refusing to seed a database that already has papers")
+
+    rng = random.Random(seed_value)
+    n_authors = papers_per_instance * 5
+    n_keywords = 2000
+    affiliations = list(TRACKED_ORGANIZATIONS) + [f"Organization {i}" for i in range(500)]
+    instances = [
+        (conf_id, name, year)
+        for conf_id, name in [(1, "NeurIPS"), (2, "ICML")]
+        for year in (2022, 2023, 2024)
+    ]
+
+    def insert(conn, table, rows, chunk=5000):
+        for i in range(0, len(rows), chunk):
+            conn.execute(table.insert(), rows[i : i + chunk])
+
+    with engine.begin() as conn:
+        insert(conn, Conference.__table__, [
+            {"conference_id": 1, "name": "NeurIPS"},
+            {"conference_id": 2, "name": "ICML"},
+            {"conference_id": 3, "name": "GTC"},
+        ])
+        insert(conn, ConferenceInstance.__table__, [
+            {
+                "instance_id": i + 1,
+                "conference_id": conf_id,
+                "conference_name": f"{name} {year}",
+                "year": year,
+            }
+            for i, (conf_id, name, year) in enumerate(instances)
+        ] + [{
+            "instance_id": len(instances) + 1,
+            "conference_id": 3,
+            "conference_name": "GTC 2025",
+            "year": 2025,
+        }])
+        insert(conn, Affiliation.__table__, [
+            {"affiliation_id": i + 1, "name": name, "aliases": []}
+            for i, name in enumerate(affiliations)
+        ])
+        insert(conn, Author.__table__, [
+            {"author_id": i + 1, "name": f"Author {i}"} for i in range(n_authors)
+        ])
+        insert(conn, AuthorAffiliation.__table__, [
+            {"author_id": i + 1, "affiliation_id": rng.randrange(len(affiliations)) + 1}
+            for i in range(n_authors)
+        ])
+        insert(conn, Keyword.__table__, [
+            {"keyword_id": i + 1, "keyword": f"keyword {i}"} for i in range(n_keywords)
+        ])
+
+        paper_id = 0
+        for instance_id, (_, name, year) in enumerate(instances, start=1):
+            papers, authors, keywords = [], [], []
+            for _ in range(papers_per_instance):
+                paper_id += 1
+                papers.append({
+                    "paper_id": paper_id,
+                    "instance_id": instance_id,
+                    "title": f"{name} {year} paper {paper_id} on learning",
+                    "year": year,
+                    "abstract": "We study learning " * 20,
+                    "citation_count": int(rng.paretovariate(1.2)),
+                })
+                authors += [
+                    {"paper_id": paper_id, "author_id": a + 1}
+                    for a in rng.sample(range(n_authors), 4)
+                ]
+                keywords += [
+                    {"paper_id": paper_id, "keyword_id": k + 1}
+                    for k in rng.sample(range(n_keywords), 5)
+                ]
+            insert(conn, Paper.__table__, papers)
+            insert(conn, paper_author, authors)
+            insert(conn, PaperKeyword.__table__, keywords)
+
+        gtc_instance = len(instances) + 1
+        insert(conn, Speaker.__table__, [
+            {
+                "speaker_id": i + 1,
+                "name": f"Speaker {i}",
+                "affiliation_id": rng.randrange(len(affiliations)) + 1,
+            }
+            for i in range(3000)
+        ])
+        insert(conn, Session.__table__, [
+            {
+                "session_id": i + 1,
+                "instance_id": gtc_instance,
+                "title": f"Session {i}",
+                "session_code": f"S{i:05d}",
+                "topic": f"Track {i % 25}",
+                "date": date(2025, 3, 17 + i % 5),
+                "start_time": time(8 + i % 10),
+                "end_time": time(9 + i % 10),
+            }
+            for i in range(1000)
+        ])
+        insert(conn, SessionSpeaker.__table__, [
+            {"session_id": i + 1, "speaker_id": s + 1}
+            for i in range(1000)
+            for s in rng.sample(range(3000), 2)
+        ])
+        for table in ("conference", "conference_instance", "affiliation", "author", "keyword",
+                      "paper", "speaker", "session"):
+            key = inspect(engine).get_pk_constraint(table)["constrained_columns"][0]
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{key}'), "
+                f"(SELECT max({key}) FROM {table}))"
+            ))
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain repository hot queries and propose indexes.")
+    parser.add_argument("--min-rows", type=int, default=10000,
+                        help="Only report sequential scans on tables at least this large")
+    parser.add_argument("--migration", help="Write the proposed DDL to this migration file")
+    parser.add_argument("--seed", type=int, metavar="PAPERS_PER_INSTANCE",
+                        help="Seed an empty database with synthetic data first")
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    if args.seed:
+        seed(db.engine, args.seed)
+        db.refresh_summary_views(concurrently=False)
+
+    session = db.get_session()
+    try:
+        report, proposals = run_advisor(db.engine, session, args.min_rows)
+    finally:
+        db.close()
+
+    for entry in report:
+        if "error" in entry:
+            print(f"{entry['query']}: failed ({entry['error']})")
+            continue
+        print(f"{entry['query']}: {entry['execution_ms']:.1f} ms")
+        for scan in entry["seq_scans"]:
+            print(
+                f"  Seq Scan on {scan['table']} (~{scan['rows']} rows, "
+                f"{scan['time_ms']:.1f} ms, {scan['buffers']} buffers) "
+                f"filter={scan['filter']} columns={scan['columns']}"
+            )
+
+    print("\nProposed indexes:" if proposals else "\nNo new indexes proposed.")
+    for ddl in proposals:
+        print(ddl)
+    if args.migration and proposals:
+        with open(args.migration, "w", encoding="utf-8") as f:
+            f.write("-- Proposed by index_advisor.py\n\n" + "\n\n".join(proposals) + "\n")
+        print(f"Wrote {args.migration}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+SQL instrumentation for the shared engine.
+
+Engine event hooks time every statement and record the rows it returned, the
+repository method that issued it and the page code that called that method.
+Statements are collected per Streamlit rerun (see `record_rerun`), summarized
+per statement shape and per repository method, and written as one JSON line
+per rerun. A statement shape executed more than SQL_N_PLUS_ONE_THRESHOLD times
+in one rerun is flagged as a likely N+1 pattern.
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+
+from config import SQL_N_PLUS_ONE_THRESHOLD, SQL_QUERY_LOG
+
+# A context variable rather than a thread-local, so that queries run as
+# asyncio tasks on another thread are still recorded for the calling rerun
+_recorder: ContextVar = ContextVar("query_recorder", default=None)
+# Async statements run on the event loop thread, whose stack holds neither the
+# repository method nor the page code: both are carried in the context instead
+_async_method: ContextVar = ContextVar("async_repository_method", default=None)
+_async_call_site: ContextVar = ContextVar("async_call_site", default=None)
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_REPOSITORY_DIR = os.path.join(_PROJECT_DIR, "repositories")
+# The cache decorator wraps repository methods; report its caller instead
+_SKIPPED_FILES = {os.path.abspath(__file__), os.path.join(_PROJECT_DIR, "cache.py")}
+
+_PARAM_RE = re.compile(r"%\(\w+\)s|\?|\$\d+")
+_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Reduce a statement to its shape: parameters, literals and IN lists become ?."""
+    shape = _PARAM_RE.sub("?", statement)
+    shape = _LITERAL_RE.sub("?", shape)
+    shape = _LIST_RE.sub("?", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+def _call_context() -> tuple[Optional[str], Optional[str]]:
+    """
+    Walk the stack for (repository method, call site).
+
+    The repository method is the innermost frame in repositories/; the call
+    site is the innermost project frame outside repositories/, i.e. the page
+    or helper that called the repository.
+    """
+    method = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_PROJECT_DIR) and filename not in _SKIPPED_FILES:
+            if filename.startswith(_REPOSITORY_DIR):
+                if method is None:
+                    owner = frame.f_locals.get("self", frame.f_locals.get("_self"))
+                    prefix = f"{type(owner).__name__}." if owner is not None else ""
+                    method = f"{prefix}{frame.f_code.co_name}"
+            else:
+                site = os.path.relpath(filename, _PROJECT_DIR)
+                return method, f"{site}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return method, None
+
+
+class QueryRecorder:
+    """Statements executed during one unit of work, usually one Streamlit rerun."""
+
+    def __init__(self, label: str, n_plus_one_threshold: int = SQL_N_PLUS_ONE_THRESHOLD):
+        self.label = label
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+        self.records = []
+
+    def add(self, statement: str, elapsed_ms: float, rows: int) -> None:
+        method, call_site = _call_context()
+        method = method or _async_method.get()
+        call_site = call_site or _async_call_site.get()
+        self.records.append(
+            {
+                "shape": statement_shape(statement),
+                "elapsed_ms": elapsed_ms,
+                "rows": rows,
+                "method": method,
+                "call_site": call_site,
+            }
+        )
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def summary(self) -> dict:
+        """Aggregate the records per statement shape and per repository method."""
+        shapes = defaultdict(
+            lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "call_sites": set()}
+        )
+        methods = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "rows": 0})
+        for record in self.records:
+            shape = shapes[record["shape"]]
+            shape["count"] += 1
+            shape["total_ms"] += record["elapsed_ms"]
+            shape["max_ms"] = max(shape["max_ms"], record["elapsed_ms"])
+            shape["rows"] += max(record["rows"], 0)
+            if record["call_site"]:
+                shape["call_sites"].add(record["call_site"])
+
+            method = methods[record["method"] or "<outside repositories>"]
+            method["count"] += 1
+            method["total_ms"] += record["elapsed_ms"]
+            method["rows"] += max(record["rows"], 0)
+
+        statements = sorted(
+            (
+                {"statement": text, **stats, "call_sites": sorted(stats["call_sites"])}
+                for text, stats in shapes.items()
+            ),
+            key=lambda s: s["total_ms"],
+            reverse=True,
+        )
+        return {
+            "label": self.label,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration_ms": self.duration_ms,
+            "query_count": len(self.records),
+            "sql_ms": sum(r["elapsed_ms"] for r in self.records),
+            "methods": dict(
+                sorted(methods.items(), key=lambda m: m[1]["total_ms"], reverse=True)
+            ),
+            "statements": statements,
+            "n_plus_one": [
+                s for s in statements if s["count"] > self.n_plus_one_threshold
+            ],
+        }
+
+
+def current_recorder() -> Optional[QueryRecorder]:
+    return _recorder.get()
+
+
+@contextmanager
+def record_rerun(label: str, log_path=SQL_QUERY_LOG):
+    """
+    Record every statement executed by this context inside the block.
+
+    Streamlit runs each rerun of a session in one script thread, so wrapping
+    the page body collects exactly that rerun's queries; `bind_recorder`
+    carries the recorder over to async queries. The summary is
+    appended to `log_path` as one JSON line when the block exits, including
+    when it exits through st.rerun() or st.stop().
+    """
+    recorder = QueryRecorder(label)
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        recorder.finish()
+        if log_path and recorder.records:
+            write_log(recorder.summary(), log_path)
+
+
+def bind_recorder(recorder: Optional[QueryRecorder], call_site: str = None) -> None:
+    """
+    Make `recorder` current in this context, e.g. inside an asyncio task.
+    `call_site` is reported for the statements of async repository methods.
+    """
+    _recorder.set(recorder)
+    _async_call_site.set(call_site)
+
+
+def code_site(func) -> Optional[str]:
+    """Call site label for where `func` is defined, e.g. a query lambda of a page."""
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return None
+    site = os.path.relpath(os.path.abspath(code.co_filename), _PROJECT_DIR)
+    return f"{site}:{code.co_firstlineno} in {code.co_name}"
+
+
+def async_repository_method(func):
+    """
+    Attribute the statements of an async repository method to it. Its
+    statements are executed away from its frame, so `_call_context` cannot
+    find it on the stack.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        token = _async_method.set(f"{type(self).__name__}.{func.__name__}")
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            _async_method.reset(token)
+
+    return wrapper
+
+
+def write_log(summary: dict, log_path) -> None:
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary, default=str) + "\n")
+    except OSError as e:
+        print(f"Error writing query log: {e}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start_time"].pop()
+    recorder = current_recorder()
+    if recorder is not None:
+        recorder.add(statement, (time.perf_counter() - start) * 1000, cursor.rowcount)
+
+
+def _handle_error(exception_context):
+    # Keep the start-time stack balanced when a statement fails
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """Attach the timing hooks to an engine. Safe to call more than once."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
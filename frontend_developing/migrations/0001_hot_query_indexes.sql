@@ -0,0 +1,20 @@
+-- Indexes for the repository hot queries, found with index_advisor.py.
+-- Fresh databases get them from models.py via create_all; IF NOT EXISTS
+-- makes this a no-op there. CONCURRENTLY keeps the tables writable while
+-- the indexes build on an existing database.
+
+-- SessionRepository.upsert looks sessions up by (instance_id, session_code, date)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_instance_code_date
+    ON session (instance_id, session_code, date);
+
+-- Speaker -> affiliation joins in the session catalog and company filters
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_speaker_affiliation_id
+    ON speaker (affiliation_id);
+
+-- Papers by instance, and PaperRepository.upsert's (instance_id, title) lookup
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paper_instance_title
+    ON paper (instance_id, title);
+
+-- The paper_keyword primary key leads with paper_id; keyword lookups need their own index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paper_keyword_keyword_id
+    ON paper_keyword (keyword_id);
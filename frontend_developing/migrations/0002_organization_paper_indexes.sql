@@ -0,0 +1,14 @@
+-- Indexes for the alias-aware organization paper queries in PaperRepository.
+-- Fresh databases get them from models.py via create_all.
+
+-- Alias lookups (aliases @> / &&) when resolving tracked organizations
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_affiliation_aliases
+    ON affiliation USING gin (aliases);
+
+-- affiliation -> authors; the primary key leads with author_id
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_author_affiliation_affiliation_author
+    ON author_affiliation (affiliation_id, author_id);
+
+-- author -> papers; the primary key leads with paper_id
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paper_author_author_paper
+    ON paper_author (author_id, paper_id);
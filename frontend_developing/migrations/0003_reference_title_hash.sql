@@ -0,0 +1,8 @@
+-- Normalized-title hash used to deduplicate references (analytics/reference_loader.py).
+-- Fresh databases get it from models.py via create_all. Existing rows start
+-- with NULL and are hashed by the loader's backfill step.
+
+ALTER TABLE reference ADD COLUMN IF NOT EXISTS title_hash VARCHAR(40);
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_reference_title_hash
+    ON reference (title_hash);
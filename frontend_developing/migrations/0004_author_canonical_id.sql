@@ -0,0 +1,8 @@
+-- Canonical author ids written by analytics/author_disambiguation.py.
+-- Fresh databases get them from models.py via create_all.
+
+ALTER TABLE author ADD COLUMN IF NOT EXISTS canonical_author_id INTEGER
+    REFERENCES author (author_id) ON DELETE SET NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_author_canonical
+    ON author (canonical_author_id);
@@ -0,0 +1,9 @@
+-- Trigram index for the blocked fuzzy affiliation matcher (AffiliationRepository).
+-- Fresh databases get it from models.py via create_all; existing databases
+-- need the extension and the index here, or matching falls back to
+-- sequential scans.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_affiliation_name_trgm
+    ON affiliation USING gin (name gin_trgm_ops);
@@ -0,0 +1,15 @@
+-- Full-text search vector for PaperRepository.search (DataSet page).
+-- Fresh databases get the column and index from models.py via create_all.
+-- On existing databases every Paper query selects search_vector, so the
+-- column has to be added before the app runs. Adding a stored generated
+-- column rewrites the paper table once.
+
+ALTER TABLE paper ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tldr, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(abstract, '')), 'C')
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paper_search_vector
+    ON paper USING gin (search_vector);
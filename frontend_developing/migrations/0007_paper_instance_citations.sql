@@ -0,0 +1,6 @@
+-- Expression index for the keyset-paginated paper listing
+-- (PaperRepository.get_papers_page orders by coalesce(citation_count, 0), paper_id
+-- within an instance). Fresh databases get it from models.py via create_all.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paper_instance_citations
+    ON paper (instance_id, (coalesce(citation_count, 0)), paper_id);
@@ -1,5 +1,6 @@
 from sqlalchemy import (
     TIMESTAMP,
+    BigInteger,
     Table,
     Column,
     Date,
@@ -11,10 +12,12 @@ from sqlalchemy import (
     UniqueConstraint,
     Index,
     Time,
-    JSON
+    JSON,
+    Computed,
+    text,
 )
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 
 Base = declarative_base()
 
@@ -82,11 +85,17 @@ class Reference(Base):
     year = Column(Integer)  # 参考文献出版年份
     journal = Column(String(255))  # 参考文献所属期刊名称
     web_url = Column(String(255))  # 参考文献的网页 URL 或指向原始论文的 URL
+    # 规范化标题的 SHA-1，用于去重（analytics/reference_loader.py）；历史数据中重复标题的副本为空
+    title_hash = Column(String(40))
     # 定义与 Paper 表的多对多关系，通过 paper_reference 中间表
     paper_to_reference = relationship(
         "Paper", secondary="paper_reference", back_populates="reference_to_paper"
     )
 
+    __table_args__ = (
+        Index("idx_reference_title_hash", "title_hash", unique=True),
+    )
+
     def __repr__(self):
         return f"<Reference(id={self.reference_id}, title={self.title}, author={self.author}, year={self.year})>"
 
@@ -104,6 +113,20 @@ class PaperReference(Base):
     )  # 关联参考文献
 
 
+# 论文引用指标表：由 analytics/citation_graph.py 基于 paper_reference 批量计算写入
+class PaperCitationMetric(Base):
+    __tablename__ = "paper_citation_metric"
+
+    paper_id = Column(
+        Integer, ForeignKey("paper.paper_id", ondelete="CASCADE"), primary_key=True
+    )  # 关联论文
+    in_corpus_citations = Column(Integer, nullable=False, default=0)  # 库内被引次数
+    pagerank = Column(Float, nullable=False, default=0)  # 引用图上的 PageRank
+    computed_at = Column(TIMESTAMP, nullable=False)  # 计算时间
+
+    __table_args__ = (Index("idx_paper_citation_metric_pagerank", "pagerank"),)
+
+
 # 文章信息表
 class Paper(Base):
     __tablename__ = "paper"
@@ -129,6 +152,16 @@ class Paper(Base):
     url = Column(String(255))  # 论文链接
     pdf_url = Column(String(255))  # 论文 PDF 链接
     attachment_url = Column(String(255))  # 论文代码库链接
+    # 全文检索向量，由数据库根据标题(A)、TL;DR(B)、摘要(C)自动生成
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(tldr, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(abstract, '')), 'C')",
+            persisted=True,
+        ),
+    )
 
     # 定义与 ConferenceInstance 的关系
     instance_to_paper = relationship("ConferenceInstance", back_populates="paper_to_instance")
@@ -151,6 +184,16 @@ class Paper(Base):
         Index("idx_paper_title", "title"),
         Index("idx_paper_year", "year"),
         Index("idx_paper_publish_date", "publish_date"),
+        Index("idx_paper_search_vector", "search_vector", postgresql_using="gin"),
+        # 同时覆盖按 instance_id 的查询和 PaperRepository.upsert 的 (instance_id, title) 查找
+        Index("idx_paper_instance_title", "instance_id", "title"),
+        # 按引用数的键集分页（PaperRepository.get_papers_page）
+        Index(
+            "idx_paper_instance_citations",
+            "instance_id",
+            text("coalesce(citation_count, 0)"),
+            "paper_id",
+        ),
     )
 
     def __repr__(self):
@@ -168,6 +211,10 @@ class Author(Base):
     google_scholar_url = Column(String(255))  # Google Scholar 主页
     home_website = Column(String(255))  # 个人主页
     nationality = Column(String(100))  # 国籍
+    # 消歧后合并到的规范作者 ID（analytics/author_disambiguation.py 写入），为空表示自身即规范作者
+    canonical_author_id = Column(
+        Integer, ForeignKey("author.author_id", ondelete="SET NULL")
+    )
     # 多对多关系配置
     paper_to_author = relationship(
         "Paper", secondary="paper_author", back_populates="author_to_paper"
@@ -181,6 +228,7 @@ class Author(Base):
     __table_args__ = (
         # 创建索引方便通过name查询
         Index("idx_author_name", "name"),
+        Index("idx_author_canonical", "canonical_author_id"),
     )
 
     def __repr__(self):
@@ -209,6 +257,8 @@ paper_author = Table(
         ForeignKey("author.author_id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    # 主键以 paper_id 开头；按作者查论文需要 (author_id, paper_id) 覆盖索引
+    Index("idx_paper_author_author_paper", "author_id", "paper_id"),
 )
 
 
@@ -229,10 +279,51 @@ class Affiliation(Base):
         back_populates="affiliation_to_author",  # 在 Author 中定义反向关系
     )
 
+    __table_args__ = (
+        # pg_trgm 三元组索引，用于机构名称模糊匹配
+        Index(
+            "idx_affiliation_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # 别名数组的 GIN 索引，支持 aliases @> / && 查询
+        Index("idx_affiliation_aliases", "aliases", postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<Affiliation(id={self.affiliation_id}, name={self.name}, type={self.type})>"
 
 
+# 追踪机构映射表：organizations.yaml 中的机构解析到 affiliation（按名称或别名）
+class TrackedOrganization(Base):
+    __tablename__ = "tracked_organization"
+
+    affiliation_id = Column(
+        Integer,
+        ForeignKey("affiliation.affiliation_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    organization = Column(String(255), nullable=False)  # organizations.yaml 中的机构名
+    category = Column(String(50))  # university, company 等
+
+    __table_args__ = (
+        Index("idx_tracked_organization_org", "organization"),
+        Index("idx_tracked_organization_category", "category", "organization"),
+    )
+
+    def __repr__(self):
+        return f"<TrackedOrganization(affiliation_id={self.affiliation_id}, organization={self.organization})>"
+
+
+# 记录映射表对应的 organizations.yaml 版本，配置变化时重建映射
+class TrackedOrganizationConfig(Base):
+    __tablename__ = "tracked_organization_config"
+
+    config_hash = Column(String(64), primary_key=True)
+    resolved_at = Column(TIMESTAMP, nullable=False)
+
+
 # 作者-机构关系表
 class AuthorAffiliation(Base):
     __tablename__ = "author_affiliation"
@@ -245,6 +336,11 @@ class AuthorAffiliation(Base):
         primary_key=True,
     )  # 关联组织
 
+    __table_args__ = (
+        # 主键以 author_id 开头；按机构查作者需要 (affiliation_id, author_id) 覆盖索引
+        Index("idx_author_affiliation_affiliation_author", "affiliation_id", "author_id"),
+    )
+
 
 # 关键字信息表
 class Keyword(Base):
@@ -274,6 +370,9 @@ class PaperKeyword(Base):
         Integer, ForeignKey("keyword.keyword_id", ondelete="CASCADE"), primary_key=True
     )  # 关联关键字
 
+    # 主键以 paper_id 开头，按关键字查论文需要单独的索引
+    __table_args__ = (Index("idx_paper_keyword_keyword_id", "keyword_id"),)
+
 # Session
 class Session(Base):
     __tablename__ = "session"
@@ -315,6 +414,8 @@ class Session(Base):
         Index("idx_session_date", "date"),
         Index("idx_session_title", "title"),
         Index("idx_session_topic", "topic"),
+        # SessionRepository.upsert 按 (instance_id, session_code, date) 查找
+        Index("idx_session_instance_code_date", "instance_id", "session_code", "date"),
     )
 
     def __repr__(self):
@@ -338,8 +439,12 @@ class Speaker(Base):
     session_to_speaker = relationship(
         "Session", secondary="session_speaker", back_populates="speaker_to_session"
     )
+    affiliation = relationship("Affiliation")
 
-    __table_args__ = (Index("idx_speaker_name", "name"),)
+    __table_args__ = (
+        Index("idx_speaker_name", "name"),
+        Index("idx_speaker_affiliation_id", "affiliation_id"),
+    )
 
     def __repr__(self):
         return f"<Speaker(id={self.speaker_id}, name={self.name})>"
@@ -358,3 +463,15 @@ class SessionSpeaker(Base):
 
     def __repr__(self):
         return f"<SessionSpeaker(session_id={self.session_id}, speaker_id={self.speaker_id}, role={self.role})>"
+
+
+# 数据版本表：每张表一个递增版本号，写入时加一并通过 NOTIFY 广播，缓存键包含版本号
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    table_name = Column(String(100), primary_key=True)  # 表名或物化视图名
+    version = Column(BigInteger, nullable=False, default=0)  # 每次写入提交后加一
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=text("now()"))
+
+    def __repr__(self):
+        return f"<DataVersion(table={self.table_name}, version={self.version})>"
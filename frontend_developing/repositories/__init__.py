@@ -1,10 +1,15 @@
 from .paper_repository import PaperRepository
 from .author_repository import AuthorRepository
 from .conference_repository import ConferenceRepository
-from .conference_instance_repository import ConferenceInstanceRepository
+from .conference_instance_repository import (
+    ConferenceInstanceRepository,
+    AsyncConferenceInstanceRepository,
+)
 from .reference_repository import ReferenceRepository
 from .affiliation_repository import AffiliationRepository
 from .keyword_repository import KeywordRepository
+from .session_repository import SessionRepository, AsyncSessionRepository
+from .stats_repository import StatsRepository, DuckDBStatsRepository
 
 
 __all__ = [
@@ -12,7 +17,12 @@ __all__ = [
     "AuthorRepository",
     "ConferenceRepository",
     "ConferenceInstanceRepository",
+    "AsyncConferenceInstanceRepository",
     "ReferenceRepository",
     "AffiliationRepository",
     "KeywordRepository",
+    "SessionRepository",
+    "AsyncSessionRepository",
+    "StatsRepository",
+    "DuckDBStatsRepository",
 ]
@@ -1,61 +1,116 @@
-import re
-from fuzzywuzzy import fuzz
-from models import Affiliation
-from sqlalchemy import or_
-from config import TRACKED_ORGANIZATIONS
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from models import (
+    Affiliation,
+    Conference,
+    ConferenceInstance,
+    TrackedOrganization,
+    TrackedOrganizationConfig,
+)
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import array, insert
+from config import (
+    CHINESE_NATIONALITIES,
+    COLLABORATION_MAX_EDGES,
+    TRACKED_ORGANIZATIONS,
+    TRACKED_ORGANIZATION_CATEGORIES,
+    TRACKED_ORGANIZATIONS_HASH,
+)
+from analytics.affiliation_matching import AffiliationMatcher, normalize_name
+from analytics.collaboration_network import collaboration_network
+from analytics.publication_cube import UNKNOWN_NATIONALITY, load_publication_cube
+from .stats_repository import make_stats_repository
+
+
+def resolve_tracked_organization(name: str, aliases: Optional[list]) -> Optional[str]:
+    """Tracked organization an affiliation belongs to, by its name first, then its aliases."""
+    if name in TRACKED_ORGANIZATION_CATEGORIES:
+        return name
+    for alias in aliases or []:
+        if isinstance(alias, str) and alias.strip('"') in TRACKED_ORGANIZATION_CATEGORIES:
+            return alias.strip('"')
+    return None
+
+
+# pg_advisory_xact_lock key serializing tracked_organization rebuilds
+TRACKED_ORGANIZATIONS_LOCK = 0x7472616B
+# Alias spellings of the tracked organizations; some aliases are stored quoted
+TRACKED_ALIASES = TRACKED_ORGANIZATIONS + [f'"{name}"' for name in TRACKED_ORGANIZATIONS]
 
 
 class AffiliationRepository:
+    # Config hash the mapping table was last checked against in this process
+    _synced_config_hash = None
+
     def __init__(self, session):
         self.session = session
+        self._matcher = None
 
     def get_affiliation_by_id(self, affiliation_id: int) -> Affiliation:
         return self.session.query(Affiliation).filter_by(affiliation_id=affiliation_id).first()
 
     def _clean_name(self, name: str) -> str:
         """Clean name by removing special characters and standardizing format"""
-        if not name:
-            return name
-
-        # Convert to uppercase for standardization
-        name = name.upper()
-
-        # Remove special characters and extra whitespace
-        name = re.sub(r"[^\w\s]", "", name)
-        name = re.sub(r"\s+", " ", name).strip()
-
-        # Common abbreviation standardization
-        replacements = {
-            "MASSACHUSETTS INSTITUTE OF TECHNOLOGY": "MIT",
-            "MASS INST OF TECH": "MIT",
-            "MASS INSTITUTE OF TECHNOLOGY": "MIT",
-            # Add more common variations as needed
-        }
-        return replacements.get(name, name)
-
-    def _find_best_matching_affiliation(
-        self, name: str, affiliations: list, threshold: int
-    ) -> str:
-        """Find the best matching affiliation using fuzzy string matching"""
-        best_score = 0
-        best_match = None
-
-        for affiliation in affiliations:
-            # Check primary name
-            score = fuzz.ratio(name, affiliation.name)
-            if score > best_score:
-                best_score = score
-                best_match = affiliation
-
-            # Check aliases
-            if affiliation.aliases:
-                for alias in affiliation.aliases:
-                    score = fuzz.ratio(name, self._clean_institution_name(alias))
-                    if score > best_score:
-                        best_score = score
-                        best_match = affiliation
-
-        return best_match if best_score >= threshold else None
+        return normalize_name(name)
+
+    def _find_best_matching_affiliation(self, name: str, threshold: int = 85) -> Affiliation:
+        """
+        Find the best matching affiliation using fuzzy string matching.
+
+        Only the candidate block returned by the trigram index is scored, instead
+        of every affiliation name and alias. The matcher is built once per
+        repository and reused across lookups.
+
+        Args:
+            name (str): Raw affiliation string
+            threshold (int): Minimum fuzz.ratio score to accept a match
+
+        Returns:
+            Affiliation or None
+        """
+        if self._matcher is None or self._matcher.threshold != threshold:
+            self._matcher = AffiliationMatcher.from_session(self.session, threshold=threshold)
+
+        match = self._matcher.match(name)
+        if not match:
+            return None
+        return self.get_affiliation_by_id(match[0])
+
+    def find_similar_affiliations(
+        self, name: str, limit: int = 5, threshold: float = 0.3
+    ) -> list[tuple[Affiliation, float]]:
+        """
+        Find affiliations with a similar name using PostgreSQL pg_trgm.
+
+        The `%` operator is served by the `idx_affiliation_name_trgm` GIN index,
+        so this stays fast without loading the table into Python.
+
+        Args:
+            name (str): Raw affiliation string
+            limit (int): Maximum number of matches to return
+            threshold (float): pg_trgm similarity threshold (0-1)
+
+        Returns:
+            list: (Affiliation, similarity) tuples, most similar first
+        """
+        cleaned = self._clean_name(name)
+        if not cleaned:
+            return []
+
+        # Transaction-local, so it does not leak into other queries on the connection
+        self.session.execute(
+            func.set_config("pg_trgm.similarity_threshold", str(threshold), True).select()
+        )
+        # pg_trgm ignores case and punctuation, so the raw name column can be compared
+        similarity = func.similarity(Affiliation.name, cleaned)
+        return (
+            self.session.query(Affiliation, similarity.label("similarity"))
+            .filter(Affiliation.name.op("%")(cleaned))
+            .order_by(similarity.desc())
+            .limit(limit)
+            .all()
+        )
 
     def upsert(self, name: str, **kwargs) -> Affiliation:
         affiliation = self.session.query(Affiliation).filter_by(name=name).first()
@@ -80,32 +135,342 @@ class AffiliationRepository:
         else:
             affiliation = Affiliation(name=name, **kwargs)
             self.session.add(affiliation)
+            self.session.flush()
 
+        self._track_affiliation(affiliation)
         self.session.commit()
+        # The in-memory index no longer reflects the table
+        self._matcher = None
         return affiliation
 
-    def get_tracked_organizations(self) -> list[str]:
-        orgs = []
-        affiliations = self.session.query(Affiliation).all()
-        for affiliation in affiliations:
-            candidate = None
-            # Check main name
-            if affiliation.name in TRACKED_ORGANIZATIONS:
-                orgs.append(affiliation.name)
-                continue
-
-            # Parse and check aliases
-            if affiliation.aliases:
-                # Remove curly braces and split by comma
-                aliases = [
-                    alias.strip('"')
-                    for alias in affiliation.aliases
-                    if isinstance(alias, str)
-                ]
-                for alias in aliases:
-                    if alias in TRACKED_ORGANIZATIONS:
-                        candidate = alias
-                        break
-            if candidate:
-                orgs.append(candidate)
-        return list(set(orgs))  # Remove duplicates
+    def _track_affiliation(self, affiliation: Affiliation) -> None:
+        """Keep the tracked_organization row of one affiliation in line with its name and aliases."""
+        organization = resolve_tracked_organization(affiliation.name, affiliation.aliases)
+        mapping = self.session.get(TrackedOrganization, affiliation.affiliation_id)
+        if organization is None:
+            if mapping is not None:
+                self.session.delete(mapping)
+        elif mapping is None:
+            self.session.add(
+                TrackedOrganization(
+                    affiliation_id=affiliation.affiliation_id,
+                    organization=organization,
+                    category=TRACKED_ORGANIZATION_CATEGORIES[organization],
+                )
+            )
+        else:
+            mapping.organization = organization
+            mapping.category = TRACKED_ORGANIZATION_CATEGORIES[organization]
+
+    def _rebuild_tracked_organizations(self) -> None:
+        """Upsert the mapping of every affiliation named after a tracked organization."""
+        # Only affiliations named after a tracked organization, directly or by alias
+        candidates = (
+            self.session.query(Affiliation.affiliation_id, Affiliation.name, Affiliation.aliases)
+            .filter(
+                or_(
+                    Affiliation.name.in_(TRACKED_ORGANIZATIONS),
+                    Affiliation.aliases.overlap(array(TRACKED_ALIASES)),
+                )
+            )
+            .all()
+        )
+        mappings = []
+        for affiliation_id, name, aliases in candidates:
+            organization = resolve_tracked_organization(name, aliases)
+            if organization:
+                mappings.append(
+                    {
+                        "affiliation_id": affiliation_id,
+                        "organization": organization,
+                        "category": TRACKED_ORGANIZATION_CATEGORIES[organization],
+                    }
+                )
+
+        self.session.query(TrackedOrganization).filter(
+            TrackedOrganization.affiliation_id.notin_([m["affiliation_id"] for m in mappings])
+        ).delete(synchronize_session=False)
+        if mappings:
+            stmt = insert(TrackedOrganization)
+            self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["affiliation_id"],
+                    set_={
+                        "organization": stmt.excluded.organization,
+                        "category": stmt.excluded.category,
+                    },
+                ),
+                mappings,
+            )
+        self.session.query(TrackedOrganizationConfig).filter(
+            TrackedOrganizationConfig.config_hash != TRACKED_ORGANIZATIONS_HASH
+        ).delete(synchronize_session=False)
+        self.session.execute(
+            insert(TrackedOrganizationConfig)
+            .values(config_hash=TRACKED_ORGANIZATIONS_HASH, resolved_at=datetime.now())
+            .on_conflict_do_update(
+                index_elements=["config_hash"], set_={"resolved_at": datetime.now()}
+            )
+        )
+
+    def sync_tracked_organizations(self, force: bool = False) -> None:
+        """
+        Rebuild the tracked_organization mapping if organizations.yaml changed
+        since it was last resolved. Checked once per process unless forced.
+
+        Safe to run from several processes at once: the rebuild holds a
+        transaction-level advisory lock, re-checks the stored hash under it,
+        and upserts the mapping instead of deleting and re-inserting it.
+        """
+        if not force and AffiliationRepository._synced_config_hash == TRACKED_ORGANIZATIONS_HASH:
+            return
+
+        def stale():
+            stored = self.session.query(TrackedOrganizationConfig.config_hash).first()
+            return force or stored is None or stored[0] != TRACKED_ORGANIZATIONS_HASH
+
+        if stale():
+            # Held until the commit; a process that waited for it finds the new hash
+            self.session.execute(select(func.pg_advisory_xact_lock(TRACKED_ORGANIZATIONS_LOCK)))
+            if stale():
+                self._rebuild_tracked_organizations()
+            self.session.commit()
+        AffiliationRepository._synced_config_hash = TRACKED_ORGANIZATIONS_HASH
+
+    def get_tracked_organizations(self, category: str = None) -> list[str]:
+        """
+        Get the tracked organizations that have at least one affiliation.
+
+        Args:
+            category (str, optional): Only organizations of this category (e.g. university)
+
+        Returns:
+            list: Organization names, sorted
+        """
+        self.sync_tracked_organizations()
+        query = self.session.query(TrackedOrganization.organization).distinct()
+        if category:
+            query = query.filter(TrackedOrganization.category == category)
+        return [org[0] for org in query.order_by(TrackedOrganization.organization).all()]
+
+    def get_tracked_affiliation_ids(self, organization: str) -> list[int]:
+        """Get the ids of all affiliations resolved to a tracked organization."""
+        self.sync_tracked_organizations()
+        rows = (
+            self.session.query(TrackedOrganization.affiliation_id)
+            .filter(TrackedOrganization.organization == organization)
+            .all()
+        )
+        return [row[0] for row in rows]
+
+    def get_organization_conference_stats(
+        self, organization: str, year: int = None
+    ) -> list[tuple]:
+        """
+        Get (conference_name, paper_count) tuples for an organization.
+        Read from the statistics backend (see ANALYTICS_BACKEND).
+
+        Args:
+            organization (str): Affiliation name
+            year (int, optional): Restrict to a single year
+
+        Returns:
+            list: (conference_name, paper_count) tuples
+        """
+        return make_stats_repository(lambda: self.session).get_organization_conference_stats(
+            organization, year or None
+        )
+
+    def get_collaboration_network(
+        self,
+        kind: str = "organization",
+        conference: str = None,
+        start_year: int = None,
+        end_year: int = None,
+        organization: str = None,
+        max_edges: int = COLLABORATION_MAX_EDGES,
+    ) -> dict:
+        """
+        Get a collaboration network pruned to its heaviest edges, summed over
+        the conference instances matching the filters. Served from the
+        per-instance networks built by analytics/collaboration_network.py.
+
+        Args:
+            kind (str): "organization" or "author"
+            conference (str, optional): Conference name filter
+            start_year (int, optional): First year, inclusive
+            end_year (int, optional): Last year, inclusive
+            organization (str, optional): Only edges of this organization, or
+                of its authors for the author network
+            max_edges (int): Number of edges to keep
+
+        Returns:
+            dict: {"nodes": [...], "edges": [...]} in the dashboard network format
+        """
+        query = self.session.query(ConferenceInstance.instance_id)
+        if conference:
+            query = query.join(Conference).filter(Conference.name == conference)
+        if start_year is not None:
+            query = query.filter(ConferenceInstance.year >= start_year)
+        if end_year is not None:
+            query = query.filter(ConferenceInstance.year <= end_year)
+        instance_ids = [row[0] for row in query.all()]
+        return collaboration_network(kind, instance_ids, max_edges, organization)
+
+    def get_organization_profile(self, organization: str, topics: int = 5) -> dict:
+        """
+        Publication statistics of one tracked organization, sliced from the
+        publication cube (see analytics/publication_cube.py).
+
+        Args:
+            organization (str): Tracked organization name
+            topics (int): Number of research topics and buzzwords to return
+
+        Returns:
+            dict: total_papers, total_citations, conferences, years and the
+            per-year series of the organization page; None if the cube has not
+            been built
+        """
+        cube = load_publication_cube()
+        if cube is None:
+            return None
+
+        (years, conferences), papers = cube.query(
+            "papers", by=("year", "conference"), organization=organization
+        )
+        _, citations = cube.query("citations", organization=organization)
+        (_, nationalities), authors = cube.query(
+            "authors", by=("year", "nationality"), organization=organization
+        )
+        (keywords, _), keyword_papers = cube.query(
+            "keyword_papers", by=("keyword", "year"), organization=organization
+        )
+
+        # Years from the organization's first to its last paper
+        active = np.flatnonzero(papers.sum(axis=1))
+        span = slice(active[0], active[-1] + 1) if len(active) else slice(0, 0)
+        years, papers = years[span], papers[span]
+        authors, keyword_papers = authors[span], keyword_papers[:, span]
+
+        chinese = np.isin(np.char.lower(nationalities.astype(str)), CHINESE_NATIONALITIES)
+        unknown = nationalities == UNKNOWN_NATIONALITY
+        totals = keyword_papers.sum(axis=1)
+        research_topics = [i for i in np.argsort(-totals, kind="stable")[:topics] if totals[i] > 0]
+        # Buzzwords: latest-year count furthest above the keyword's earlier average
+        rise = np.zeros(len(keywords))
+        if keyword_papers.shape[1] > 1:
+            rise = keyword_papers[:, -1] - keyword_papers[:, :-1].mean(axis=1)
+        rise[research_topics] = 0
+        buzzwords = [i for i in np.argsort(-rise, kind="stable")[:topics] if rise[i] > 0]
+
+        year_list = years.tolist()
+        conference_totals = papers.sum(axis=0)
+        return {
+            "total_papers": int(papers.sum()),
+            "total_citations": int(citations.sum()),
+            "conferences": [c for c, n in zip(conferences.tolist(), conference_totals) if n > 0],
+            "years": year_list,
+            # Papers per year, stacked by conference
+            "yearly_papers": {
+                "years": year_list,
+                "conferences": {
+                    c: papers[:, i].tolist()
+                    for i, c in enumerate(conferences.tolist())
+                    if conference_totals[i] > 0
+                },
+            },
+            "authors_by_year": {
+                "years": year_list,
+                "chinese": authors[:, chinese].sum(axis=1).tolist(),
+                "non_chinese": authors[:, ~chinese & ~unknown].sum(axis=1).tolist(),
+                "unknown": authors[:, unknown].sum(axis=1).tolist(),
+            },
+            "research_trends": {
+                "years": year_list,
+                "topics": {str(keywords[i]): keyword_papers[i].tolist() for i in research_topics},
+            },
+            "buzzword_trends": {
+                "years": year_list,
+                "keywords": {str(keywords[i]): keyword_papers[i].tolist() for i in buzzwords},
+            },
+        }
+
+    def get_organizations_overview(self, limit: int = 10, focus_areas: int = 4) -> dict:
+        """
+        Publication statistics across the tracked organizations, sliced from
+        the publication cube (see analytics/publication_cube.py).
+
+        Args:
+            limit (int): Number of organizations in the top lists
+            focus_areas (int): Number of keywords in the focus area chart
+
+        Returns:
+            dict: headline numbers, yearly_pubs, top_orgs, focus_areas,
+            schools and companies; None if the cube has not been built
+        """
+        cube = load_publication_cube()
+        if cube is None:
+            return None
+
+        (organizations,), papers = cube.query("papers", by=("organization",))
+        _, citations = cube.query("citations", by=("organization",))
+        _, authors = cube.query("authors", by=("organization",))
+        _, keyword_papers = cube.query("keyword_papers", by=("organization", "keyword"))
+        topics = (keyword_papers > 0).sum(axis=1)
+        (years,), yearly_papers = cube.query("total_papers", by=("year",))
+        _, yearly_citations = cube.query("total_citations", by=("year",))
+
+        publishing = papers > 0
+        order = [i for i in np.argsort(-papers, kind="stable") if publishing[i]]
+        stats = [
+            {
+                "name": str(organizations[i]),
+                "category": TRACKED_ORGANIZATION_CATEGORIES.get(str(organizations[i])),
+                "papers": int(papers[i]),
+                "citations": int(citations[i]),
+                "authors": int(authors[i]),
+                "topics": int(topics[i]),
+            }
+            for i in order
+        ]
+
+        def scores(orgs: list, metrics: list) -> dict:
+            # Each metric as a percentage of the best organization shown
+            data = {"Organization": [org["name"] for org in orgs]}
+            for metric in metrics:
+                best = max([org[metric] for org in orgs] + [1])
+                data[metric.capitalize()] = [round(100 * org[metric] / best) for org in orgs]
+            return data
+
+        schools = [org for org in stats if org["category"] == "university"][:5]
+        companies = [org for org in stats if org["category"] == "company"][:5]
+        return {
+            "total_orgs": len(stats),
+            "total_publications": int(yearly_papers.sum()),
+            "most_active_org": stats[0]["name"] if stats else None,
+            "avg_papers_per_org": round(papers.sum() / len(stats)) if stats else 0,
+            "yearly_pubs": {
+                "years": years.tolist(),
+                "publications": yearly_papers.tolist(),
+                "citations": yearly_citations.tolist(),
+            },
+            "top_orgs": stats[:limit],
+            "focus_areas": [
+                {
+                    "area": keyword,
+                    "papers": count,
+                    "subareas": [
+                        {"name": name, "papers": n}
+                        for name, n in cube.top("keyword_papers", "organization", 3, keyword=keyword)
+                    ],
+                }
+                for keyword, count in cube.top("total_keyword_papers", "keyword", focus_areas)
+            ],
+            "schools": scores(schools, ["papers", "citations", "authors", "topics"]),
+            "companies": {
+                "Company": [org["name"] for org in companies],
+                "Papers": [org["papers"] for org in companies],
+                "Citations": [org["citations"] for org in companies],
+                "Authors": [org["authors"] for org in companies],
+            },
+        }
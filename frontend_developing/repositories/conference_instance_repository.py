@@ -1,8 +1,11 @@
 from models import Conference, ConferenceInstance, Paper, Session
 from typing import Optional
-from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from typing import List, Optional
+from instrumentation import async_repository_method
+from .stats_repository import make_stats_repository
 
 
 class ConferenceInstanceRepository:
@@ -79,49 +82,23 @@ class ConferenceInstanceRepository:
     def get_conference_stats(
         self, conference: str, year: Optional[int] = None
     ) -> list[tuple]:
+        """
+        Get (instance_id, conference_name, year, paper_count) tuples for a conference,
+        newest first. Read from the statistics backend (see ANALYTICS_BACKEND).
+        """
         try:
-            query = (
-                self.session.query(
-                    ConferenceInstance, func.count(Paper.paper_id).label("paper_count")
-                )
-                .select_from(Conference)
-                .join(
-                    ConferenceInstance,
-                    Conference.conference_id == ConferenceInstance.conference_id,
-                )
-                .outerjoin(Paper, ConferenceInstance.instance_id == Paper.instance_id)
-                .filter(Conference.name == conference)
+            if year == "All Years":
+                year = None
+            return make_stats_repository(lambda: self.session).get_instance_paper_counts(
+                conference, year or None
             )
-
-            if year and year != "All Years":
-                query = query.filter(ConferenceInstance.year == year)
-
-            query = query.group_by(ConferenceInstance).order_by(
-                ConferenceInstance.year.desc()
-            )
-            return query.all()
-
         except Exception as e:
             print(f"Error in get_conference_stats: {str(e)}")
             return []
 
     def get_yearly_conference_stats(self, year: int) -> list[tuple]:
-        """Get statistics for all conferences in a specific year."""
-        return (
-            self.session.query(
-                Conference.name,
-                func.count(Paper.paper_id),
-            )
-            .select_from(Conference)
-            .join(
-                ConferenceInstance,
-                Conference.conference_id == ConferenceInstance.conference_id,
-            )
-            .outerjoin(Paper, ConferenceInstance.instance_id == Paper.instance_id)
-            .filter(ConferenceInstance.year == year)
-            .group_by(Conference.name)
-            .all()
-        )
+        """Get (conference_name, paper_count) tuples for all conferences in a year."""
+        return make_stats_repository(lambda: self.session).get_yearly_conference_stats(year)
 
     def get_sessions_by_instance(self, instance_id: int) -> List[Session]:
         """Get all sessions for a conference instance."""
@@ -151,3 +128,67 @@ class ConferenceInstanceRepository:
         except Exception as e:
             print(f"Error getting conference instance: {e}")
             return None
+
+
+class AsyncConferenceInstanceRepository:
+    """
+    Async versions of the ConferenceInstanceRepository read methods.
+
+    An AsyncSession runs one statement at a time; give each concurrently
+    awaited repository its own session (see utility.db_util.run_concurrently).
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @async_repository_method
+    async def get_all_years(self) -> list[int]:
+        """Get all available years from the database, sorted in descending order."""
+        years = await self.session.scalars(
+            select(ConferenceInstance.year)
+            .distinct()
+            .order_by(ConferenceInstance.year.desc())
+        )
+        return list(years)
+
+    @async_repository_method
+    async def get_conference_years(self, conference: str) -> list[int]:
+        """Get available years for a specific conference."""
+        years = await self.session.scalars(
+            select(ConferenceInstance.year)
+            .join(Conference)
+            .where(Conference.name == conference)
+            .distinct()
+            .order_by(ConferenceInstance.year.desc())
+        )
+        return list(years)
+
+    @async_repository_method
+    async def get_sessions_by_instance(self, instance_id: int) -> List[Session]:
+        """Get all sessions for a conference instance, speakers included."""
+        try:
+            result = await self.session.scalars(
+                select(Session)
+                .filter_by(instance_id=instance_id)
+                .options(joinedload(Session.speaker_to_session))
+            )
+            return list(result.unique())
+        except Exception as e:
+            print(f"Error getting sessions: {e}")
+            return []
+
+    @async_repository_method
+    async def get_instance_by_year_and_name(
+        self, year: int, conference_name: str
+    ) -> Optional[ConferenceInstance]:
+        """Get conference instance by year and conference name."""
+        try:
+            result = await self.session.scalars(
+                select(ConferenceInstance)
+                .filter_by(year=year, conference_name=conference_name)
+                .limit(1)
+            )
+            return result.first()
+        except Exception as e:
+            print(f"Error getting conference instance: {e}")
+            return None
@@ -1,6 +1,9 @@
-import streamlit as st
 from models import Keyword, Paper, PaperKeyword
 from sqlalchemy import func, text, and_
+from sqlalchemy.orm import aliased
+from .stats_repository import make_stats_repository
+from analytics.keyword_cooccurrence import load_cooccurrence
+from analytics.keyword_trends import load_keyword_trends
 
 
 class KeywordRepository:
@@ -23,51 +26,110 @@ class KeywordRepository:
         keywords = self.session.query(Keyword.keyword).distinct().all()
         return sorted([kw[0] for kw in keywords])
 
-    @st.cache_data
-    def get_top_keywords_for_instance(
-        _self, instance_id: int, limit: int = 10
-    ) -> list[str]:
+    def get_top_keywords_for_instance(self, instance_id: int, limit: int = 10) -> list[str]:
         """
-        Get top 10 keywords for a conference instance.
-        Results are cached using Streamlit's cache_data decorator.
+        Get the most frequent keywords of a conference instance.
+        Read (and cached) by the statistics backend (see ANALYTICS_BACKEND).
         """
-        keywords = (
-            _self.session.query(
-                Keyword.keyword, func.count(Paper.paper_id).label("count")
-            )
-            .join(Keyword.paper_to_keyword)
-            .filter(Paper.instance_id == instance_id)
-            .group_by(Keyword.keyword)
-            .order_by(text("count DESC"))
-            .limit(limit)
-            .all()
+        return make_stats_repository(lambda: self.session).get_top_keywords_for_instance(
+            instance_id, limit
         )
 
-        return [k[0] for k in keywords]
-
     def get_related_keywords(
-        self, keyword: str, limit: int = 5
-    ) -> list[tuple[str, int]]:
-        """Get related keywords based on co-occurrence."""
-        return (
+        self,
+        keyword: str,
+        limit: int = 5,
+        metric: str = "count",
+        instance_id: int = None,
+        year: int = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Get related keywords based on co-occurrence.
+
+        Served from the precomputed co-occurrence matrix when it has been built
+        for the requested scope (see analytics/keyword_cooccurrence.py).
+        Otherwise the shared-paper counts are computed in SQL; that fallback
+        only supports the "count" metric.
+
+        Args:
+            keyword (str): Keyword to find related keywords for
+            limit (int): Maximum number of related keywords
+            metric (str): "count", "jaccard" or "pmi"
+            instance_id (int): Restrict to one conference instance
+            year (int): Restrict to one year
+
+        Returns:
+            list: (keyword, score) tuples, best first
+        """
+        matrix = load_cooccurrence(instance_id, year)
+        if matrix is not None:
+            return matrix.related(keyword, k=limit, metric=metric)
+
+        source = aliased(PaperKeyword)
+        other = aliased(PaperKeyword)
+        related = aliased(Keyword)
+        query = (
             self.session.query(
-                Keyword.keyword,
-                func.count(Paper.paper_id).label("co_occurrence"),
+                related.keyword, func.count(other.paper_id).label("co_occurrence")
             )
-            .join(Keyword.paper_to_keyword)  # Use the relationship to get papers
-            .join(Paper)  # Join to papers
+            .select_from(Keyword)
+            .join(source, source.keyword_id == Keyword.keyword_id)
             .join(
-                PaperKeyword, Paper.paper_id == PaperKeyword.paper_id
-            )  # Join to get other keywords
-            .join(
-                Keyword,
+                other,
                 and_(
-                    PaperKeyword.keyword_id == Keyword.keyword_id,
-                    Keyword.keyword != keyword,
+                    other.paper_id == source.paper_id,
+                    other.keyword_id != source.keyword_id,
                 ),
             )
-            .group_by(Keyword.keyword)
-            .order_by(text("co_occurrence DESC"))
+            .join(related, related.keyword_id == other.keyword_id)
+            .filter(Keyword.keyword == keyword)
+        )
+        if instance_id is not None or year is not None:
+            query = query.join(Paper, Paper.paper_id == source.paper_id)
+            if instance_id is not None:
+                query = query.filter(Paper.instance_id == instance_id)
+            if year is not None:
+                query = query.filter(Paper.year == year)
+
+        rows = (
+            query.group_by(related.keyword)
+            .order_by(text("co_occurrence DESC"), related.keyword)
             .limit(limit)
             .all()
         )
+        return [(name, float(count)) for name, count in rows]
+
+    def get_keyword_trend_scope(self) -> tuple[list[int], list[str]]:
+        """Years and conferences covered by the keyword trend array."""
+        trends = load_keyword_trends()
+        if trends is None:
+            return [], []
+        return trends.years.tolist(), trends.conferences.tolist()
+
+    def get_keyword_trends(
+        self, year: int = None, conference: str = None, limit: int = 10
+    ) -> dict:
+        """
+        Keyword statistics and trends for the overview page.
+
+        Served from the precomputed keyword x year x conference array
+        (see analytics/keyword_trends.py).
+
+        Args:
+            year (int): Year to report on, the latest year when None
+            conference (str): Restrict to one conference
+            limit (int): Maximum number of keywords per list
+
+        Returns:
+            dict: keywords, trending, new_keywords, hottest_topic, trends,
+            growth_rates, rank_changes and emerging; None if the array has not
+            been built or has no data for the year
+        """
+        trends = load_keyword_trends()
+        if trends is None or len(trends.years) == 0:
+            return None
+        try:
+            return trends.overview(year, conference, limit)
+        except ValueError as e:
+            print(f"Error getting keyword trends: {e}")
+            return None
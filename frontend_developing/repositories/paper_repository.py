@@ -1,3 +1,10 @@
+import base64
+import html
+import json
+import re
+from typing import Optional
+from sqlalchemy import Float, Integer, column, func, select, tuple_, values
+from sqlalchemy.orm import aliased, defer, joinedload, load_only, selectinload
 from models import (
     Paper,
     ConferenceInstance,
@@ -9,14 +16,109 @@ from models import (
     paper_author,
     AuthorAffiliation,
     PaperKeyword,
+    TrackedOrganization,
+    PaperCitationMetric,
 )
 
-from config import TRACKED_ORGANIZATIONS
+from analytics.citation_graph import load_citation_graph
+from config import HYBRID_CANDIDATES, TRACKED_ORGANIZATIONS
+from retrieval import paper_retriever
+from summary_views import InstancePaperCount
+from .affiliation_repository import AffiliationRepository
+from .reference_repository import ReferenceRepository
+
+# ts_headline marks matches with private-use sentinels rather than tags, so the
+# text can be HTML-escaped first and the sentinels turned into <mark> after
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\ue000", "\ue001"
+HIGHLIGHT_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}"
+# ts_headline options for search result snippets
+HEADLINE_OPTIONS = f"{HIGHLIGHT_OPTIONS}, MaxWords=35, MinWords=15, MaxFragments=2"
+# websearch_to_tsquery syntax: "quoted phrases", -negation and OR. BM25 would
+# score these as plain terms, so such queries use the tsvector path.
+SEARCH_OPERATORS = re.compile(r'"|(?:^|\s)(?:-\w|or(?:\s|$))', re.IGNORECASE)
+
+
+def highlight_html(text: Optional[str]) -> str:
+    """Escape headline text for HTML and turn the match sentinels into <mark> tags."""
+    return (
+        html.escape(text or "")
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+# Full text, references and conclusion can be megabytes per conference;
+# only the views that display them should ever load them.
+HEAVY_COLUMNS = (
+    Paper.content_raw_text,
+    Paper.reference_raw_text,
+    Paper.conclusion,
+    Paper.search_vector,
+)
+
+# Loader options per view:
+#   list   - table rows: title, year, citations and author names
+#   card   - list plus abstract, keywords and conference name
+#   detail - everything except the raw full text and references
+LOADING_PROFILES = {
+    "list": (
+        load_only(
+            Paper.paper_id,
+            Paper.instance_id,
+            Paper.title,
+            Paper.year,
+            Paper.venue,
+            Paper.citation_count,
+            Paper.award,
+        ),
+        selectinload(Paper.author_to_paper).load_only(Author.author_id, Author.name),
+    ),
+    "card": (
+        *[defer(column) for column in HEAVY_COLUMNS],
+        selectinload(Paper.author_to_paper).load_only(Author.author_id, Author.name),
+        selectinload(Paper.keyword_to_paper).load_only(
+            Keyword.keyword_id, Keyword.keyword
+        ),
+        joinedload(Paper.instance_to_paper).load_only(
+            ConferenceInstance.conference_name
+        ),
+    ),
+    "detail": (
+        defer(Paper.content_raw_text),
+        defer(Paper.reference_raw_text),
+        defer(Paper.search_vector),
+        selectinload(Paper.author_to_paper),
+        selectinload(Paper.keyword_to_paper),
+        joinedload(Paper.instance_to_paper),
+    ),
+}
+
+# Keyset sort orders: name -> (sort key expression, descending). paper_id breaks ties.
+PAGE_SORT_KEYS = {
+    "citations": (func.coalesce(Paper.citation_count, 0), True),
+    "year": (Paper.year, True),
+    "title": (Paper.title, False),
+}
+
+
+def encode_cursor(sort: str, key, paper_id: int) -> str:
+    payload = json.dumps([sort, key, paper_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        sort, key, paper_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+    return sort, key, paper_id
 
 
 class PaperRepository:
     def __init__(self, session):
         self.session = session
+        # (query, filters) -> fused hits; search() and count_search_results()
+        # of one page render share a single retrieval
+        self._hybrid_memo = {}
 
     def _get_author(self, author_id: str) -> Author:
         author = self.session.query(Author).filter_by(author_id=author_id).first()
@@ -25,7 +127,7 @@ class PaperRepository:
         return author
 
     def _get_reference(self, title: str) -> Reference:
-        reference = self.session.query(Reference).filter_by(title=title).first()
+        reference = ReferenceRepository(self.session).get_by_title(title)
         if not reference:
             raise ValueError(f"Reference {title} not found.")
         return reference
@@ -77,10 +179,21 @@ class PaperRepository:
         self.session.commit()
         return paper
 
-    def get_papers_by_conference(self, conference: str, year: int) -> list[Paper]:
+    def _loading_options(self, profile: str) -> tuple:
+        if profile not in LOADING_PROFILES:
+            raise ValueError(
+                f"Unknown loading profile {profile}, "
+                f"expected one of {', '.join(LOADING_PROFILES)}"
+            )
+        return LOADING_PROFILES[profile]
+
+    def get_papers_by_conference(
+        self, conference: str, year: int, profile: str = "list"
+    ) -> list[Paper]:
         """Get papers for a specific conference and year."""
         return (
             self.session.query(Paper)
+            .options(*self._loading_options(profile))
             .join(ConferenceInstance)
             .join(Conference)
             .filter(Conference.name == conference)
@@ -88,33 +201,292 @@ class PaperRepository:
             .all()
         )
 
-    def get_papers_by_organization(self, organization: str) -> list[Paper]:
+    def _organization_author_ids(self, organization: str):
+        """
+        Subquery of the authors affiliated with a tracked organization, under
+        its name or any of its aliases (resolved in tracked_organization).
+        """
         if organization not in TRACKED_ORGANIZATIONS:
             raise ValueError(f"Organization {organization} is not in the tracked list")
+        AffiliationRepository(self.session).sync_tracked_organizations()
+
+        return (
+            select(AuthorAffiliation.author_id)
+            .join(
+                TrackedOrganization,
+                TrackedOrganization.affiliation_id == AuthorAffiliation.affiliation_id,
+            )
+            .where(TrackedOrganization.organization == organization)
+        )
+
+    def _organization_paper_ids(self, organization: str):
+        """
+        Subquery of the distinct papers of a tracked organization.
 
+        Walks tracked_organization -> author_affiliation -> paper_author, each
+        step an index-only lookup, instead of joining full Paper rows.
+        """
         return (
+            select(paper_author.c.paper_id)
+            .where(paper_author.c.author_id.in_(self._organization_author_ids(organization)))
+            .distinct()
+        )
+
+    def get_papers_by_organization(
+        self, organization: str, profile: str = "list", limit: Optional[int] = None
+    ) -> list[Paper]:
+        """
+        Get the distinct papers of a tracked organization, most cited first.
+
+        Args:
+            organization (str): Tracked organization name
+            profile (str): Loading profile for the returned papers
+            limit (int, optional): Return only the top `limit` papers
+
+        Returns:
+            list: Paper objects
+        """
+        query = (
             self.session.query(Paper)
-            .join(paper_author)
-            .join(Author)
-            .join(AuthorAffiliation)
-            .join(Affiliation)
-            .filter(Affiliation.name == organization)
+            .options(*self._loading_options(profile))
+            .filter(Paper.paper_id.in_(self._organization_paper_ids(organization)))
+            .order_by(func.coalesce(Paper.citation_count, 0).desc(), Paper.paper_id)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_organization_paper_counts(self, organization: str) -> list[tuple]:
+        """
+        Get distinct paper and citation counts of a tracked organization.
+
+        Returns:
+            list: (year, conference_name, paper_count, citation_count) tuples
+        """
+        return (
+            self.session.query(
+                Paper.year,
+                ConferenceInstance.conference_name,
+                func.count(Paper.paper_id),
+                func.coalesce(func.sum(Paper.citation_count), 0),
+            )
+            .join(ConferenceInstance)
+            .filter(Paper.paper_id.in_(self._organization_paper_ids(organization)))
+            .group_by(Paper.year, ConferenceInstance.conference_name)
+            .order_by(Paper.year, ConferenceInstance.conference_name)
             .all()
         )
 
-    def get_papers_by_keyword(self, keyword: str) -> list[Paper]:
+    def get_organization_top_authors(
+        self, organization: str, limit: int = 5
+    ) -> list[tuple]:
+        """
+        Get the most published authors of a tracked organization. Duplicate
+        author records are counted under their canonical author (see
+        analytics.author_disambiguation).
+
+        Returns:
+            list: (author_name, paper_count, citation_count) tuples
+        """
+        author_ids = self._organization_author_ids(organization)
+        canonical = aliased(Author)
+        canonical_id = func.coalesce(Author.canonical_author_id, Author.author_id)
+        papers = (
+            select(canonical_id.label("author_id"), Paper.paper_id, Paper.citation_count)
+            .select_from(paper_author)
+            .join(Author, Author.author_id == paper_author.c.author_id)
+            .join(Paper, Paper.paper_id == paper_author.c.paper_id)
+            .where(paper_author.c.author_id.in_(author_ids))
+            .distinct()
+            .subquery()
+        )
+        paper_count = func.count(papers.c.paper_id)
+        return (
+            self.session.query(
+                canonical.name,
+                paper_count,
+                func.coalesce(func.sum(papers.c.citation_count), 0),
+            )
+            .select_from(papers)
+            .join(canonical, canonical.author_id == papers.c.author_id)
+            .group_by(canonical.author_id, canonical.name)
+            .order_by(paper_count.desc(), canonical.name)
+            .limit(limit)
+            .all()
+        )
+
+    def get_influential_papers(
+        self,
+        conference: Optional[str] = None,
+        year: Optional[int] = None,
+        limit: int = 10,
+    ) -> list[tuple]:
+        """
+        Get the papers with the highest PageRank in the in-corpus citation graph.
+        Empty until analytics.citation_graph has been run.
+
+        Returns:
+            list: (Paper, in_corpus_citations, pagerank) tuples
+        """
+        query = (
+            self.session.query(
+                Paper,
+                PaperCitationMetric.in_corpus_citations,
+                PaperCitationMetric.pagerank,
+            )
+            .options(*self._loading_options("list"))
+            .join(PaperCitationMetric, PaperCitationMetric.paper_id == Paper.paper_id)
+        )
+        if conference is not None:
+            query = (
+                query.join(ConferenceInstance)
+                .join(Conference)
+                .filter(Conference.name == conference)
+            )
+        if year is not None:
+            query = query.filter(Paper.year == year)
+        return (
+            query.order_by(PaperCitationMetric.pagerank.desc(), Paper.paper_id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_related_by_citation(
+        self, paper_id: int, limit: int = 5, metric: str = "cocitation"
+    ) -> list[tuple]:
+        """
+        Get papers related to a paper through the citation graph.
+
+        Args:
+            paper_id (int): Paper to look up
+            limit (int): Number of related papers
+            metric (str): "cocitation" or "coupling", see CitationGraph.related
+
+        Returns:
+            list: (Paper, shared count) tuples, most related first; empty if
+            the citation graph has not been built
+        """
+        graph = load_citation_graph()
+        if graph is None:
+            return []
+        related = graph.related(paper_id, limit, metric)
+        if not related:
+            return []
+        papers = {
+            paper.paper_id: paper
+            for paper in self.session.query(Paper)
+            .options(*self._loading_options("list"))
+            .filter(Paper.paper_id.in_([related_id for related_id, _ in related]))
+        }
+        return [
+            (papers[related_id], score)
+            for related_id, score in related
+            if related_id in papers
+        ]
+
+    def get_papers_by_keyword(self, keyword: str, profile: str = "list") -> list[Paper]:
         """Get papers with a specific keyword."""
         return (
             self.session.query(Paper)
+            .options(*self._loading_options(profile))
             .join(PaperKeyword)
             .join(Keyword)
             .filter(Keyword.keyword == keyword)
             .all()
         )
 
+    def get_papers_page(
+        self,
+        conference: Optional[str] = None,
+        year: Optional[int] = None,
+        sort: str = "citations",
+        cursor: Optional[str] = None,
+        page_size: int = 50,
+        profile: str = "list",
+    ) -> dict:
+        """
+        Get one page of papers using keyset pagination.
+
+        Each page continues after the last (sort key, paper_id) of the previous
+        one, so fetching page 100 costs the same as fetching page 1.
+
+        Args:
+            conference (str): Conference name filter
+            year (int): Year filter
+            sort (str): "citations", "year" (both descending) or "title"
+            cursor (str): `next_cursor` of the previous page; None for the first page
+            page_size (int): Number of papers per page
+            profile (str): Loading profile for the returned papers
+
+        Returns:
+            dict: papers, next_cursor (None on the last page) and total_estimate
+        """
+        if sort not in PAGE_SORT_KEYS:
+            raise ValueError(
+                f"Unknown sort {sort}, expected one of {', '.join(PAGE_SORT_KEYS)}"
+            )
+        sort_key, descending = PAGE_SORT_KEYS[sort]
+
+        query = self.session.query(Paper, sort_key).options(
+            *self._loading_options(profile)
+        )
+        if conference is not None:
+            query = (
+                query.join(ConferenceInstance)
+                .join(Conference)
+                .filter(Conference.name == conference)
+            )
+        if year is not None:
+            query = query.filter(Paper.year == year)
+
+        if cursor is not None:
+            cursor_sort, last_key, last_id = decode_cursor(cursor)
+            if cursor_sort != sort:
+                raise ValueError(f"Cursor was created for sort {cursor_sort}, not {sort}")
+            position = tuple_(sort_key, Paper.paper_id)
+            query = query.filter(
+                position < tuple_(last_key, last_id)
+                if descending
+                else position > tuple_(last_key, last_id)
+            )
+
+        if descending:
+            query = query.order_by(sort_key.desc(), Paper.paper_id.desc())
+        else:
+            query = query.order_by(sort_key, Paper.paper_id)
+
+        # One extra row tells whether another page follows
+        rows = query.limit(page_size + 1).all()
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last_paper, last_key = rows[-1]
+            next_cursor = encode_cursor(sort, last_key, last_paper.paper_id)
+
+        return {
+            "papers": [paper for paper, _ in rows],
+            "next_cursor": next_cursor,
+            "total_estimate": self.estimate_paper_count(conference, year),
+        }
+
+    def estimate_paper_count(
+        self, conference: Optional[str] = None, year: Optional[int] = None
+    ) -> int:
+        """Paper count read from the mv_instance_paper_count summary view."""
+        query = self.session.query(
+            func.coalesce(func.sum(InstancePaperCount.c.paper_count), 0)
+        )
+        if conference is not None:
+            query = query.filter(InstancePaperCount.c.conference_name == conference)
+        if year is not None:
+            query = query.filter(InstancePaperCount.c.year == year)
+        return int(query.scalar())
+
     def get_paper_details(self, paper_id: int) -> dict[str, any]:
         """Get detailed information about a paper."""
-        paper = self.session.query(Paper).get(paper_id)
+        paper = self.session.get(
+            Paper, paper_id, options=self._loading_options("detail")
+        )
         if not paper:
             return None
 
@@ -129,3 +501,238 @@ class PaperRepository:
             "pdf_url": paper.pdf_url,
         }
 
+    def _apply_search_filters(self, stmt, filters: Optional[dict]):
+        """Restrict a paper_id query by year, conference, organization and keyword filters."""
+        if not filters:
+            return stmt
+
+        if filters.get("years"):
+            stmt = stmt.where(Paper.year.in_(filters["years"]))
+        if filters.get("conferences"):
+            stmt = stmt.where(
+                Paper.instance_id.in_(
+                    select(ConferenceInstance.instance_id).where(
+                        ConferenceInstance.conference_name.in_(filters["conferences"])
+                    )
+                )
+            )
+        if filters.get("organizations"):
+            stmt = stmt.where(
+                Paper.paper_id.in_(
+                    select(paper_author.c.paper_id)
+                    .join(
+                        AuthorAffiliation,
+                        AuthorAffiliation.author_id == paper_author.c.author_id,
+                    )
+                    .join(
+                        Affiliation,
+                        Affiliation.affiliation_id == AuthorAffiliation.affiliation_id,
+                    )
+                    .where(Affiliation.name.in_(filters["organizations"]))
+                )
+            )
+        if filters.get("keywords"):
+            stmt = stmt.where(
+                Paper.paper_id.in_(
+                    select(PaperKeyword.paper_id)
+                    .join(Keyword, Keyword.keyword_id == PaperKeyword.keyword_id)
+                    .where(Keyword.keyword.in_(filters["keywords"]))
+                )
+            )
+        return stmt
+
+    def _hybrid_hits(self, query: str, filters: Optional[dict]) -> Optional[list[tuple]]:
+        """
+        BM25 + dense ranking of the best HYBRID_CANDIDATES papers matching the
+        filters, fused by reciprocal rank; None when the paper index has not
+        been built or the query uses web-search operators.
+        """
+        if SEARCH_OPERATORS.search(query):
+            return None
+        memo_key = (query, json.dumps(filters or {}, sort_keys=True, default=str))
+        if memo_key in self._hybrid_memo:
+            return self._hybrid_memo[memo_key]
+        retriever = paper_retriever()
+        if retriever is None:
+            return None
+        if filters and any(filters.values()):
+            allowed = self.session.scalars(
+                self._apply_search_filters(select(Paper.paper_id), filters)
+            ).all()
+            hits = retriever.search(query, HYBRID_CANDIDATES, allowed)
+        else:
+            hits = retriever.search(query, HYBRID_CANDIDATES)
+            # Papers deleted since the index was last updated
+            existing = set(
+                self.session.scalars(
+                    select(Paper.paper_id).where(Paper.paper_id.in_([key for key, _ in hits]))
+                )
+            )
+            hits = [hit for hit in hits if hit[0] in existing]
+        self._hybrid_memo[memo_key] = hits
+        return hits
+
+    def search(
+        self,
+        query: str,
+        filters: Optional[dict] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> list[dict]:
+        """
+        Full-text search over paper titles, TL;DRs and abstracts.
+
+        With the hybrid paper index built (`python retrieval.py papers`), plain
+        queries are ranked by reciprocal-rank fusion of BM25 and embedding
+        similarity, which also matches model names, acronyms and Chinese text.
+        Queries using phrases, negation or OR, and all queries without the index,
+        are matched and ranked against the weighted `search_vector` column and its
+        GIN index. Snippets, authors and keywords are only computed for the
+        requested page, in the same statement.
+
+        Args:
+            query (str): Free text, or a web-search style query ("graph neural"
+                -survey); empty to list papers matching the filters by citations
+            filters (dict): Optional "years", "conferences", "organizations" and
+                "keywords" lists
+            limit (int): Page size
+            offset (int): Number of results to skip
+
+        Returns:
+            list: Result dicts ordered by rank, with "title_highlight" and "snippet"
+                as escaped HTML in which only the <mark> tags are markup
+        """
+        query = (query or "").strip()
+        hybrid = self._hybrid_hits(query, filters) if query else None
+        if hybrid is not None:
+            if not hybrid:
+                return []
+            # Only used to highlight matches
+            ts_query = func.websearch_to_tsquery("english", query)
+            fused = values(
+                column("paper_id", Integer), column("rank", Float), name="fused"
+            ).data(hybrid)
+            rank = fused.c.rank
+            hits = select(Paper.paper_id, rank.label("rank")).join(
+                fused, fused.c.paper_id == Paper.paper_id
+            )
+        elif query:
+            ts_query = func.websearch_to_tsquery("english", query)
+            # Normalization 32 maps the rank into [0, 1)
+            rank = func.ts_rank_cd(Paper.search_vector, ts_query, 32)
+            hits = select(Paper.paper_id, rank.label("rank")).where(
+                Paper.search_vector.op("@@")(ts_query)
+            )
+        else:
+            ts_query = None
+            rank = func.coalesce(Paper.citation_count, 0)
+            hits = select(Paper.paper_id, rank.label("rank"))
+
+        hits = (
+            self._apply_search_filters(hits, filters)
+            .order_by(rank.desc(), Paper.paper_id)
+            .limit(limit)
+            .offset(offset)
+            .subquery("hits")
+        )
+
+        authors = (
+            select(func.array_agg(Author.name))
+            .select_from(paper_author)
+            .join(Author, Author.author_id == paper_author.c.author_id)
+            .where(paper_author.c.paper_id == Paper.paper_id)
+            .scalar_subquery()
+        )
+        affiliations = (
+            select(func.array_agg(Affiliation.name.distinct()))
+            .select_from(paper_author)
+            .join(
+                AuthorAffiliation,
+                AuthorAffiliation.author_id == paper_author.c.author_id,
+            )
+            .join(
+                Affiliation,
+                Affiliation.affiliation_id == AuthorAffiliation.affiliation_id,
+            )
+            .where(paper_author.c.paper_id == Paper.paper_id)
+            .scalar_subquery()
+        )
+        keywords = (
+            select(func.array_agg(Keyword.keyword))
+            .select_from(PaperKeyword)
+            .join(Keyword, Keyword.keyword_id == PaperKeyword.keyword_id)
+            .where(PaperKeyword.paper_id == Paper.paper_id)
+            .scalar_subquery()
+        )
+
+        summary = func.coalesce(Paper.abstract, Paper.tldr, "")
+        if ts_query is not None:
+            title_highlight = func.ts_headline(
+                "english", Paper.title, ts_query, f"HighlightAll=true, {HIGHLIGHT_OPTIONS}"
+            )
+            snippet = func.ts_headline("english", summary, ts_query, HEADLINE_OPTIONS)
+        else:
+            title_highlight = Paper.title
+            snippet = func.left(summary, 300)
+
+        stmt = (
+            select(
+                Paper.paper_id,
+                Paper.title,
+                title_highlight.label("title_highlight"),
+                snippet.label("snippet"),
+                Paper.year,
+                Paper.citation_count,
+                Paper.abstract,
+                Paper.pdf_url,
+                ConferenceInstance.conference_name,
+                authors.label("authors"),
+                affiliations.label("affiliations"),
+                keywords.label("keywords"),
+                hits.c.rank,
+            )
+            .join(hits, hits.c.paper_id == Paper.paper_id)
+            .join(ConferenceInstance, ConferenceInstance.instance_id == Paper.instance_id)
+            .order_by(hits.c.rank.desc(), Paper.paper_id)
+        )
+
+        return [
+            {
+                "paper_id": row.paper_id,
+                "title": row.title,
+                "title_highlight": highlight_html(row.title_highlight),
+                "snippet": highlight_html(row.snippet),
+                "year": row.year,
+                "citations": row.citation_count or 0,
+                "abstract": row.abstract or "",
+                "pdf_url": row.pdf_url,
+                "conference": row.conference_name,
+                "authors": row.authors or [],
+                "affiliations": row.affiliations or [],
+                "keywords": row.keywords or [],
+                "rank": float(row.rank or 0),
+            }
+            for row in self.session.execute(stmt)
+        ]
+
+    def count_search_results(
+        self, query: str, filters: Optional[dict] = None
+    ) -> tuple[int, bool]:
+        """
+        Count the papers matching a full-text query and filters.
+
+        Returns:
+            tuple: (count, exact). Hybrid ranking keeps only the best
+                HYBRID_CANDIDATES papers, so a count that reaches it is a lower bound.
+        """
+        query = (query or "").strip()
+        hybrid = self._hybrid_hits(query, filters) if query else None
+        if hybrid is not None:
+            return len(hybrid), len(hybrid) < HYBRID_CANDIDATES
+        stmt = select(func.count(Paper.paper_id))
+        if query:
+            stmt = stmt.where(
+                Paper.search_vector.op("@@")(func.websearch_to_tsquery("english", query))
+            )
+        stmt = self._apply_search_filters(stmt, filters)
+        return self.session.execute(stmt).scalar() or 0, True
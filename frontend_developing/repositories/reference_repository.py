@@ -1,18 +1,52 @@
 from models import Reference
+from analytics.reference_loader import title_hash
 
 
 class ReferenceRepository:
     def __init__(self, session):
         self.session = session
 
-    def upsert(self, title: str, **kwargs) -> Reference:
-        reference = self.session.query(Reference).filter_by(title=title).first()
+    def get_by_title(self, title: str) -> Reference:
+        """
+        Find a reference by normalized title through the unique title_hash index.
+
+        References inserted before title_hash existed keep NULL until the
+        loader's backfill runs; those are found by exact title instead, and
+        hashed on the way so the next lookup uses the index.
+        """
+        digest = title_hash(title)
+        if digest is None:
+            return None
+        reference = self.session.query(Reference).filter_by(title_hash=digest).first()
+        if reference is None:
+            reference = (
+                self.session.query(Reference)
+                .filter(Reference.title == title, Reference.title_hash.is_(None))
+                .order_by(Reference.reference_id)
+                .first()
+            )
+            if reference is not None:
+                # No row has this hash yet, so the unique index allows it
+                reference.title_hash = digest
+                self.session.flush()
+        return reference
+
+    def upsert(self, title: str, commit: bool = True, **kwargs) -> Reference:
+        """
+        Insert or update a reference, matched by normalized title.
+        Pass commit=False to batch several upserts into one transaction;
+        for whole reference lists use analytics.reference_loader instead.
+        """
+        reference = self.get_by_title(title)
         if reference:
             for key, value in kwargs.items():
                 setattr(reference, key, value)
         else:
-            reference = Reference(title=title, **kwargs)
+            reference = Reference(title=title, title_hash=title_hash(title), **kwargs)
             self.session.add(reference)
 
-        self.session.commit()
+        if commit:
+            self.session.commit()
+        else:
+            self.session.flush()
         return reference
@@ -1,8 +1,65 @@
 from typing import Optional
-from sqlalchemy import text
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models import Session as SessionModel, Speaker
+from models import (
+    Affiliation,
+    ConferenceInstance,
+    Session as SessionModel,
+    SessionSpeaker,
+    Speaker,
+)
 from datetime import datetime, time
+from .stats_repository import make_stats_repository
+from cache import cached_query
+from instrumentation import async_repository_method
+
+# Tables read by the session catalog, for cache invalidation
+SESSION_CATALOG_TABLES = (
+    "conference_instance",
+    "session",
+    "session_speaker",
+    "speaker",
+    "affiliation",
+)
+
+
+def session_catalog_statement():
+    """
+    Select the session catalog as flat rows: sessions outer-joined with their
+    speakers and the speakers' affiliations, ordered by date, start time,
+    session and speaker. Callers add the instance filter.
+    """
+    return (
+        select(
+            SessionModel.session_id,
+            SessionModel.date,
+            SessionModel.start_time,
+            SessionModel.end_time,
+            SessionModel.title,
+            SessionModel.session_code,
+            SessionModel.topic,
+            SessionModel.venue,
+            SessionModel.room,
+            SessionModel.description,
+            SessionModel.technical_level,
+            SessionModel.points,
+            SessionModel.expert_view,
+            SessionModel.ai_analysis,
+            Speaker.name.label("speaker_name"),
+            Speaker.position.label("speaker_position"),
+            Affiliation.name.label("affiliation_name"),
+        )
+        .outerjoin(SessionSpeaker, SessionSpeaker.session_id == SessionModel.session_id)
+        .outerjoin(Speaker, Speaker.speaker_id == SessionSpeaker.speaker_id)
+        .outerjoin(Affiliation, Affiliation.affiliation_id == Speaker.affiliation_id)
+        .order_by(
+            SessionModel.date,
+            SessionModel.start_time,
+            SessionModel.session_id,
+            Speaker.speaker_id,
+        )
+    )
 
 
 class SessionRepository:
@@ -91,6 +148,25 @@ class SessionRepository:
         """
         return self.session.query(SessionModel).filter_by(instance_id=instance_id).all()
 
+    @cached_query(tables=SESSION_CATALOG_TABLES)
+    def get_session_catalog(self, instance_id: int) -> list:
+        """
+        Get the session catalog of a conference instance as flat rows.
+
+        One statement joins sessions with their speakers and the speakers'
+        affiliations. Sessions without speakers appear once with NULL speaker
+        columns; sessions with several speakers appear once per speaker.
+
+        Args:
+            instance_id (int): The conference instance ID
+
+        Returns:
+            list: Rows ordered by date, start time, session and speaker
+        """
+        return self.session.execute(
+            session_catalog_statement().where(SessionModel.instance_id == instance_id)
+        ).all()
+
     def get_sessions_by_date(self, instance_id: int, date: datetime.date) -> list:
         """
         Get sessions for a specific conference instance and date.
@@ -250,18 +326,57 @@ class SessionRepository:
             limit (int, optional): The maximum number of tracks to return
             
         Returns:
-            list: List of (track, count) tuples
+            list: List of (track, count) tuples, read from the statistics backend
         """
-        from sqlalchemy import func
-        
-        result = self.session.query(
-            SessionModel.topic, func.count(SessionModel.session_id).label('session_count')
-        ).filter_by(
-            instance_id=instance_id
-        ).group_by(
-            SessionModel.topic
-        ).order_by(
-            func.count(SessionModel.session_id).desc()
-        ).limit(limit).all()
-        
-        return result
+        return make_stats_repository(lambda: self.session).get_top_tracks_by_session_count(
+            instance_id, limit
+        )
+
+
+class AsyncSessionRepository:
+    """
+    Async versions of the SessionRepository read methods.
+
+    An AsyncSession runs one statement at a time; give each concurrently
+    awaited repository its own session (see utility.db_util.run_concurrently).
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.session = db_session
+
+    @cached_query(tables=SESSION_CATALOG_TABLES)
+    @async_repository_method
+    async def get_session_catalog(self, instance_id: int) -> list:
+        """Async SessionRepository.get_session_catalog."""
+        try:
+            result = await self.session.execute(
+                session_catalog_statement().where(SessionModel.instance_id == instance_id)
+            )
+            return result.all()
+        except Exception as e:
+            print(f"Error getting session catalog: {e}")
+            return []
+
+    @cached_query(tables=SESSION_CATALOG_TABLES)
+    @async_repository_method
+    async def get_session_catalog_by_conference(self, year: int, conference: str) -> list:
+        """
+        Session catalog of a conference instance given by year and name, so it
+        can run concurrently with the instance lookup itself.
+        """
+        try:
+            result = await self.session.execute(
+                session_catalog_statement()
+                .join(
+                    ConferenceInstance,
+                    ConferenceInstance.instance_id == SessionModel.instance_id,
+                )
+                .where(
+                    ConferenceInstance.year == year,
+                    ConferenceInstance.conference_name == conference,
+                )
+            )
+            return result.all()
+        except Exception as e:
+            print(f"Error getting session catalog: {e}")
+            return []
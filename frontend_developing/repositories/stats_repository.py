@@ -0,0 +1,212 @@
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from cache import cached_query
+from config import ANALYTICS_BACKEND, PARQUET_DIR
+from summary_views import SUMMARY_VIEWS
+
+
+class StatsRepository:
+    """
+    Dashboard statistics read from the summary views.
+
+    All queries are written once, against the mv_* view names, and return plain
+    tuples so that the Postgres and DuckDB backends are interchangeable.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def _fetch(self, sql: str, params: dict) -> list[tuple]:
+        return [tuple(row) for row in self.session.execute(text(sql), params)]
+
+    @cached_query(tables=("mv_instance_paper_count",))
+    def get_instance_paper_counts(
+        self, conference: Optional[str] = None, year: Optional[int] = None
+    ) -> list[tuple]:
+        """
+        Get paper counts per conference instance. Cached as plain tuples.
+
+        Returns:
+            list: (instance_id, conference_name, year, paper_count) tuples, newest first
+        """
+        conditions, params = [], {}
+        if conference is not None:
+            conditions.append("conference_name = :conference")
+            params["conference"] = conference
+        if year is not None:
+            conditions.append("year = :year")
+            params["year"] = year
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._fetch(
+            f"""
+            SELECT instance_id, conference_name, year, paper_count
+            FROM mv_instance_paper_count
+            {where}
+            ORDER BY year DESC, conference_name, instance_id
+            """,
+            params,
+        )
+
+    def get_conferences(self) -> list[str]:
+        """Get the names of all conferences with at least one instance."""
+        rows = self._fetch(
+            "SELECT DISTINCT conference_name FROM mv_instance_paper_count ORDER BY conference_name",
+            {},
+        )
+        return [row[0] for row in rows]
+
+    def get_years(self) -> list[int]:
+        """Get every conference instance year, newest first."""
+        rows = self._fetch(
+            "SELECT DISTINCT year FROM mv_instance_paper_count WHERE year IS NOT NULL ORDER BY year DESC",
+            {},
+        )
+        return [row[0] for row in rows]
+
+    def get_yearly_conference_stats(self, year: int) -> list[tuple]:
+        """Get (conference_name, paper_count) tuples for all conferences in a year."""
+        return self._fetch(
+            """
+            SELECT conference_name, CAST(SUM(paper_count) AS BIGINT)
+            FROM mv_instance_paper_count
+            WHERE year = :year
+            GROUP BY conference_name
+            ORDER BY conference_name
+            """,
+            {"year": year},
+        )
+
+    @cached_query(tables=("mv_instance_keyword_count",))
+    def get_top_keywords_for_instance(self, instance_id: int, limit: int = 10) -> list[str]:
+        """Get the most frequent keywords of a conference instance."""
+        rows = self._fetch(
+            """
+            SELECT keyword
+            FROM mv_instance_keyword_count
+            WHERE instance_id = :instance_id
+            ORDER BY paper_count DESC, keyword
+            LIMIT :limit
+            """,
+            {"instance_id": instance_id, "limit": limit},
+        )
+        return [row[0] for row in rows]
+
+    def get_top_tracks_by_session_count(self, instance_id: int, limit: int = 10) -> list[tuple]:
+        """Get (track, session_count) tuples for a conference instance."""
+        return self._fetch(
+            """
+            SELECT topic, session_count
+            FROM mv_instance_track_count
+            WHERE instance_id = :instance_id
+            ORDER BY session_count DESC, topic
+            LIMIT :limit
+            """,
+            {"instance_id": instance_id, "limit": limit},
+        )
+
+    def get_organization_conference_stats(
+        self, organization: str, year: Optional[int] = None
+    ) -> list[tuple]:
+        """Get (conference_name, paper_count) tuples for an organization."""
+        params = {"organization": organization}
+        year_filter = ""
+        if year is not None:
+            year_filter = "AND year = :year"
+            params["year"] = year
+        return self._fetch(
+            f"""
+            SELECT conference_name, CAST(SUM(paper_count) AS BIGINT)
+            FROM mv_org_conference_year_count
+            WHERE affiliation_name = :organization {year_filter}
+            GROUP BY conference_name
+            ORDER BY conference_name
+            """,
+            params,
+        )
+
+    def get_organizations(self) -> list[str]:
+        """Get every organization that has at least one paper."""
+        rows = self._fetch(
+            """
+            SELECT DISTINCT affiliation_name
+            FROM mv_org_conference_year_count
+            ORDER BY affiliation_name
+            """,
+            {},
+        )
+        return [row[0] for row in rows]
+
+
+class DuckDBStatsRepository(StatsRepository):
+    """
+    The same statistics, computed by DuckDB over the Parquet snapshot written
+    by analytics/parquet_export.py. Needs no database server.
+
+    The summary views are rebuilt in memory from their Postgres definitions
+    when a snapshot is first opened, and again whenever it is re-exported.
+    """
+
+    # (snapshot dir) -> (manifest mtime, connection); shared by all instances
+    _connections: dict = {}
+    _lock = threading.Lock()
+
+    def __init__(self, parquet_dir: Path = PARQUET_DIR):
+        mtime, conn = self._connect(Path(parquet_dir))
+        # A cursor is a thread-safe handle onto the shared in-memory database
+        self.conn = conn.cursor()
+        # Data versions come from Postgres; key cached results by snapshot instead
+        self.cache_versions = (mtime,)
+
+    @classmethod
+    def _connect(cls, parquet_dir: Path):
+        import duckdb
+
+        from analytics.parquet_export import MANIFEST_FILE
+
+        manifest = parquet_dir / MANIFEST_FILE
+        if not manifest.exists():
+            raise FileNotFoundError(
+                f"No Parquet snapshot in {parquet_dir}; run python -m analytics.parquet_export"
+            )
+        mtime = manifest.stat().st_mtime
+        with cls._lock:
+            cached = cls._connections.get(parquet_dir)
+            if cached and cached[0] == mtime:
+                return cached
+
+            conn = duckdb.connect()
+            for path in sorted(parquet_dir.glob("*.parquet")):
+                conn.execute(
+                    f"CREATE VIEW \"{path.stem}\" AS SELECT * FROM read_parquet('{path.as_posix()}')"
+                )
+            for name, (query, _) in SUMMARY_VIEWS.items():
+                conn.execute(f"CREATE TABLE {name} AS {query}")
+
+            # A replaced connection is released once its last cursor goes away
+            cls._connections[parquet_dir] = (mtime, conn)
+            return mtime, conn
+
+    def _fetch(self, sql: str, params: dict) -> list[tuple]:
+        # :name placeholders -> DuckDB's $name
+        sql = re.sub(r"(?<!:):(\w+)", r"$\1", sql)
+        return [tuple(row) for row in self.conn.execute(sql, params).fetchall()]
+
+
+def make_stats_repository(get_session: Callable) -> StatsRepository:
+    """
+    Statistics repository for the backend selected by ANALYTICS_BACKEND.
+
+    Args:
+        get_session: Returns the Postgres session; only called by the postgres
+            backend, so the DuckDB backend never opens a database connection
+    """
+    if ANALYTICS_BACKEND == "duckdb":
+        return DuckDBStatsRepository(PARQUET_DIR)
+    if ANALYTICS_BACKEND == "postgres":
+        return StatsRepository(get_session())
+    raise ValueError(f"Unknown ANALYTICS_BACKEND {ANALYTICS_BACKEND}")
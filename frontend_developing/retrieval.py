@@ -0,0 +1,677 @@
+"""
+Hybrid BM25 + dense retrieval over papers and paper chunks.
+
+Embeddings miss exact tokens such as model names, datasets and acronyms
+("LLaMA-2-7B", "ViT-B/16", "RLHF"), which BM25 matches directly. A query runs
+against a sparse BM25 index and, when a query embedder is configured, the
+vector store. The two rankings are combined with reciprocal-rank fusion:
+score(d) = sum over rankings of 1 / (RRF_K + rank of d). The fusion needs
+ranks only, so BM25 scores and cosine similarities never have to be
+calibrated against each other.
+
+Both languages use one tokenize(). Latin text is NFKC-normalized and
+lowercased. A compound token ("gpt-4o", "llama-2-7b") is kept whole and also
+split into its parts. Chinese runs become overlapping character bigrams. This
+needs no segmentation dictionary and applies to queries exactly as to
+documents.
+
+A BM25Index is a list of immutable segments. Each segment is a CSR
+document x term matrix of raw term counts. Document frequencies and lengths
+are kept for the live documents, and IDF and length normalization are
+applied at query time. So add() only writes a new segment, delete() only
+sets tombstones, and neither rescores existing documents. When there are
+more than MAX_SEGMENTS segments they are merged into one. On disk:
+
+- segment-N.npz   one segment, written once
+- docs-G.npz      vocabulary, document keys, lengths, versions and tombstones
+- manifest.json   generation G and the segments; replaced last
+
+Keys are ints (paper_id, chunk_index) or fixed-width int tuples
+((paper_id, chunk_id) for vector store chunks). Adding an existing key
+replaces its document. Each document may carry an int64 version, e.g. a
+fingerprint of its source text, so that updates can skip unchanged ones.
+
+Usage (from frontend_developing/):
+    python retrieval.py papers [--full]   # index new, edited and deleted papers
+    python retrieval.py chunks            # sync the chunk index with the vector store
+    python retrieval.py stats
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import unicodedata
+import weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Hashable, Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+
+from config import (
+    BM25_CHUNK_INDEX_DIR,
+    BM25_PAPER_INDEX_DIR,
+    EMBEDDING_MODEL,
+    HYBRID_CANDIDATES,
+    RRF_K,
+)
+
+MANIFEST_FILE = "manifest.json"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_SEGMENTS = 8
+ADD_BATCH = 4096
+DENSE_CHUNKS_PER_PAPER = 4  # chunk hits fetched per paper wanted when ranking papers
+
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN = re.compile(rf"[0-9a-z]+(?:[-+._/][0-9a-z]+)*\+*|[{_CJK}]+")
+_PART = re.compile(r"[0-9a-z]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or that the their "
+    "this to was we were which with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Index terms of a text, Chinese or English; used for documents and queries alike.
+
+    Returns:
+        list: Terms in order, with repeats
+    """
+    tokens = []
+    for token in _TOKEN.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if not token.isascii():
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i : i + 2] for i in range(len(token) - 1))
+        elif token.isalnum():
+            if token not in _STOPWORDS:
+                tokens.append(token)
+        else:
+            tokens.append(token)
+            tokens.extend(part for part in _PART.findall(token) if part not in _STOPWORDS)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Iterable[Hashable]], k: int = RRF_K) -> list[tuple]:
+    """
+    Fuse ranked key lists by reciprocal rank.
+
+    Args:
+        rankings: Key lists, best first
+        k (int): Rank offset; larger values flatten the head of each ranking
+
+    Returns:
+        list: (key, fused score) pairs, best first; ties keep first-seen order
+    """
+    scores: dict = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class BM25Index:
+    """Segmented BM25 index over keyed documents; in memory when `path` is None."""
+
+    def __init__(self, path: Optional[Path] = None, key_width: int = 1):
+        self.path = Path(path) if path is not None else None
+        manifest = self._read_manifest()
+        self.manifest = manifest or {"key_width": key_width, "generation": 0, "next_segment": 0, "segments": []}
+        self._obsolete: list[Path] = []
+        self._load()
+
+    def __len__(self) -> int:
+        return int(self.live.sum())
+
+    def __contains__(self, key) -> bool:
+        return key in self._positions
+
+    @property
+    def key_width(self) -> int:
+        return self.manifest["key_width"]
+
+    def keys(self) -> list:
+        """Keys of the live documents."""
+        return [self._keys[p] for p in np.flatnonzero(self.live)]
+
+    def versions_by_key(self) -> dict:
+        """Version of every live document, by key."""
+        return {key: int(self.versions[p]) for key, p in self._positions.items()}
+
+    def _key(self, row: np.ndarray):
+        return int(row[0]) if self.key_width == 1 else tuple(int(v) for v in row)
+
+    # ------------------------------------------------------------------ #
+    #                             Persistence                             #
+    # ------------------------------------------------------------------ #
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    def _read_manifest(self) -> Optional[dict]:
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        self._segments: list[dict] = []
+        if self.manifest["generation"]:
+            with np.load(self._file(f"docs-{self.manifest['generation']}.npz")) as f:
+                vocabulary = f["vocabulary"].tolist()
+                keys = f["keys"]
+                self.lengths = f["lengths"].astype(np.int32)
+                # Indexes written before versions existed count as outdated
+                self.versions = f["versions"] if "versions" in f.files else np.zeros(len(keys), dtype=np.int64)
+                self.live = f["live"]
+            for segment in self.manifest["segments"]:
+                matrix = sparse.load_npz(self._file(segment["file"])).tocsr()
+                self._segments.append({**segment, "matrix": matrix, "postings": matrix.tocsc()})
+        else:
+            vocabulary, keys = [], np.zeros((0, self.key_width), dtype=np.int64)
+            self.lengths = np.zeros(0, dtype=np.int32)
+            self.versions = np.zeros(0, dtype=np.int64)
+            self.live = np.zeros(0, dtype=bool)
+
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        self._keys = [self._key(row) for row in keys]
+        self._positions = {key: p for p, key in enumerate(self._keys) if self.live[p]}
+        self.df = np.zeros(len(self.vocabulary), dtype=np.int64)
+        for segment in self._segments:
+            self._count_terms(segment, self.live[segment["start"] : segment["start"] + segment["rows"]], 1)
+
+    def _count_terms(self, segment: dict, rows: np.ndarray, sign: int) -> None:
+        """Add (or subtract) the terms of a segment's selected rows to the document frequencies."""
+        matrix = segment["matrix"]
+        terms = matrix[np.flatnonzero(rows)].indices
+        counts = np.bincount(terms, minlength=matrix.shape[1])
+        self.df[: len(counts)] += sign * counts
+
+    def clear(self) -> None:
+        """Drop every document; the old segment files are removed on the next save()."""
+        if self.path is not None:
+            self._obsolete.extend(self._file(s["file"]) for s in self._segments)
+        self.manifest = {**self.manifest, "segments": []}
+        self._segments = []
+        self.vocabulary, self._keys, self._positions = {}, [], {}
+        self.lengths = np.zeros(0, dtype=np.int32)
+        self.versions = np.zeros(0, dtype=np.int64)
+        self.live = np.zeros(0, dtype=bool)
+        self.df = np.zeros(0, dtype=np.int64)
+
+    def save(self) -> None:
+        """Write new segments, then the document table, then the manifest."""
+        if self.path is None:
+            raise ValueError("In-memory BM25 index cannot be saved")
+        self.path.mkdir(parents=True, exist_ok=True)
+        for segment in self._segments:
+            if not (self.path / segment["file"]).exists():
+                tmp = self._file(segment["file"] + ".tmp.npz")
+                sparse.save_npz(tmp, segment["matrix"])
+                os.replace(tmp, self._file(segment["file"]))
+
+        previous = self.manifest["generation"]
+        generation = previous + 1
+        vocabulary = np.empty(len(self.vocabulary), dtype=object)
+        for term, i in self.vocabulary.items():
+            vocabulary[i] = term
+        keys = np.array(self._keys, dtype=np.int64).reshape(-1, self.key_width)
+        tmp = self._file(f"docs-{generation}.tmp.npz")
+        np.savez(
+            tmp,
+            vocabulary=vocabulary.astype(str),
+            keys=keys,
+            lengths=self.lengths,
+            versions=self.versions,
+            live=self.live,
+        )
+        os.replace(tmp, self._file(f"docs-{generation}.npz"))
+
+        self.manifest = {
+            **self.manifest,
+            "generation": generation,
+            "segments": [{k: s[k] for k in ("file", "start", "rows")} for s in self._segments],
+        }
+        tmp = self._file(MANIFEST_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self._file(MANIFEST_FILE))
+
+        if previous:
+            self._obsolete.append(self._file(f"docs-{previous}.npz"))
+        for path in self._obsolete:
+            path.unlink(missing_ok=True)
+        self._obsolete = []
+
+    # ------------------------------------------------------------------ #
+    #                               Writes                                #
+    # ------------------------------------------------------------------ #
+    def add(self, keys: Iterable, texts: Iterable[str], versions: Iterable[int] = None) -> int:
+        """
+        Index documents as one new segment, replacing any with the same keys.
+
+        Args:
+            keys: Document keys
+            texts: Document texts
+            versions: Optional int64 version per document; 0 when omitted
+
+        Returns:
+            int: Number of documents added
+        """
+        keys = list(keys)
+        versions = [0] * len(keys) if versions is None else list(versions)
+        # The last text of a repeated key wins
+        documents = dict(zip(keys, texts))
+        document_versions = dict(zip(keys, versions))
+        if not documents:
+            return 0
+        self.delete([key for key in documents if key in self._positions])
+
+        start = len(self._keys)
+        rows, terms, lengths = [], [], []
+        for i, text in enumerate(documents.values()):
+            ids = [self.vocabulary.setdefault(term, len(self.vocabulary)) for term in tokenize(text)]
+            rows.extend([i] * len(ids))
+            terms.extend(ids)
+            lengths.append(len(ids))
+        matrix = sparse.csr_matrix(
+            (np.ones(len(terms), dtype=np.int32), (rows, terms)),
+            shape=(len(documents), len(self.vocabulary)),
+        )
+        matrix.sum_duplicates()
+        segment = {
+            "file": f"segment-{self.manifest['next_segment']}.npz",
+            "start": start,
+            "rows": len(documents),
+            "matrix": matrix,
+            "postings": matrix.tocsc(),
+        }
+        self.manifest["next_segment"] += 1
+        self._segments.append(segment)
+
+        for p, key in enumerate(documents, start=start):
+            self._keys.append(key)
+            self._positions[key] = p
+        self.lengths = np.concatenate([self.lengths, np.array(lengths, dtype=np.int32)])
+        self.versions = np.concatenate(
+            [self.versions, np.array([document_versions[key] for key in documents], dtype=np.int64)]
+        )
+        self.live = np.concatenate([self.live, np.ones(len(documents), dtype=bool)])
+        self.df = np.concatenate([self.df, np.zeros(len(self.vocabulary) - len(self.df), dtype=np.int64)])
+        self._count_terms(segment, np.ones(len(documents), dtype=bool), 1)
+
+        if len(self._segments) > MAX_SEGMENTS:
+            self.merge()
+        return len(documents)
+
+    def delete(self, keys: Iterable) -> int:
+        """
+        Tombstone the documents with the given keys; unknown keys are ignored.
+
+        Returns:
+            int: Number of documents deleted
+        """
+        positions = np.array(
+            sorted({self._positions.pop(key) for key in keys if key in self._positions}), dtype=np.int64
+        )
+        if not len(positions):
+            return 0
+        for segment in self._segments:
+            inside = positions[(positions >= segment["start"]) & (positions < segment["start"] + segment["rows"])]
+            if len(inside):
+                rows = np.zeros(segment["rows"], dtype=bool)
+                rows[inside - segment["start"]] = True
+                self._count_terms(segment, rows, -1)
+        self.live[positions] = False
+        return len(positions)
+
+    def merge(self) -> None:
+        """Merge all segments into one and drop the postings of deleted documents."""
+        if len(self._segments) < 2:
+            return
+        width = len(self.vocabulary)
+        blocks = []
+        for segment in self._segments:
+            matrix = segment["matrix"].copy()
+            matrix.resize((segment["rows"], width))
+            blocks.append(matrix)
+        keep = sparse.diags(self.live.astype(np.int32), dtype=np.int32)
+        matrix = (keep @ sparse.vstack(blocks, format="csr")).tocsr()
+        matrix.eliminate_zeros()
+        if self.path is not None:
+            self._obsolete.extend(self._file(s["file"]) for s in self._segments)
+        self._segments = [{
+            "file": f"segment-{self.manifest['next_segment']}.npz",
+            "start": 0,
+            "rows": len(self._keys),
+            "matrix": matrix,
+            "postings": matrix.tocsc(),
+        }]
+        self.manifest["next_segment"] += 1
+
+    # ------------------------------------------------------------------ #
+    #                                Reads                                #
+    # ------------------------------------------------------------------ #
+    def search(self, query: str, k: int = 10, keys: Iterable = None) -> list[tuple]:
+        """
+        Top k documents by BM25.
+
+        Args:
+            query (str): Free text, tokenized like the documents
+            k (int): Number of results
+            keys: Only rank documents with these keys
+
+        Returns:
+            list: (key, score) pairs, best first
+        """
+        terms = np.unique([self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary])
+        total = len(self)
+        if not len(terms) or not total or k <= 0:
+            return []
+        df = self.df[terms]
+        idf = np.log1p((total - df + 0.5) / (df + 0.5))
+        average_length = max(float(self.lengths[self.live].mean()), 1.0)
+
+        documents, weights = [], []
+        for segment in self._segments:
+            postings = segment["postings"]
+            for term, term_idf in zip(terms, idf):
+                if term >= postings.shape[1]:
+                    continue
+                span = slice(postings.indptr[term], postings.indptr[term + 1])
+                docs = postings.indices[span] + segment["start"]
+                tf = postings.data[span].astype(np.float64)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[docs] / average_length)
+                documents.append(docs)
+                weights.append(term_idf * tf * (BM25_K1 + 1) / (tf + norm))
+        if not documents:
+            return []
+        documents, inverse = np.unique(np.concatenate(documents), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+
+        mask = self.live[documents]
+        if keys is not None:
+            allowed = np.fromiter(
+                (self._positions[key] for key in keys if key in self._positions), dtype=np.int64
+            )
+            mask &= np.isin(documents, allowed)
+        documents, scores = documents[mask], scores[mask]
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            documents, scores = documents[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(self._keys[p], float(s)) for p, s in zip(documents[order], scores[order])]
+
+
+class HybridRetriever:
+    """
+    Reciprocal-rank fusion of a BM25 index and an optional dense ranker.
+
+    `dense(query, n, keys)` returns up to n keys of the same kind as the BM25
+    index, best first, restricted to `keys` unless it is None.
+    """
+
+    def __init__(
+        self,
+        sparse_index: BM25Index,
+        dense: Optional[Callable[[str, int, Optional[list]], list]] = None,
+        rrf_k: int = RRF_K,
+        candidates: int = HYBRID_CANDIDATES,
+    ):
+        self.sparse = sparse_index
+        self.dense = dense
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+
+    def search(self, query: str, k: int = 10, keys: Iterable = None) -> list[tuple]:
+        """
+        Args:
+            query (str): Free text
+            k (int): Number of results
+            keys: Only return these keys
+
+        Returns:
+            list: (key, fused score) pairs, best first
+        """
+        keys = None if keys is None else list(keys)
+        rankings = [[key for key, _ in self.sparse.search(query, self.candidates, keys)]]
+        if self.dense is not None:
+            try:
+                rankings.append(self.dense(query, self.candidates, keys))
+            except Exception as e:
+                print(f"Error in dense retrieval, using BM25 only: {e}")
+        return reciprocal_rank_fusion(rankings, self.rrf_k)[:k]
+
+
+# ---------------------------------------------------------------------- #
+#                  Shared indexes for papers and chunks                   #
+# ---------------------------------------------------------------------- #
+# path -> (manifest mtime, index); reloaded when a writer publishes a new manifest
+_opened: dict[Path, tuple[float, BM25Index]] = {}
+_opened_lock = threading.Lock()
+
+
+def open_bm25_index(path: Path, key_width: int = 1) -> BM25Index:
+    """Return the process-wide read view of an index, reloaded after writes."""
+    path = Path(path)
+    try:
+        mtime = os.path.getmtime(path / MANIFEST_FILE)
+    except OSError:
+        mtime = 0.0
+    with _opened_lock:
+        cached = _opened.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, BM25Index(path, key_width))
+            _opened[path] = cached
+        return cached[1]
+
+
+@lru_cache(maxsize=1)
+def load_query_embedder() -> Optional[Callable[[str], np.ndarray]]:
+    """
+    Query embedding function for EMBEDDING_MODEL, or None when no model is
+    configured or sentence-transformers is not installed.
+    """
+    if not EMBEDDING_MODEL:
+        return None
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(EMBEDDING_MODEL)
+    except Exception as e:
+        print(f"Error loading query embedder {EMBEDDING_MODEL}: {e}")
+        return None
+    return lambda text: model.encode(text, normalize_embeddings=True)
+
+
+def _dense_papers(query: str, n: int, keys: Optional[list]) -> list[int]:
+    """Papers ranked by their best chunk in the vector store."""
+    from vector_store import open_vector_store
+
+    embed = load_query_embedder()
+    store = open_vector_store()
+    if embed is None or not len(store):
+        return []
+    hits = store.search(embed(query), k=n * DENSE_CHUNKS_PER_PAPER, paper_ids=keys, with_text=False)
+    return list(dict.fromkeys(hit["paper_id"] for hit in hits))[:n]
+
+
+def paper_retriever() -> Optional[HybridRetriever]:
+    """Hybrid retriever over paper ids, or None if the paper index has not been built."""
+    index = open_bm25_index(BM25_PAPER_INDEX_DIR)
+    if not len(index):
+        return None
+    return HybridRetriever(index, _dense_papers if load_query_embedder() else None)
+
+
+# store -> (rows, sorted chunk codes, their rows); rebuilt when the store grows
+_chunk_codes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _chunk_code(paper_ids, chunk_ids) -> np.ndarray:
+    return (np.asarray(paper_ids, dtype=np.int64) << 32) | np.asarray(chunk_ids, dtype=np.int64)
+
+
+def _chunk_rows(store, keys: list[tuple]) -> np.ndarray:
+    """Live vector store rows of (paper_id, chunk_id) keys, -1 where there is none."""
+    cached = _chunk_codes.get(store)
+    if cached is None or cached[0] != store.rows:
+        codes = _chunk_code(store.metadata["paper_id"], store.metadata["chunk_id"])
+        codes[~store.live] = -1
+        order = np.argsort(codes, kind="stable")
+        cached = (store.rows, codes[order], order)
+        _chunk_codes[store] = cached
+    _, codes, order = cached
+    if not keys or not len(codes):
+        return np.full(len(keys), -1, dtype=np.int64)
+    wanted = _chunk_code(*zip(*keys))
+    positions = np.minimum(np.searchsorted(codes, wanted), len(codes) - 1)
+    return np.where(codes[positions] == wanted, order[positions], -1)
+
+
+def search_chunks(
+    query: str,
+    k: int = 10,
+    paper_ids: Iterable[int] = None,
+    chunk_types: Iterable[str] = None,
+    instance_ids: Iterable[int] = None,
+    years: Iterable[int] = None,
+    with_text: bool = True,
+) -> list[dict]:
+    """
+    Hybrid search over the vector store's chunks, with its metadata filters.
+
+    Returns:
+        list: Result dicts as from VectorStore.search, with the fused "score"
+    """
+    from vector_store import open_vector_store
+
+    store = open_vector_store()
+    index = open_bm25_index(BM25_CHUNK_INDEX_DIR, key_width=2)
+    filters = (paper_ids, chunk_types, instance_ids, years)
+    keys = None
+    if any(f is not None for f in filters):
+        rows = np.flatnonzero(store.filter_mask(*filters))
+        keys = list(zip(store.metadata["paper_id"][rows].tolist(), store.metadata["chunk_id"][rows].tolist()))
+    embed = load_query_embedder()
+
+    def dense(text: str, n: int, _keys: Optional[list]) -> list[tuple]:
+        hits = store.search(embed(text), n, *filters, with_text=False)
+        return [(hit["paper_id"], hit["chunk_id"]) for hit in hits]
+
+    fused = HybridRetriever(index, dense if embed is not None else None).search(query, k, keys)
+    rows = _chunk_rows(store, [key for key, _ in fused])
+    scores = np.array([score for _, score in fused])
+    found = rows >= 0
+    return store.get(rows[found], scores[found], with_text)
+
+
+# ---------------------------------------------------------------------- #
+#                               Index jobs                                #
+# ---------------------------------------------------------------------- #
+def update_paper_index(session, index: BM25Index, full: bool = False) -> tuple[int, int]:
+    """
+    Bring the paper index in line with the paper table: index titles (weighted
+    twice), TL;DRs and abstracts of new papers and of papers whose text
+    changed, and delete papers that no longer exist. Changes are detected by
+    an MD5 fingerprint of the indexed columns, computed by the database and
+    stored as each document's version. `full` rebuilds the index from scratch.
+
+    Returns:
+        tuple: (indexed, deleted) counts
+    """
+    from sqlalchemy import func, select
+
+    from models import Paper
+
+    if full:
+        index.clear()
+    fingerprint = func.md5(
+        func.concat_ws("\x1f", Paper.title, Paper.tldr, Paper.abstract)
+    )
+    # The first 60 bits of the digest fit an int64 version
+    current = {
+        paper_id: int(digest[:15], 16)
+        for paper_id, digest in session.execute(select(Paper.paper_id, fingerprint))
+    }
+    indexed = index.versions_by_key()
+    deleted = index.delete([key for key in indexed if key not in current])
+    changed = sorted(key for key, version in current.items() if indexed.get(key) != version)
+
+    added = 0
+    for start in range(0, len(changed), ADD_BATCH):
+        rows = session.execute(
+            select(Paper.paper_id, Paper.title, Paper.tldr, Paper.abstract)
+            .where(Paper.paper_id.in_(changed[start : start + ADD_BATCH]))
+            .order_by(Paper.paper_id)
+        ).all()
+        added += index.add(
+            [row.paper_id for row in rows],
+            [" ".join(filter(None, (row.title, row.title, row.tldr, row.abstract))) for row in rows],
+            [current[row.paper_id] for row in rows],
+        )
+    return added, deleted
+
+
+def sync_chunk_index(index: BM25Index, store) -> tuple[int, int]:
+    """
+    Bring a chunk index in line with the vector store: index live chunks it
+    lacks and delete chunks the store no longer has.
+
+    Returns:
+        tuple: (added, deleted) counts
+    """
+    rows = np.flatnonzero(store.live)
+    keys = list(zip(store.metadata["paper_id"][rows].tolist(), store.metadata["chunk_id"][rows].tolist()))
+    deleted = index.delete(set(index.keys()).difference(keys))
+    missing = np.array([row for row, key in zip(rows, keys) if key not in index], dtype=np.int64)
+    added = 0
+    for start in range(0, len(missing), ADD_BATCH):
+        batch = missing[start : start + ADD_BATCH]
+        added += index.add(
+            zip(store.metadata["paper_id"][batch].tolist(), store.metadata["chunk_id"][batch].tolist()),
+            store.get_texts(batch),
+        )
+    return added, deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and update the BM25 indexes for hybrid retrieval.")
+    parser.add_argument("command", choices=["papers", "chunks", "stats"])
+    parser.add_argument("--full", action="store_true", help="Reindex every paper (papers only)")
+    args = parser.parse_args()
+
+    papers = BM25Index(BM25_PAPER_INDEX_DIR)
+    chunks = BM25Index(BM25_CHUNK_INDEX_DIR, key_width=2)
+    if args.command == "papers":
+        from db_manager import DBManager
+
+        db = DBManager()
+        session = db.get_session()
+        try:
+            added, deleted = update_paper_index(session, papers, args.full)
+            print(f"Indexed {added} papers, deleted {deleted}")
+            papers.save()
+        finally:
+            db.close()
+    elif args.command == "chunks":
+        from vector_store import VectorStore
+
+        added, deleted = sync_chunk_index(chunks, VectorStore())
+        chunks.save()
+        print(f"Indexed {added} chunks, deleted {deleted}")
+    for name, index in (("papers", papers), ("chunks", chunks)):
+        print(f"{name}: {len(index)} documents, {len(index.vocabulary)} terms, {len(index._segments)} segments")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Materialized summary views for dashboard statistics.
+
+The dashboard statistics are group-by joins over the paper, keyword and session
+tables. They are precomputed here as PostgreSQL materialized views and read by
+the repositories through the Table objects below.
+
+Each view has a unique index, so it can be refreshed with
+REFRESH MATERIALIZED VIEW CONCURRENTLY while the dashboard keeps reading it.
+
+Usage (from frontend_developing/):
+    python summary_views.py create
+    python summary_views.py refresh [--blocking] [view ...]
+"""
+
+import argparse
+from sqlalchemy import Column, Integer, MetaData, String, Table, text
+
+from data_version import bump_versions
+
+# Kept out of Base.metadata so that create_all/drop_all never treat views as tables
+views_metadata = MetaData()
+
+InstancePaperCount = Table(
+    "mv_instance_paper_count",
+    views_metadata,
+    Column("instance_id", Integer, primary_key=True),
+    Column("conference_id", Integer),
+    Column("conference_name", String(255)),
+    Column("year", Integer),
+    Column("paper_count", Integer),
+)
+
+InstanceKeywordCount = Table(
+    "mv_instance_keyword_count",
+    views_metadata,
+    Column("instance_id", Integer, primary_key=True),
+    Column("keyword_id", Integer, primary_key=True),
+    Column("keyword", String(255)),
+    Column("paper_count", Integer),
+)
+
+InstanceTrackCount = Table(
+    "mv_instance_track_count",
+    views_metadata,
+    Column("instance_id", Integer, primary_key=True),
+    Column("topic", String(255), primary_key=True),
+    Column("session_count", Integer),
+)
+
+OrganizationConferenceYearCount = Table(
+    "mv_org_conference_year_count",
+    views_metadata,
+    Column("affiliation_id", Integer, primary_key=True),
+    Column("affiliation_name", String(255)),
+    Column("conference_id", Integer, primary_key=True),
+    Column("conference_name", String(255)),
+    Column("year", Integer, primary_key=True),
+    Column("paper_count", Integer),
+)
+
+# view name -> (defining query, index statements); the first index must be unique
+SUMMARY_VIEWS = {
+    "mv_instance_paper_count": (
+        """
+        SELECT ci.instance_id, ci.conference_id, c.name AS conference_name, ci.year,
+               COUNT(p.paper_id) AS paper_count
+        FROM conference_instance ci
+        JOIN conference c ON c.conference_id = ci.conference_id
+        LEFT JOIN paper p ON p.instance_id = ci.instance_id
+        GROUP BY ci.instance_id, ci.conference_id, c.name, ci.year
+        """,
+        [
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_instance_paper_count "
+            "ON mv_instance_paper_count (instance_id)",
+            "CREATE INDEX IF NOT EXISTS idx_mv_instance_paper_count_conf_year "
+            "ON mv_instance_paper_count (conference_name, year)",
+        ],
+    ),
+    "mv_instance_keyword_count": (
+        """
+        SELECT p.instance_id, k.keyword_id, k.keyword, COUNT(*) AS paper_count
+        FROM paper_keyword pk
+        JOIN paper p ON p.paper_id = pk.paper_id
+        JOIN keyword k ON k.keyword_id = pk.keyword_id
+        GROUP BY p.instance_id, k.keyword_id, k.keyword
+        """,
+        [
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_instance_keyword_count "
+            "ON mv_instance_keyword_count (instance_id, keyword_id)",
+            "CREATE INDEX IF NOT EXISTS idx_mv_instance_keyword_count_rank "
+            "ON mv_instance_keyword_count (instance_id, paper_count DESC)",
+        ],
+    ),
+    "mv_instance_track_count": (
+        """
+        SELECT s.instance_id, s.topic, COUNT(*) AS session_count
+        FROM session s
+        GROUP BY s.instance_id, s.topic
+        """,
+        [
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_instance_track_count "
+            "ON mv_instance_track_count (instance_id, topic)",
+        ],
+    ),
+    "mv_org_conference_year_count": (
+        """
+        SELECT a.affiliation_id, a.name AS affiliation_name,
+               ci.conference_id, c.name AS conference_name, p.year,
+               COUNT(DISTINCT p.paper_id) AS paper_count
+        FROM affiliation a
+        JOIN author_affiliation aa ON aa.affiliation_id = a.affiliation_id
+        JOIN paper_author pa ON pa.author_id = aa.author_id
+        JOIN paper p ON p.paper_id = pa.paper_id
+        JOIN conference_instance ci ON ci.instance_id = p.instance_id
+        JOIN conference c ON c.conference_id = ci.conference_id
+        GROUP BY a.affiliation_id, a.name, ci.conference_id, c.name, p.year
+        """,
+        [
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_org_conference_year_count "
+            "ON mv_org_conference_year_count (affiliation_id, conference_id, year)",
+            "CREATE INDEX IF NOT EXISTS idx_mv_org_conference_year_count_name "
+            "ON mv_org_conference_year_count (affiliation_name)",
+        ],
+    ),
+}
+
+
+def create_summary_views(engine):
+    """Create (and populate) every summary view that does not exist yet."""
+    with engine.begin() as conn:
+        for name, (query, indexes) in SUMMARY_VIEWS.items():
+            conn.execute(
+                text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {query} WITH DATA")
+            )
+            for statement in indexes:
+                conn.execute(text(statement))
+
+
+def drop_summary_views(engine):
+    """Drop every summary view. Must run before the underlying tables are dropped."""
+    with engine.begin() as conn:
+        for name in SUMMARY_VIEWS:
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {name}"))
+
+
+def refresh_summary_views(engine, views: list = None, concurrently: bool = True):
+    """
+    Refresh summary views.
+
+    Args:
+        engine: SQLAlchemy engine
+        views (list): View names to refresh; defaults to all of them
+        concurrently (bool): Refresh without locking out readers. Slower, and
+            requires the view to have been populated before.
+    """
+    views = views or list(SUMMARY_VIEWS)
+    unknown = set(views) - set(SUMMARY_VIEWS)
+    if unknown:
+        raise ValueError(f"Unknown summary views: {', '.join(sorted(unknown))}")
+
+    option = "CONCURRENTLY " if concurrently else ""
+    # Each refresh commits on its own so a long refresh does not hold the others
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name in views:
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW {option}{name}"))
+            bump_versions(conn, [name])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage dashboard summary views.")
+    parser.add_argument("command", choices=["create", "refresh", "drop"])
+    parser.add_argument("views", nargs="*", help="View names (refresh only)")
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Refresh without CONCURRENTLY (faster, but blocks readers)",
+    )
+    args = parser.parse_args()
+
+    from db_manager import DBManager
+
+    db = DBManager()
+    if args.command == "create":
+        create_summary_views(db.engine)
+    elif args.command == "refresh":
+        refresh_summary_views(db.engine, args.views, concurrently=not args.blocking)
+    else:
+        drop_summary_views(db.engine)
+
+
+if __name__ == "__main__":
+    main()
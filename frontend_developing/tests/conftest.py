@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules are imported as top-level modules from frontend_developing/,
+# the page utilities from demo_light/
+ROOT = Path(__file__).parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "demo_light")]
+
+import cache
+import data_version
+
+
+@pytest.fixture(autouse=True)
+def offline_cache(monkeypatch):
+    """A fresh in-memory query cache, without the Postgres data version listener."""
+    monkeypatch.setattr(cache, "_cache", cache.make_cache("memory"))
+    monkeypatch.setattr(data_version, "_listener", object())
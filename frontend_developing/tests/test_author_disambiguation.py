@@ -0,0 +1,46 @@
+import numpy as np
+from scipy import sparse
+
+from analytics.author_disambiguation import AuthorFeatures, disambiguate
+
+
+def make_features(names: list[str], coauthored: list[tuple[int, int]] = ()) -> AuthorFeatures:
+    """
+    The given authors, all at one affiliation and all writing with the same
+    three coauthors (appended after them), which is enough evidence to merge
+    any two of them whose names are compatible.
+    """
+    n = len(names) + 3
+    coauthors = sparse.lil_matrix((n, n), dtype=np.float32)
+    for i in range(len(names)):
+        for j in range(len(names), n):
+            coauthors[i, j] = coauthors[j, i] = 1
+    for i, j in coauthored:
+        coauthors[i, j] = coauthors[j, i] = 1
+    return AuthorFeatures(
+        author_ids=np.arange(1, n + 1),
+        names=names + ["Alice Lee", "Bob Wu", "Carol Xu"],
+        coauthors=coauthors.tocsr(),
+        affiliations=sparse.csr_matrix(np.ones((n, 1), dtype=np.float32)),
+        keywords=sparse.csr_matrix((n, 1), dtype=np.float32),
+        paper_counts=np.array([3, 1, 2] + [1] * (n - 3)),
+    )
+
+
+def test_initial_does_not_bridge_incompatible_names():
+    canonical = disambiguate(make_features(["John Smith", "J. Smith", "James Smith"]), workers=1)
+    assert canonical[0] != canonical[2]
+    # "J. Smith" joins exactly one of them
+    assert canonical[1] in (canonical[0], canonical[2])
+
+
+def test_coauthors_are_never_merged():
+    features = make_features(["John Smith", "J. Smith", "John Smith"], coauthored=[(0, 2)])
+    canonical = disambiguate(features, workers=1)
+    assert canonical[0] != canonical[2]
+
+
+def test_compatible_names_merge_into_most_published():
+    canonical = disambiguate(make_features(["John Smith", "J. Smith", "John Smith"]), workers=1)
+    assert canonical[:3].tolist() == [0, 0, 0]
+    assert canonical[3:].tolist() == [3, 4, 5]
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Reference
+from repositories.reference_repository import ReferenceRepository
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Reference.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_unhashed_reference_is_found_and_hashed(session):
+    # Inserted before migration 0003, not yet backfilled
+    session.add(Reference(reference_id=1, title="Attention Is All You Need"))
+    session.commit()
+
+    reference = ReferenceRepository(session).get_by_title("Attention Is All You Need")
+    assert reference.reference_id == 1
+    assert reference.title_hash is not None
+
+
+def test_upsert_updates_unhashed_reference(session):
+    session.add(Reference(reference_id=1, title="Attention Is All You Need"))
+    session.commit()
+
+    ReferenceRepository(session).upsert("Attention Is All You Need", year=2017)
+    assert session.query(Reference).count() == 1
+    assert session.query(Reference).one().year == 2017
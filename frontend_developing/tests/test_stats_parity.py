@@ -0,0 +1,113 @@
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import repositories.stats_repository as stats_repository
+from analytics.parquet_export import MANIFEST_FILE, check_parity
+from repositories.stats_repository import DuckDBStatsRepository, StatsRepository
+from summary_views import SUMMARY_VIEWS
+
+# The columns of each table that the summary views read
+TABLES = {
+    "conference": ("conference_id", "name"),
+    "conference_instance": ("instance_id", "conference_id", "year"),
+    "paper": ("paper_id", "instance_id", "year"),
+    "keyword": ("keyword_id", "keyword"),
+    "paper_keyword": ("paper_id", "keyword_id"),
+    "session": ("session_id", "instance_id", "topic"),
+    "affiliation": ("affiliation_id", "name"),
+    "author_affiliation": ("author_id", "affiliation_id"),
+    "paper_author": ("paper_id", "author_id"),
+}
+
+ROWS = {
+    "conference": [(1, "CVPR"), (2, "NeurIPS")],
+    "conference_instance": [(1, 1, 2023), (2, 1, 2024), (3, 2, 2024), (4, 2, None)],
+    "paper": [(1, 1, 2023), (2, 2, 2024), (3, 2, 2024), (4, 3, 2024), (5, 3, 2024)],
+    "keyword": [(1, "diffusion"), (2, "agents"), (3, "3d")],
+    "paper_keyword": [(1, 1), (2, 1), (2, 2), (3, 1), (4, 2), (5, 3)],
+    "session": [(1, 2, "Vision"), (2, 2, "Vision"), (3, 2, "Robotics"), (4, 3, "Agents")],
+    "affiliation": [(1, "Tsinghua University"), (2, "Google")],
+    "author_affiliation": [(1, 1), (2, 2), (3, 1)],
+    "paper_author": [(1, 1), (2, 1), (2, 2), (3, 3), (4, 2), (5, 3)],
+}
+
+
+@pytest.fixture
+def sql_session():
+    """The fixture rows in SQLite, with the summary views materialized as tables."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for table, columns in TABLES.items():
+            conn.execute(text(f"CREATE TABLE {table} ({', '.join(columns)})"))
+            placeholders = ", ".join(f":{c}" for c in columns)
+            conn.execute(
+                text(f"INSERT INTO {table} VALUES ({placeholders})"),
+                [dict(zip(columns, row)) for row in ROWS[table]],
+            )
+        for name, (query, _) in SUMMARY_VIEWS.items():
+            conn.execute(text(f"CREATE TABLE {name} AS {query}"))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def parquet_dir(tmp_path):
+    """The same rows as a Parquet snapshot."""
+    for table, columns in TABLES.items():
+        data = {c: [row[i] for row in ROWS[table]] for i, c in enumerate(columns)}
+        pq.write_table(pa.table(data), tmp_path / f"{table}.parquet")
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps({"tables": {}}))
+    return tmp_path
+
+
+def test_backends_agree(sql_session, parquet_dir):
+    assert check_parity(sql_session, parquet_dir) == []
+
+
+def test_statistics(sql_session, parquet_dir):
+    for stats in (StatsRepository(sql_session), DuckDBStatsRepository(parquet_dir)):
+        assert stats.get_conferences() == ["CVPR", "NeurIPS"]
+        assert stats.get_years() == [2024, 2023]
+        assert stats.get_instance_paper_counts("CVPR", 2024) == [(2, "CVPR", 2024, 2)]
+        assert stats.get_yearly_conference_stats(2024) == [("CVPR", 2), ("NeurIPS", 2)]
+        assert stats.get_top_keywords_for_instance(2) == ["diffusion", "agents"]
+        assert stats.get_top_tracks_by_session_count(2) == [("Vision", 2), ("Robotics", 1)]
+        assert stats.get_organization_conference_stats("Tsinghua University") == [
+            ("CVPR", 3),
+            ("NeurIPS", 1),
+        ]
+        assert stats.get_organization_conference_stats("Google", 2023) == []
+
+
+def test_duckdb_backend_opens_no_session(monkeypatch, parquet_dir):
+    monkeypatch.setattr(stats_repository, "ANALYTICS_BACKEND", "duckdb")
+    monkeypatch.setattr(stats_repository, "PARQUET_DIR", parquet_dir)
+
+    def get_session():
+        raise AssertionError("DuckDB backend opened a Postgres session")
+
+    stats = stats_repository.make_stats_repository(get_session)
+    assert stats.get_years() == [2024, 2023]
+
+
+def test_data_manager_context_duckdb_mode(monkeypatch, parquet_dir):
+    from utility import db_util
+
+    monkeypatch.setattr(stats_repository, "ANALYTICS_BACKEND", "duckdb")
+    monkeypatch.setattr(stats_repository, "PARQUET_DIR", parquet_dir)
+
+    def no_database():
+        raise AssertionError("DuckDB mode created a DBManager")
+
+    monkeypatch.setattr(db_util, "DBManager", no_database)
+    with db_util.DataManagerContext() as managers:
+        assert managers["stats"].get_conferences() == ["CVPR", "NeurIPS"]
+        df = db_util.conference_stat_df(managers["stats"].get_instance_paper_counts("CVPR"))
+    assert df["Year"].tolist() == [2023, 2024]
+    assert df["Keywords"].tolist() == ["diffusion", "diffusion, agents"]
@@ -0,0 +1,518 @@
+"""
+Embedded store for paper chunk embeddings.
+
+Replaces the Milvus `paper_collection` (paper_id, chunk_id, chunk_text,
+768-d embedding, chunk_type) with files under VECTOR_STORE_DIR, so no vector
+database service is needed:
+
+- vectors-G.bin   rows x dim matrix in VECTOR_DTYPE, L2-normalized and
+                  memory-mapped, so only the rows a search touches are read
+- chunks-G-*.parquet one file per added batch: paper_id, chunk_id,
+                  chunk_type, instance_id, year and chunk_text, in small row
+                  groups so a result's text is read without loading the
+                  whole column
+- lists-G.bin     IVF list of every row (int32, -1 before training)
+- deleted-G.npy   tombstones; compact() drops the rows for good
+- centroids.npy   IVF centroids, trained with spherical k-means on a sample
+- manifest.json   generation G, row count, parts and index size; replaced
+                  last, so readers never see a half-written batch
+
+Scores are cosine similarities. A search first applies the metadata filters
+as a row mask. Small masks are scanned exactly. Otherwise only the rows in
+the `nprobe` lists nearest to the query are scored, with an exact scan as
+fallback when the filters leave fewer than k of them. Rows added after
+training are assigned to their nearest list on add.
+
+Row ids are positions in the matrix and change on compact(), which writes a
+new generation of files; results also carry (paper_id, chunk_id), which do
+not.
+
+One process writes at a time. Readers use open_vector_store(), which
+reloads whenever the manifest changes.
+
+Usage (from frontend_developing/):
+    python vector_store.py stats
+    python vector_store.py train [--nlist 1024]
+    python vector_store.py compact
+"""
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import sparse
+
+from config import VECTOR_DIM, VECTOR_DTYPE, VECTOR_NPROBE, VECTOR_STORE_DIR
+
+MANIFEST_FILE = "manifest.json"
+CENTROIDS_FILE = "centroids.npy"
+
+ROW_GROUP_SIZE = 1024
+EXACT_SEARCH_ROWS = 20_000  # candidate rows below which a full scan is cheaper than probing
+TRAIN_SAMPLE_PER_LIST = 40
+TRAIN_ITERATIONS = 10
+SCORE_BATCH_ROWS = 65_536
+COMPACT_PART_ROWS = 262_144
+
+METADATA_SCHEMA = pa.schema(
+    [
+        ("paper_id", pa.int64()),
+        ("chunk_id", pa.int64()),
+        ("chunk_type", pa.string()),
+        ("instance_id", pa.int64()),
+        ("year", pa.int64()),
+        ("chunk_text", pa.string()),
+    ]
+)
+FILTER_COLUMNS = ("paper_id", "chunk_id", "chunk_type", "instance_id", "year")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _spherical_kmeans(x: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k unit centroids of the unit rows of x, maximizing cosine similarity."""
+    centroids = x[rng.choice(len(x), size=k, replace=False)]
+    for _ in range(TRAIN_ITERATIONS):
+        assign = np.concatenate(
+            [
+                np.argmax(x[start : start + SCORE_BATCH_ROWS // 4] @ centroids.T, axis=1)
+                for start in range(0, len(x), SCORE_BATCH_ROWS // 4)
+            ]
+        )
+        members = sparse.csr_matrix(
+            (np.ones(len(x), dtype=np.float32), (assign, np.arange(len(x)))), shape=(k, len(x))
+        )
+        sums = np.asarray(members @ x)
+        # Reseed empty lists with random rows
+        empty = np.flatnonzero(np.bincount(assign, minlength=k) == 0)
+        sums[empty] = x[rng.choice(len(x), size=len(empty), replace=False)]
+        centroids = _normalize(sums).astype(np.float32)
+    return centroids
+
+
+def _as_list(values) -> Optional[list]:
+    if values is None:
+        return None
+    if isinstance(values, (str, int, np.integer)):
+        return [values]
+    return list(values)
+
+
+class VectorStore:
+    """Chunk embeddings with metadata filters and an IVF index for approximate kNN."""
+
+    def __init__(self, path: Path = VECTOR_STORE_DIR, dim: int = VECTOR_DIM, dtype: str = VECTOR_DTYPE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        manifest = self._read_manifest()
+        self.manifest = manifest or {
+            "dim": dim, "dtype": dtype, "generation": 0, "rows": 0, "nlist": 0, "parts": []
+        }
+        self._load()
+
+    def __len__(self) -> int:
+        return int(self.live.sum())
+
+    @property
+    def dim(self) -> int:
+        return self.manifest["dim"]
+
+    @property
+    def rows(self) -> int:
+        return self.manifest["rows"]
+
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    def _row_file(self, kind: str, generation: int = None) -> Path:
+        """vectors, lists or deleted file of a generation (the current one by default)."""
+        if generation is None:
+            generation = self.manifest["generation"]
+        suffix = ".npy" if kind == "deleted" else ".bin"
+        return self._file(f"{kind}-{generation}{suffix}")
+
+    def _replace(self, path: Path, write) -> None:
+        """Write a file next to `path` and move it into place."""
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            with open(self._file(MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self) -> None:
+        tmp = self._file(MANIFEST_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self._file(MANIFEST_FILE))
+
+    def _load(self) -> None:
+        """Map the matrix and read everything but the chunk text into memory."""
+        rows, dim = self.rows, self.dim
+        if rows:
+            self.vectors = np.memmap(
+                self._row_file("vectors"), dtype=self.manifest["dtype"], mode="r", shape=(rows, dim)
+            )
+            self.lists = np.fromfile(self._row_file("lists"), dtype=np.int32, count=rows)
+            tables = [
+                pq.read_table(self._file(part["file"]), columns=list(FILTER_COLUMNS))
+                for part in self.manifest["parts"]
+            ]
+            metadata = pa.concat_tables(tables)
+        else:
+            self.vectors = np.zeros((0, dim), dtype=self.manifest["dtype"])
+            self.lists = np.zeros(0, dtype=np.int32)
+            metadata = METADATA_SCHEMA.empty_table()
+        self.metadata = {
+            name: metadata.column(name).to_numpy(zero_copy_only=False) for name in FILTER_COLUMNS
+        }
+        self.metadata["chunk_type"] = self.metadata["chunk_type"].astype(str)
+
+        deleted_path = self._row_file("deleted")
+        deleted = np.load(deleted_path) if rows and deleted_path.exists() else np.zeros(0, dtype=bool)
+        self.live = np.ones(rows, dtype=bool)
+        self.live[: len(deleted)] = ~deleted[:rows]
+
+        self.part_starts = np.array([part["start"] for part in self.manifest["parts"]], dtype=np.int64)
+        nlist = self.manifest["nlist"]
+        self.centroids = np.load(self._file(CENTROIDS_FILE)) if nlist else None
+        # IVF lists as CSR over the rows sorted by list
+        self._list_order = np.argsort(self.lists, kind="stable")
+        self._list_offsets = np.searchsorted(self.lists[self._list_order], np.arange(nlist + 1))
+
+    # ------------------------------------------------------------------ #
+    #                               Writes                                #
+    # ------------------------------------------------------------------ #
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest IVF list of each (normalized) vector, -1 before training."""
+        if self.centroids is None:
+            return np.full(len(vectors), -1, dtype=np.int32)
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), SCORE_BATCH_ROWS):
+            batch = np.asarray(vectors[start : start + SCORE_BATCH_ROWS], dtype=np.float32)
+            lists[start : start + len(batch)] = np.argmax(batch @ self.centroids.T, axis=1)
+        return lists
+
+    def add(
+        self,
+        embeddings: np.ndarray,
+        paper_ids: Iterable[int],
+        chunk_ids: Iterable[int],
+        chunk_texts: Iterable[str],
+        chunk_types: Iterable[str],
+        instance_ids: Iterable[int] = None,
+        years: Iterable[int] = None,
+    ) -> np.ndarray:
+        """
+        Append a batch of chunks.
+
+        Args:
+            embeddings: n x dim array
+            paper_ids, chunk_ids, chunk_texts, chunk_types: one value per chunk
+            instance_ids, years: conference instance and year of each chunk's
+                paper, for filtering; -1 when unknown
+
+        Returns:
+            np.ndarray: Row ids of the new chunks
+        """
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected an n x {self.dim} embedding matrix, got {vectors.shape}")
+        n = len(vectors)
+        unknown = [-1] * n
+        table = pa.table(
+            {
+                "paper_id": list(paper_ids),
+                "chunk_id": list(chunk_ids),
+                "chunk_type": list(chunk_types),
+                "instance_id": unknown if instance_ids is None else list(instance_ids),
+                "year": unknown if years is None else list(years),
+                "chunk_text": list(chunk_texts),
+            },
+            schema=METADATA_SCHEMA,
+        )
+        if table.num_rows != n:
+            raise ValueError("Every chunk needs one embedding and one value per column")
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            start = self.rows
+            part = f"chunks-{self.manifest['generation']}-{start:012d}.parquet"
+            pq.write_table(table, self._file(part), row_group_size=ROW_GROUP_SIZE)
+            # Drop bytes a failed add may have left past the last committed row
+            for kind, row_bytes, data in (
+                ("vectors", self.dim * np.dtype(self.manifest["dtype"]).itemsize,
+                 vectors.astype(self.manifest["dtype"])),
+                ("lists", 4, self._assign(vectors)),
+            ):
+                with open(self._row_file(kind), "ab") as f:
+                    f.truncate(start * row_bytes)
+                    f.write(data.tobytes())
+            deleted = np.concatenate([~self.live, np.zeros(n, dtype=bool)])
+            self._replace(self._row_file("deleted"), lambda f: np.save(f, deleted))
+
+            self.manifest["rows"] = start + n
+            self.manifest["parts"].append({"file": part, "start": start, "rows": n})
+            self._write_manifest()
+            self._load()
+        return np.arange(start, start + n)
+
+    def delete(self, rows: Iterable[int] = None, paper_ids: Iterable[int] = None) -> int:
+        """
+        Delete chunks by row id and/or by paper. Rows are tombstoned until compact().
+
+        Returns:
+            int: Number of chunks deleted
+        """
+        mask = np.zeros(self.rows, dtype=bool)
+        if rows is not None:
+            mask[np.asarray(list(rows), dtype=np.int64)] = True
+        if paper_ids is not None:
+            mask |= np.isin(self.metadata["paper_id"], list(paper_ids))
+        mask &= self.live
+        deleted = int(mask.sum())
+        if deleted:
+            with self._lock:
+                self.live &= ~mask
+                tombstones = ~self.live
+                self._replace(self._row_file("deleted"), lambda f: np.save(f, tombstones))
+                self._write_manifest()  # new mtime, so readers reload
+        return deleted
+
+    def train(self, nlist: int = None, seed: int = 0) -> int:
+        """
+        Train the IVF centroids on a sample of the live rows and assign every row.
+
+        Args:
+            nlist (int): Number of lists, 4 * sqrt(live rows) by default
+
+        Returns:
+            int: Number of lists
+        """
+        live = np.flatnonzero(self.live)
+        if len(live) == 0:
+            raise ValueError("Cannot train an index on an empty store")
+        nlist = min(nlist or int(4 * np.sqrt(len(live))), len(live))
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(live), nlist * TRAIN_SAMPLE_PER_LIST)
+        sample = np.sort(rng.choice(live, size=sample_size, replace=False))
+        centroids = _spherical_kmeans(np.asarray(self.vectors[sample], dtype=np.float32), nlist, rng)
+
+        with self._lock:
+            self.centroids = centroids
+            lists = self._assign(self.vectors)
+            self._replace(self._file(CENTROIDS_FILE), lambda f: np.save(f, self.centroids))
+            self._replace(self._row_file("lists"), lambda f: f.write(lists.tobytes()))
+            self.manifest["nlist"] = nlist
+            self._write_manifest()
+            self._load()
+        return nlist
+
+    def compact(self) -> int:
+        """
+        Rewrite the store without deleted rows. Row ids change; the index
+        assignments are kept.
+
+        Returns:
+            int: Number of rows removed
+        """
+        keep = np.flatnonzero(self.live)
+        removed = self.rows - len(keep)
+        if removed == 0:
+            return 0
+
+        with self._lock:
+            old_generation = self.manifest["generation"]
+            old_parts = [part["file"] for part in self.manifest["parts"]]
+            generation = old_generation + 1
+            with open(self._row_file("vectors", generation), "wb") as f:
+                for start in range(0, len(keep), SCORE_BATCH_ROWS):
+                    f.write(np.ascontiguousarray(self.vectors[keep[start : start + SCORE_BATCH_ROWS]]).tobytes())
+            self.lists[keep].tofile(self._row_file("lists", generation))
+            np.save(self._row_file("deleted", generation), np.zeros(len(keep), dtype=bool))
+
+            metadata = pa.concat_tables(
+                [pq.read_table(self._file(name)) for name in old_parts]
+            ).take(keep)
+            parts = []
+            for start in range(0, len(keep), COMPACT_PART_ROWS):
+                name = f"chunks-{generation}-{start:012d}.parquet"
+                rows = min(COMPACT_PART_ROWS, len(keep) - start)
+                pq.write_table(metadata.slice(start, rows), self._file(name), row_group_size=ROW_GROUP_SIZE)
+                parts.append({"file": name, "start": start, "rows": rows})
+
+            # Publish the new generation, then drop the old one; open memory
+            # maps of readers that have not reloaded yet stay valid
+            self.manifest.update(generation=generation, rows=len(keep), parts=parts)
+            self._write_manifest()
+            for kind in ("vectors", "lists", "deleted"):
+                self._row_file(kind, old_generation).unlink(missing_ok=True)
+            for name in old_parts:
+                self._file(name).unlink(missing_ok=True)
+            self._load()
+        return removed
+
+    # ------------------------------------------------------------------ #
+    #                                Reads                                #
+    # ------------------------------------------------------------------ #
+    def filter_mask(
+        self,
+        paper_ids: Iterable[int] = None,
+        chunk_types: Iterable[str] = None,
+        instance_ids: Iterable[int] = None,
+        years: Iterable[int] = None,
+    ) -> np.ndarray:
+        """Live rows matching every given filter; each takes a value or a list of values."""
+        mask = self.live.copy()
+        for column, values in (
+            ("paper_id", paper_ids),
+            ("chunk_type", chunk_types),
+            ("instance_id", instance_ids),
+            ("year", years),
+        ):
+            values = _as_list(values)
+            if values is not None:
+                mask &= np.isin(self.metadata[column], values)
+        return mask
+
+    def _score(self, rows: np.ndarray, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Top k of `rows` by cosine similarity, scanning the matrix in batches."""
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, len(rows), SCORE_BATCH_ROWS):
+            batch = rows[start : start + SCORE_BATCH_ROWS]
+            scores = np.asarray(self.vectors[batch], dtype=np.float32) @ query
+            best_rows = np.concatenate([best_rows, batch])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > k:
+                top = np.argpartition(-best_scores, k - 1)[:k]
+                best_rows, best_scores = best_rows[top], best_scores[top]
+        order = np.argsort(-best_scores, kind="stable")
+        return best_rows[order], best_scores[order]
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        paper_ids: Iterable[int] = None,
+        chunk_types: Iterable[str] = None,
+        instance_ids: Iterable[int] = None,
+        years: Iterable[int] = None,
+        nprobe: int = VECTOR_NPROBE,
+        with_text: bool = True,
+    ) -> list[dict]:
+        """
+        Approximate k nearest chunks of a query embedding.
+
+        Returns:
+            list: {"row", "paper_id", "chunk_id", "chunk_type", "instance_id",
+            "year", "score"[, "chunk_text"]} dicts, most similar first
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        mask = self.filter_mask(paper_ids, chunk_types, instance_ids, years)
+        matching = int(mask.sum())
+        if matching == 0 or k <= 0:
+            return []
+
+        candidates = None
+        if self.centroids is not None and matching > EXACT_SEARCH_ROWS:
+            probe = np.argsort(-(self.centroids @ query), kind="stable")[:nprobe]
+            candidates = np.concatenate(
+                [self._list_order[self._list_offsets[l] : self._list_offsets[l + 1]] for l in probe]
+            )
+            candidates = np.sort(candidates[mask[candidates]])
+            if len(candidates) < k:
+                candidates = None
+        if candidates is None:
+            candidates = np.flatnonzero(mask)
+
+        rows, scores = self._score(candidates, query, k)
+        return self.get(rows, scores, with_text)
+
+    def get(self, rows: np.ndarray, scores: np.ndarray = None, with_text: bool = True) -> list[dict]:
+        """Metadata (and text) of the given rows, in order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        texts = self.get_texts(rows) if with_text else None
+        results = []
+        for i, row in enumerate(rows.tolist()):
+            result = {"row": row, **{name: self.metadata[name][row].item() for name in FILTER_COLUMNS}}
+            if scores is not None:
+                result["score"] = float(scores[i])
+            if texts is not None:
+                result["chunk_text"] = texts[i]
+            results.append(result)
+        return results
+
+    def get_texts(self, rows: np.ndarray) -> list[str]:
+        """Chunk text of the given rows, reading only the row groups that hold them."""
+        rows = np.asarray(rows, dtype=np.int64)
+        texts = [None] * len(rows)
+        part_index = np.searchsorted(self.part_starts, rows, side="right") - 1
+        for p in np.unique(part_index):
+            part = self.manifest["parts"][p]
+            positions = np.flatnonzero(part_index == p)
+            offsets = rows[positions] - part["start"]
+            parquet = pq.ParquetFile(self._file(part["file"]), memory_map=True)
+            for group in np.unique(offsets // ROW_GROUP_SIZE):
+                column = parquet.read_row_group(int(group), columns=["chunk_text"]).column(0)
+                in_group = offsets // ROW_GROUP_SIZE == group
+                for position, offset in zip(positions[in_group], offsets[in_group]):
+                    texts[position] = column[int(offset % ROW_GROUP_SIZE)].as_py()
+        return texts
+
+
+# path -> (manifest mtime, store); reloaded when a writer publishes a new manifest
+_opened: dict[Path, tuple[float, VectorStore]] = {}
+_opened_lock = threading.Lock()
+
+
+def open_vector_store(path: Path = VECTOR_STORE_DIR) -> VectorStore:
+    """Return the process-wide read view of the store, reloaded after writes."""
+    path = Path(path)
+    try:
+        mtime = os.path.getmtime(path / MANIFEST_FILE)
+    except OSError:
+        mtime = 0.0
+    with _opened_lock:
+        cached = _opened.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, VectorStore(path))
+            _opened[path] = cached
+        return cached[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the embedded chunk-embedding store.")
+    parser.add_argument("command", choices=["stats", "train", "compact"])
+    parser.add_argument("--nlist", type=int, help="IVF lists (train only)")
+    args = parser.parse_args()
+
+    store = VectorStore()
+    if args.command == "train":
+        print(f"Trained {store.train(args.nlist)} lists")
+    elif args.command == "compact":
+        print(f"Removed {store.compact()} deleted rows")
+    print(
+        f"{len(store)} live chunks of {store.rows} rows, dim {store.dim} "
+        f"{store.manifest['dtype']}, {store.manifest['nlist']} IVF lists"
+    )
+
+
+if __name__ == "__main__":
+    main()